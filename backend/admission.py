@@ -0,0 +1,289 @@
+"""
+LLM 호출 입장 제어 모듈
+Anthropic API 동시 호출 수를 AIMD로 조절하고, 한도를 넘은 호출은 우선순위 대기열에서 기한까지 기다리게 함
+"""
+import math
+import time
+import asyncio
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from data_loader import load_config
+import metrics
+
+# 우선순위 클래스 (작을수록 먼저)
+PRIORITIES = {"interactive": 0, "batch": 1, "precompute": 2}
+
+# 현재 블록의 (우선순위 클래스, 호출당 대기 시간 초). 지정하지 않으면 None (interactive)
+_scope: ContextVar[Optional[Tuple[str, float]]] = ContextVar("admission_scope", default=None)
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 찼거나 기한 안에 차례가 오지 않아 LLM 호출을 하지 않음"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"admission rejected ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        """기한 초과는 503, 대기열 포화(밀려남 포함)는 429"""
+        return 503 if self.reason == "deadline" else 429
+
+class _Waiter:
+    """대기열 항목 (스레드는 Event, 코루틴은 Future로 깨움)"""
+
+    def __init__(self, priority: str, seq: int, deadline: float, loop: Optional[asyncio.AbstractEventLoop]):
+        self.priority = priority
+        self.rank = (PRIORITIES[priority], seq)
+        self.deadline = deadline
+        self.granted = False
+        self.error: Optional[AdmissionRejected] = None
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+def _set_future(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class AdmissionController:
+    """
+    AIMD 동시성 한도 + 우선순위 대기열
+
+    - 호출 시도마다 슬롯 하나를 쓰고 응답(스트리밍은 스트림 종료)과 함께 반납
+    - 성공 응답이 latency_target 안에 오면 한도를 조금씩(한도당 +increase) 늘리고,
+      429/529/타임아웃이면 decrease_ratio, 느린 응답이면 latency_decrease_ratio를 곱해 줄임
+      (같은 순간에 몰린 실패로 한도가 바닥까지 떨어지지 않도록 decrease_cooldown마다 한 번만)
+    - 한도가 차면 대기열에서 우선순위(interactive > batch > precompute), 도착 순으로 차례를 기다림
+    - 대기열이 가득 차면 더 낮은 우선순위 대기자를 밀어내거나, 없으면 바로 거부 (429)
+    - 호출마다 대기열에 들어간 시점부터 우선순위별 기한이 지나도록 차례가 오지 않으면 거부 (503)
+      (한 요청의 라우팅/답변/재시도 호출이 기한을 나눠 쓰지 않음)
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        initial_limit: float = 16,
+        min_limit: int = 2,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease_ratio: float = 0.5,
+        latency_target: float = 20.0,
+        latency_decrease_ratio: float = 0.9,
+        decrease_cooldown: float = 1.0,
+        max_queue: int = 64,
+        queue_timeouts: Optional[Dict[str, float]] = None
+    ):
+        self.enabled = enabled
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_ratio = decrease_ratio
+        self.latency_target = latency_target
+        self.latency_decrease_ratio = latency_decrease_ratio
+        self.decrease_cooldown = decrease_cooldown
+        self.max_queue = max_queue
+        self.queue_timeouts = {"interactive": 10.0, "batch": 60.0, "precompute": 300.0, **(queue_timeouts or {})}
+
+        self._lock = threading.Lock()
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = 0
+        self._last_decrease = 0.0
+        self._latency: Optional[float] = None
+        self.admitted = 0
+        self.queued = 0
+        self.decreases = 0
+        self.rejected: Counter = Counter()
+
+    @contextmanager
+    def scope(self, priority: str, timeout: Optional[float] = None):
+        """
+        이 블록(과 여기서 만든 태스크)의 LLM 호출 우선순위와 호출당 대기 시간 지정
+
+        timeout을 생략하면 우선순위별 queue_timeout_seconds
+        """
+        if timeout is None:
+            timeout = self.queue_timeouts[priority]
+        token = _scope.set((priority, timeout))
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    @property
+    def capacity(self) -> int:
+        return max(self.min_limit, math.floor(self.limit))
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def acquire(self) -> None:
+        """슬롯 하나 확보 (스레드에서 대기). 거부되면 AdmissionRejected"""
+        if not self.enabled:
+            return
+        waiter = self._enter(None)
+        if waiter is None:
+            return
+        waiter.event.wait(max(0.0, waiter.deadline - time.monotonic()))
+        self._settle(waiter)
+
+    async def acquire_async(self) -> None:
+        """acquire의 비동기 버전 (대기 중 이벤트 루프를 막지 않음)"""
+        if not self.enabled:
+            return
+        waiter = self._enter(asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), max(0.0, waiter.deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # 요청이 취소됨: 이미 받은 슬롯은 반납, 아니면 대기열에서 빠짐
+            with self._lock:
+                if waiter.granted:
+                    self.in_flight -= 1
+                    self._dispatch()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            raise
+        self._settle(waiter)
+
+    def release(self, outcome: str = "", latency: Optional[float] = None) -> None:
+        """
+        슬롯 반납 + 한도 조정
+
+        Args:
+            outcome: "ok"(성공), "overload"(429/529/타임아웃), ""(한도와 무관한 실패)
+            latency: 성공 시 응답까지 걸린 시간 (초)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.in_flight -= 1
+            if outcome == "overload":
+                self._decrease(self.decrease_ratio)
+            elif outcome == "ok" and latency is not None:
+                self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+                if latency > self.latency_target:
+                    self._decrease(self.latency_decrease_ratio)
+                else:
+                    self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._dispatch()
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = Counter(waiter.priority for waiter in self._waiters)
+            return {
+                "enabled": self.enabled,
+                "limit": round(self.limit, 2),
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "queue": dict(queued),
+                "max_queue": self.max_queue,
+                "latency_ewma": round(self._latency, 3) if self._latency is not None else None,
+                "admitted": self.admitted,
+                "queued_total": self.queued,
+                "decreases": self.decreases,
+                "rejected": dict(self.rejected)
+            }
+
+    def _enter(self, loop: Optional[asyncio.AbstractEventLoop]) -> Optional[_Waiter]:
+        """바로 들어갈 수 있으면 None, 아니면 대기열에 넣은 waiter (넣을 수 없으면 AdmissionRejected)"""
+        priority, timeout = _scope.get() or ("interactive", self.queue_timeouts["interactive"])
+        deadline = time.monotonic() + timeout
+
+        with self._lock:
+            if self.in_flight < self.capacity and not self._waiters:
+                self.in_flight += 1
+                self.admitted += 1
+                return None
+
+            if deadline <= time.monotonic():
+                raise self._reject("deadline", priority)
+
+            if len(self._waiters) >= self.max_queue:
+                worst = max(self._waiters, key=lambda waiter: waiter.rank)
+                if worst.rank[0] <= PRIORITIES[priority]:
+                    raise self._reject("queue_full", priority)
+                # 더 낮은 우선순위 대기자를 밀어내고 자리 확보
+                self._waiters.remove(worst)
+                worst.error = self._reject("evicted", worst.priority)
+                self._wake(worst)
+
+            self._seq += 1
+            waiter = _Waiter(priority, self._seq, deadline, loop)
+            self._waiters.append(waiter)
+            self.queued += 1
+            return waiter
+
+    def _settle(self, waiter: _Waiter) -> None:
+        """대기가 끝난 뒤 결과 확인 (슬롯을 받았으면 반환, 아니면 AdmissionRejected)"""
+        with self._lock:
+            if waiter.granted:
+                return
+            if waiter.error is not None:
+                raise waiter.error
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise self._reject("deadline", waiter.priority)
+
+    def _dispatch(self) -> None:
+        """빈 슬롯만큼 대기자를 우선순위 순으로 깨움 (잠금 안에서 호출)"""
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = min(self._waiters, key=lambda waiter: waiter.rank)
+            self._waiters.remove(waiter)
+            waiter.granted = True
+            self.in_flight += 1
+            self.admitted += 1
+            self._wake(waiter)
+
+    def _wake(self, waiter: _Waiter) -> None:
+        if waiter.event is not None:
+            waiter.event.set()
+        else:
+            waiter.loop.call_soon_threadsafe(_set_future, waiter.future)
+
+    def _decrease(self, ratio: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * ratio)
+        self.decreases += 1
+
+    def _reject(self, reason: str, priority: str) -> AdmissionRejected:
+        """거부 예외 생성 (Retry-After는 평균 응답 시간 기준으로 대기열이 빠지는 예상 시간)"""
+        self.rejected[reason] += 1
+        metrics.record_admission_rejected(reason, priority)
+        latency = self._latency if self._latency is not None else 1.0
+        retry_after = latency * (len(self._waiters) + 1) / self.capacity
+        return AdmissionRejected(reason, min(60.0, max(1.0, retry_after)))
+
+def _create_controller(settings: Optional[dict] = None) -> AdmissionController:
+    """config.json의 llm.admission 설정으로 생성"""
+    if settings is None:
+        settings = load_config().get("llm", {}).get("admission", {})
+    return AdmissionController(
+        enabled=settings.get("enabled", True),
+        initial_limit=settings.get("initial_limit", 16),
+        min_limit=settings.get("min_limit", 2),
+        max_limit=settings.get("max_limit", 64),
+        increase=settings.get("increase", 1.0),
+        decrease_ratio=settings.get("decrease_ratio", 0.5),
+        latency_target=settings.get("latency_target_seconds", 20.0),
+        latency_decrease_ratio=settings.get("latency_decrease_ratio", 0.9),
+        decrease_cooldown=settings.get("decrease_cooldown_seconds", 1.0),
+        max_queue=settings.get("max_queue", 64),
+        queue_timeouts=settings.get("queue_timeout_seconds")
+    )
+
+# 싱글톤 인스턴스 (Anthropic API 전체에 하나)
+admission = _create_controller()
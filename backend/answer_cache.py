@@ -0,0 +1,125 @@
+"""
+답변 캐시 모듈
+대화 이력이 없는 반복 질문의 답변을 LRU + TTL 방식으로 재사용
+"""
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from data_loader import load_config
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.~…]+$")
+
+def normalize_question(question: str) -> str:
+    """공백 정리, 소문자화, 끝 문장부호 제거"""
+    return _TRAILING.sub("", _WHITESPACE.sub(" ", question.strip().lower()))
+
+class AnswerCache:
+    """
+    (정규화 질문, 라벨, 전공명, 소속 학과, 선택 전공, 원본 콘텐츠 해시) 키 기반 답변 캐시
+
+    - 콘텐츠 해시가 키에 포함되므로 프롬프트/데이터 파일이 바뀌면 기존 항목은 자연히 미스
+    - max_entries / max_bytes 초과 시 가장 오래 사용하지 않은 항목부터 제거
+    - ttl_seconds가 지난 항목은 조회 시 제거
+    """
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 6 * 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[tuple, Tuple[str, str, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        question: str,
+        label: str,
+        program_name: Optional[str],
+        profile_dept: str,
+        selected_program: str,
+        content_hash: str
+    ) -> tuple:
+        return (
+            normalize_question(question), label, program_name or "",
+            profile_dept or "", selected_program or "", content_hash
+        )
+
+    def get(self, key: tuple) -> Optional[Tuple[str, str]]:
+        """캐시된 (answer, emotion) 반환, 없거나 만료되면 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            answer, emotion, stored_at, size = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer, emotion
+
+    def put(self, key: tuple, answer: str, emotion: str) -> None:
+        size = len(answer.encode("utf-8")) + sum(len(str(part).encode("utf-8")) for part in key)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (answer, emotion, time.monotonic(), size)
+            self.bytes += size
+
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """캐시 적중률 및 크기"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+    def _remove(self, key: tuple) -> None:
+        _, _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+def _create_cache() -> Optional[AnswerCache]:
+    """config.json의 answer_cache 설정으로 캐시 생성 (비활성이면 None)"""
+    settings = load_config().get("answer_cache", {})
+    if not settings.get("enabled", True):
+        return None
+
+    return AnswerCache(
+        max_entries=settings.get("max_entries", 2000),
+        max_bytes=settings.get("max_bytes", 32 * 1024 * 1024),
+        ttl_seconds=settings.get("ttl_seconds", 6 * 3600)
+    )
+
+# 싱글톤 인스턴스
+answer_cache = _create_cache()
@@ -0,0 +1,206 @@
+"""
+사전 계산 답변 저장소 모듈
+precompute.py가 FAQ 질문 목록으로 미리 만든 답변을 디스크에 보관하고, 원본 콘텐츠가 그대로인 동안 LLM 없이 응답
+
+파일 형식 (JSON Lines):
+    첫 줄: {"format": 1, "built_at": ...}
+    이후 한 줄에 항목 하나:
+        {"key": [정규화 질문, 소속 학과, 선택 전공, 요청 전공명], "question", "label", "program",
+         "route_hash", "content_hash", "answer", "emotion", "success", "built_at"}
+
+항목은 만들 때의 라우팅 원본 해시(route_hash)와 답변 템플릿 해시(content_hash)를 기록하고,
+조회 시 현재 해시와 다르면 사용하지 않음 (precompute.py 재실행 시 해당 항목만 다시 생성)
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from data_loader import ROOT_DIR, load_config, load_file_cached, get_prompt_template
+from answer_cache import normalize_question
+from diagnostics import diagnostics
+
+FORMAT_VERSION = 1
+
+DEFAULT_PATH = ROOT_DIR / "build" / "answers.jsonl"
+
+def store_path() -> Path:
+    """저장소 경로 (환경 변수 DAWANGI_ANSWER_STORE로 변경 가능)"""
+    return Path(os.getenv("DAWANGI_ANSWER_STORE", str(DEFAULT_PATH)))
+
+class AnswerStore:
+    """
+    (정규화 질문, 소속 학과, 선택 전공, 요청 전공명) → 최종 파이프라인 결과
+
+    - 대화 이력이 없는 요청만 조회 (답변 캐시/요청 병합과 같은 조건)
+    - 라우팅까지 건너뛰므로 라우터 프롬프트/라우팅 설정이 바뀌면 전체가, 프롬프트/데이터 파일이
+      바뀌면 그 라벨/전공 항목만 무효
+    - 처음 조회될 때 한 번 로드 (서버 시작 워밍업에서 미리 로드)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._attempted = False
+        self._route_source: Optional[tuple] = None
+        self._route_hash = ""
+        self.entries: Dict[tuple, dict] = {}
+        self.path: Optional[Path] = None
+        self.error: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def enabled(self) -> bool:
+        return load_config().get("answer_store", {}).get("enabled", True)
+
+    @staticmethod
+    def make_key(
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str]
+    ) -> tuple:
+        return (normalize_question(question), profile_dept or "", selected_program or "", program_name or "")
+
+    def ensure(self) -> None:
+        if not self._attempted:
+            self.load()
+
+    def load(self, path: Optional[Path] = None) -> int:
+        """저장소 파일을 읽어 항목 수 반환 (파일이 없으면 빈 저장소)"""
+        with self._lock:
+            self._attempted = True
+            path = Path(path) if path else store_path()
+            self.path = path
+            if not path.exists():
+                self.error = "not_found"
+                self.entries = {}
+                return 0
+
+            entries = {}
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    header = json.loads(f.readline() or "{}")
+                    if header.get("format") != FORMAT_VERSION:
+                        self.error = f"unsupported format ({header.get('format')})"
+                        self.entries = {}
+                        return 0
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            entries[tuple(entry["key"])] = entry
+            except (OSError, ValueError, KeyError) as e:
+                self.error = repr(e)
+                diagnostics.error("answer_store_load_failed", path=str(path), error=self.error)
+                return len(self.entries)
+
+            self.entries = entries
+            self.error = None
+            return len(entries)
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """전체 항목을 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(path) if path else (self.path or store_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"format": FORMAT_VERSION, "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")}) + "\n")
+            for key in sorted(self.entries):
+                f.write(json.dumps(self.entries[key], ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+        self.path = path
+        return path
+
+    def route_hash(self) -> str:
+        """LLM 라우팅 결과에 영향을 주는 원본 (라우터 프롬프트, router/routing 설정) 해시"""
+        config = load_config()
+        router = config.get("router", {})
+        text = load_file_cached(router.get("prompt", "prompt/prompt_multi_routing.txt"))
+        # 설정/프롬프트 객체가 그대로면 이전 해시 재사용 (파일이 바뀌면 새 객체가 됨)
+        source = (config, text)
+        if self._route_source is None or any(a is not b for a, b in zip(source, self._route_source)):
+            blob = json.dumps([text, router, config["routing"]], ensure_ascii=False, sort_keys=True)
+            self._route_hash = hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+            self._route_source = source
+        return self._route_hash
+
+    def content_hash(self, label: str, program_name: Optional[str]) -> str:
+        """답변 템플릿(프롬프트 + 데이터) 해시 (템플릿 없이 바로 답하는 결과는 빈 문자열)"""
+        routing = load_config()["routing"]
+        if label not in routing or ("data_template" in routing[label] and not program_name):
+            return ""
+        return get_prompt_template(label, program_name).content_hash
+
+    def is_fresh(self, entry: dict) -> bool:
+        try:
+            return (
+                entry["route_hash"] == self.route_hash()
+                and entry["content_hash"] == self.content_hash(entry["label"], entry["program"])
+            )
+        except (FileNotFoundError, ValueError):
+            # 데이터 파일이 없어졌거나 라벨/전공이 설정에서 빠진 항목
+            return False
+
+    def lookup(
+        self,
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str]
+    ) -> Optional[dict]:
+        """현재 원본과 일치하는 사전 계산 결과 (answer, label, emotion, success) 또는 None"""
+        if not self.enabled():
+            return None
+        self.ensure()
+        if not self.entries:
+            return None
+
+        entry = self.entries.get(self.make_key(question, profile_dept, selected_program, program_name))
+        if entry is None:
+            self.misses += 1
+            return None
+        if not self.is_fresh(entry):
+            self.stale += 1
+            return None
+
+        self.hits += 1
+        return {
+            "answer": entry["answer"],
+            "label": entry["label"],
+            "emotion": entry["emotion"],
+            "success": entry["success"]
+        }
+
+    def put(self, key: tuple, question: str, program: Optional[str], result: dict) -> None:
+        """파이프라인 결과를 현재 해시와 함께 저장 (precompute.py)"""
+        self.entries[key] = {
+            "key": list(key),
+            "question": question,
+            "label": result["label"],
+            "program": program,
+            "route_hash": self.route_hash(),
+            "content_hash": self.content_hash(result["label"], program),
+            "answer": result["answer"],
+            "emotion": result["emotion"],
+            "success": result["success"],
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "enabled": self.enabled(),
+            "path": str(self.path) if self.path else None,
+            "error": self.error,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+# 싱글톤 인스턴스
+answer_store = AnswerStore()
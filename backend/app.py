@@ -2,14 +2,38 @@
 FastAPI 메인 서버
 다왕이 챗봇 백엔드 API
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import Optional, List, Dict
-from router_service import router_service
-from data_loader import load_config, load_program_catalog
+from router_service import router_service, UNAVAILABLE_MESSAGE
+from lexical_router import lexical_router
+from answer_cache import answer_cache
+from answer_store import answer_store
+from llm_client import token_usage
+from circuit_breaker import llm_breaker, CircuitOpenError
+from admission import admission, AdmissionRejected
+from session_store import session_store
+from curriculum_index import curriculum_index
+from course_overlap import course_overlap
+from program_matcher import program_matcher
+from section_retriever import section_retriever
+from history_manager import history_manager
+from speculation import speculation_stats
+from singleflight import singleflight
+from static_responses import static_responses
+from warmup import warmup
+from file_watcher import file_watcher
+from timings import start_request, server_timing
+import metrics
+from data_loader import load_config, load_program_catalog, pin_sources, PROGRAM_CATALOG_PATH
+import json
+import math
+import asyncio
+import time
 import uuid
-from datetime import datetime, timedelta
 
 app = FastAPI(
     title="다왕이 챗봇 API",
@@ -27,9 +51,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 메모리 기반 세션 스토어 (서버 재시작 시 초기화됨)
-# 형식: { session_id: { "history": [...], "profile": {...}, "last_accessed": datetime } }
-session_store: Dict[str, dict] = {}
+@app.middleware("http")
+async def add_server_timing(request: Request, call_next):
+    """단계별 처리 시간(라우팅/프롬프트/LLM/후처리)을 Server-Timing 헤더로 노출"""
+    timings = start_request()
+    # 요청 처리 중 파일이 교체돼도 시작 시점 버전의 설정/템플릿을 사용
+    pin_sources()
+    start = time.perf_counter()
+    response = await call_next(request)
+    # 헤더는 본문보다 먼저 나가므로 Server-Timing은 응답 헤더 시점까지의 값
+    # (SSE/NDJSON 스트림의 llm/후처리 단계는 포함되지 않음)
+    total_ms = (time.perf_counter() - start) * 1000
+    response.headers["Server-Timing"] = server_timing(timings, total_ms)
+
+    # 라우트 템플릿 기준으로 집계 (경로 파라미터별로 시계열이 늘어나지 않도록)
+    route = request.scope.get("route")
+    if route is not None and route.path != "/metrics":
+        response.body_iterator = _observe_when_sent(response.body_iterator, route.path, timings, start)
+    return response
+
+async def _observe_when_sent(body_iterator, endpoint: str, timings: Dict[str, float], start: float):
+    """본문 전송이 끝나거나 끊긴 시점에 요청/단계 시간 기록 (스트리밍 응답의 LLM 시간까지 포함)"""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        metrics.observe_request(endpoint, timings, (time.perf_counter() - start) * 1000)
+
+# 세션 스토어 (config.json의 session 설정: 메모리 또는 SQLite, 유휴 TTL, 최대 세션 수)
+@app.on_event("startup")
+def start_session_sweeper():
+    session_store.start_sweeper()
+
+@app.on_event("startup")
+def bind_metrics():
+    metrics.bind_session_store(session_store)
+    metrics.bind_circuit_breaker(llm_breaker)
+    metrics.bind_admission(admission)
+
+@app.on_event("startup")
+def start_file_watcher():
+    """config.json, prompt/, data/ 변경 감시 (config.json hot_reload)"""
+    file_watcher.start()
+
+@app.on_event("startup")
+async def start_warmup():
+    """
+    지식 번들 로드, 템플릿/색인/정적 응답 생성, 업스트림 연결 선개설을 백그라운드로 시작
+
+    완료 전에도 요청은 처리하며(필요한 것은 그때 생성), /ready는 완료 후 200
+    """
+    app.state.warmup_task = asyncio.create_task(warmup.run())
+
+@app.on_event("shutdown")
+def stop_session_sweeper():
+    session_store.stop_sweeper()
+
+@app.on_event("shutdown")
+def stop_file_watcher():
+    file_watcher.stop()
 
 # 요청 모델
 class ChatRequest(BaseModel):
@@ -38,6 +118,22 @@ class ChatRequest(BaseModel):
     selected_program: Optional[str] = ""
     program_name: Optional[str] = None
     session_id: Optional[str] = None  # 대화 이력을 위한 세션 ID
+    completed_courses: Optional[List[str]] = None  # 이수 교과목번호 (생략하면 세션에 저장된 값)
+
+class BatchChatItem(BaseModel):
+    question: str
+    profile_dept: Optional[str] = ""
+    selected_program: Optional[str] = ""
+    program_name: Optional[str] = None
+
+class BatchChatRequest(BaseModel):
+    items: List[BatchChatItem]
+    concurrency: Optional[int] = None  # 생략하면 config.json의 batch.concurrency
+
+class CourseOverlapRequest(BaseModel):
+    programs: List[str]  # 이수 중인 전공 ID
+    completed_courses: List[str]  # 이수한 교과목번호
+    profile_dept: Optional[str] = ""  # 소속 학과 (제1전공)
 
 class RouterRequest(BaseModel):
     question: str
@@ -59,6 +155,43 @@ class ProgramInfo(BaseModel):
 class ProgramCatalogResponse(BaseModel):
     programs: List[ProgramInfo]
 
+# 전공 ID → 화면 표시용 이름
+PROGRAM_DISPLAY_NAMES = {
+    "빅데이터_전공": "빅데이터",
+    "지식재산_스마트융합": "지식재산 스마트융합",
+    "위기관리_전공": "위기관리",
+    "보안컨설팅_전공": "보안컨설팅",
+    "벤처비즈니스_전공": "벤처비즈니스",
+    "이차전지_융합전공": "이차전지융합",
+    "공공데이터사이언스_전공": "공공데이터사이언스"
+}
+
+def _build_available_programs() -> dict:
+    programs = load_config()["routing"]["융합전공_교과과정"]["available_programs"]
+    return {
+        "programs": [
+            {"id": prog_id, "name": PROGRAM_DISPLAY_NAMES.get(prog_id, prog_id), "type": "융합전공"}
+            for prog_id in programs
+        ]
+    }
+
+def _build_program_catalog() -> dict:
+    return ProgramCatalogResponse(**load_program_catalog()).model_dump()
+
+# 프론트엔드가 페이지마다 부르는 응답은 원본 파일이 바뀔 때만 다시 만듦
+static_responses.register("available", ["config.json"], _build_available_programs)
+static_responses.register("catalog", [PROGRAM_CATALOG_PATH], _build_program_catalog)
+static_responses.register("config", ["config.json"], load_config)
+
+def _static_response(request: Request, name: str) -> Response:
+    """사전 계산된 JSON 본문 + ETag 응답 (If-None-Match가 맞으면 304)"""
+    body, etag = static_responses.get(name)
+    max_age = load_config().get("static_responses", {}).get("max_age_seconds", 60)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if static_responses.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # API 엔드포인트
 @app.get("/")
 def root():
@@ -74,8 +207,57 @@ def health_check():
     """헬스 체크"""
     return {"status": "ok"}
 
+async def _get_session(request: ChatRequest) -> tuple[str, dict]:
+    """세션 가져오기 또는 생성 후 프로필 갱신 (이번 요청에서 쓰는 복사본)"""
+    # 세션 ID 처리
+    session_id = request.session_id or str(uuid.uuid4())
+
+    # 세션 가져오기 또는 생성
+    session = await session_store.run(session_store.get_or_create, session_id, {
+        "dept": request.profile_dept or "",
+        "selected_program": request.selected_program or ""
+    })
+
+    # 프로필 정보 업데이트 (새로운 정보가 있으면)
+    if request.profile_dept:
+        session["profile"]["dept"] = request.profile_dept
+    if request.selected_program:
+        session["profile"]["selected_program"] = request.selected_program
+    if request.completed_courses is not None:
+        session["profile"]["completed_courses"] = list(course_overlap.normalize(request.completed_courses))
+
+    return session_id, session
+
+async def _append_history(
+    session_id: str,
+    session: dict,
+    question: str,
+    answer: str,
+    label: Optional[str] = None
+) -> None:
+    """
+    대화 이력 업데이트 후 저장 (이력 길이 제한은 세션 스토어가 처리)
+
+    요청 시작 시 읽은 복사본 대신 저장 시점의 최신 세션에 이번 턴만 덧붙여
+    같은 세션의 겹친 요청이나 이력 접기 결과를 덮어쓰지 않음
+    """
+    def apply(latest: dict) -> None:
+        latest["profile"] = session["profile"]
+        latest["history"].append({
+            "role": "user",
+            "content": question
+        })
+        latest["history"].append({
+            "role": "assistant",
+            "content": answer
+        })
+        if label is not None:
+            latest["last_label"] = label
+
+    await session_store.run(session_store.update, session_id, apply, session["profile"])
+
 @app.post("/api/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
     """
     챗봇 질문 응답 API
 
@@ -86,75 +268,191 @@ def chat(request: ChatRequest):
     4. LLM 호출
     5. 답변 반환
     6. 대화 이력 업데이트
+    7. (응답 전송 후) 오래된 이력을 요약으로 접기
     """
     try:
-        # 세션 ID 처리
-        session_id = request.session_id or str(uuid.uuid4())
-
-        # 세션 가져오기 또는 생성
-        if session_id not in session_store:
-            session_store[session_id] = {
-                "history": [],
-                "profile": {
-                    "dept": request.profile_dept or "",
-                    "selected_program": request.selected_program or ""
-                },
-                "last_accessed": datetime.now()
-            }
-
-        # 기존 세션 정보 업데이트
-        session = session_store[session_id]
-        session["last_accessed"] = datetime.now()
-
-        # 프로필 정보 업데이트 (새로운 정보가 있으면)
-        if request.profile_dept:
-            session["profile"]["dept"] = request.profile_dept
-        if request.selected_program:
-            session["profile"]["selected_program"] = request.selected_program
-
-        # 대화 이력 가져오기
-        chat_history = session["history"]
+        session_id, session = await _get_session(request)
 
         # 챗봇 파이프라인 실행 (대화 이력 포함)
-        result = router_service.chatbot_pipeline(
-            question=request.question,
-            profile_dept=session["profile"]["dept"],
-            selected_program=session["profile"]["selected_program"],
-            program_name=request.program_name,
-            chat_history=chat_history  # 대화 이력 전달
+        # 대화 이력은 복사본을 넘겨 동시 요청이 같은 리스트를 공유하지 않도록 함
+        with course_overlap.scope(session["profile"].get("completed_courses")):
+            result = await router_service.chatbot_pipeline_async(
+                question=request.question,
+                profile_dept=session["profile"]["dept"],
+                selected_program=session["profile"]["selected_program"],
+                program_name=request.program_name,
+                chat_history=list(session["history"]),
+                history_summary=session.get("summary", ""),
+                last_label=session.get("last_label")
+            )
+
+        # 다음 턴 추측 실행을 위해 이번 턴 라우팅 결과 보관
+        await _append_history(
+            session_id, session, request.question, result["answer"],
+            label=result["label"] if result["success"] else None
         )
-
-        # 대화 이력 업데이트
-        session["history"].append({
-            "role": "user",
-            "content": request.question
-        })
-        session["history"].append({
-            "role": "assistant",
-            "content": result["answer"]
-        })
-
-        # 이력이 너무 길면 최근 10개만 유지
-        if len(session["history"]) > 20:  # 10턴 (user + assistant = 2개)
-            session["history"] = session["history"][-20:]
+        background_tasks.add_task(history_manager.fold, session_id)
 
         # 응답에 session_id 추가
         result["session_id"] = session_id
 
         return ChatResponse(**result)
 
+    except CircuitOpenError as e:
+        raise _circuit_error(e)
+
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
+def _admission_error(e: AdmissionRejected) -> HTTPException:
+    """입장 제어 거부 → 429(대기열 포화) / 503(대기 기한 초과) + Retry-After"""
+    return HTTPException(
+        status_code=e.status_code,
+        detail="지금은 질문이 너무 많이 몰렸다왕... 😅 잠시 후 다시 물어봐주라왕!",
+        headers={"Retry-After": str(math.ceil(e.retry_after))}
+    )
+
+def _circuit_error(e: CircuitOpenError) -> HTTPException:
+    """서킷 open → 503 + Retry-After (서킷이 반개방으로 바뀔 때까지), 본문은 다왕 안내 메시지"""
+    return HTTPException(
+        status_code=503,
+        detail=UNAVAILABLE_MESSAGE,
+        headers={"Retry-After": str(math.ceil(e.retry_after))}
+    )
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 형식으로 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    챗봇 질문 응답 스트리밍 API (Server-Sent Events)
+
+    이벤트 순서:
+    1. meta: {"label", "session_id"} - 라우팅 직후
+    2. delta: {"text"} - 생성되는 답변 조각 (여러 번)
+    3. done: {"answer", "label", "emotion", "success", "session_id"} - 다왕 말투가 적용된 최종 답변
+
+    대화 이력은 스트림이 끝까지 전송된 경우에만 업데이트
+    """
+    session_id, session = await _get_session(request)
+
+    async def event_stream():
+        try:
+            with course_overlap.scope(session["profile"].get("completed_courses")):
+                async for event, data in router_service.chatbot_pipeline_stream(
+                    question=request.question,
+                    profile_dept=session["profile"]["dept"],
+                    selected_program=session["profile"]["selected_program"],
+                    program_name=request.program_name,
+                    chat_history=list(session["history"]),
+                    history_summary=session.get("summary", "")
+                ):
+                    if event == "delta":
+                        yield _sse(event, data)
+                        continue
+
+                    data["session_id"] = session_id
+                    if event == "done":
+                        # /api/chat과 같이 성공한 턴의 라벨을 다음 턴 추측 실행용으로 보관
+                        await _append_history(
+                            session_id, session, request.question, data["answer"],
+                            label=data["label"] if data["success"] else None
+                        )
+                    yield _sse(event, data)
+
+        except CircuitOpenError as e:
+            yield _sse("error", {
+                "detail": _circuit_error(e).detail,
+                "status": 503,
+                "retry_after": math.ceil(e.retry_after),
+                "session_id": session_id
+            })
+
+        except AdmissionRejected as e:
+            yield _sse("error", {
+                "detail": _admission_error(e).detail,
+                "status": e.status_code,
+                "retry_after": math.ceil(e.retry_after),
+                "session_id": session_id
+            })
+
+        except Exception as e:
+            yield _sse("error", {"detail": f"서버 오류: {str(e)}", "session_id": session_id})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # 프록시 버퍼링 방지
+        },
+        background=BackgroundTask(history_manager.fold, session_id)
+    )
+
+@app.post("/api/chat/batch")
+async def chat_batch(request: BatchChatRequest):
+    """
+    여러 질문 일괄 응답 API (NDJSON 스트리밍)
+
+    항목마다 끝나는 순서대로 한 줄씩 전송:
+        {"index", "answer", "label", "emotion", "success"} (실패 시 "error" 포함)
+    마지막 줄: {"done": true, "total", "unique", "failed", "elapsed_ms"}
+
+    세션/대화 이력은 사용하지 않음. 동시 실행 수는 batch.max_concurrency를 넘지 않음
+    """
+    settings = load_config().get("batch", {})
+    max_items = settings.get("max_items", 200)
+    if not request.items:
+        raise HTTPException(status_code=400, detail="items가 비어 있습니다")
+    if len(request.items) > max_items:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {max_items}개까지 처리할 수 있습니다")
+
+    concurrency = min(
+        request.concurrency or settings.get("concurrency", 8),
+        settings.get("max_concurrency", 16)
+    )
+    items = [item.model_dump() for item in request.items]
+
+    async def lines():
+        start = time.perf_counter()
+        unique = failed = 0
+        async for indexes, result in router_service.chatbot_pipeline_batch(items, concurrency):
+            unique += 1
+            if not result["success"]:
+                failed += len(indexes)
+            for index in indexes:
+                yield json.dumps({"index": index, **result}, ensure_ascii=False) + "\n"
+        yield json.dumps({
+            "done": True,
+            "total": len(items),
+            "unique": unique,
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # 프록시 버퍼링 방지
+        }
+    )
+
 @app.post("/api/route")
-def route_question(request: RouterRequest):
+async def route_question(request: RouterRequest):
     """
     질문 분류 API
 
-    질문을 4개 카테고리 중 하나로 분류
+    질문을 4개 카테고리 중 하나로 분류하고, 질문에 나온 전공 목록도 함께 반환
     """
     try:
-        label = router_service.route_question(
+        label = await router_service.route_question_async(
             question=request.question,
             profile_dept=request.profile_dept or "",
             selected_program=request.selected_program or ""
@@ -162,67 +460,172 @@ def route_question(request: RouterRequest):
 
         return {
             "label": label,
-            "success": label != "Unmatched"
+            "success": label != "Unmatched",
+            # 질문에 나온 전공 (여러 개면 나온 순서, 오타 허용 일치는 score < 1)
+            "programs": [match.to_dict() for match in program_matcher.match(request.question)]
         }
 
+    except CircuitOpenError as e:
+        raise _circuit_error(e)
+
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus 스크레이프 엔드포인트"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/api/router/stats")
+def get_router_stats():
+    """로컬 fast-path 라우터 적중/폴백 통계 + 추측 실행 적중률"""
+    return {**lexical_router.stats(), "speculation": speculation_stats.stats()}
+
+@app.get("/ready")
+def readiness():
+    """준비 상태 (지식 번들 로드 + 워밍업 완료 시 200, 아니면 503)"""
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/api/content/stats")
+def get_content_stats():
+    """프롬프트/데이터 파일 감시 상태 (현재 버전, 교체 횟수, 마지막으로 바뀐 파일)"""
+    return file_watcher.stats()
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    """답변 캐시 적중률 및 크기, 사전 계산 답변 적중 수, 처리 중 요청 병합 수, 정적 응답 재생성/304 수"""
+    extra = {
+        "precomputed": answer_store.stats(),
+        "singleflight": singleflight.stats(),
+        "static": static_responses.stats()
+    }
+    if answer_cache is None:
+        return {"enabled": False, **extra}
+    return {"enabled": True, **answer_cache.stats(), **extra}
+
+@app.get("/api/llm/usage")
+def get_llm_usage():
+    """라벨:전공별 토큰 사용량 (프롬프트 캐시 읽기/쓰기 포함)"""
+    return token_usage.stats()
+
+@app.get("/api/llm/health")
+def get_llm_health():
+    """
+    Anthropic API 서킷 브레이커 상태 (closed / open / half_open, 연속 실패 수, 거부 수)와
+    입장 제어 상태 (현재 동시성 한도, 진행/대기 수, 거부 사유별 수)
+    """
+    return {**llm_breaker.stats(), "admission": admission.stats()}
+
+@app.get("/api/retrieval/stats")
+def get_retrieval_stats():
+    """섹션 검색 통계 (검색 / 전체 파일 폴백 횟수, 절약한 글자 수)"""
+    return section_retriever.stats()
+
+@app.get("/api/sessions/stats")
+def get_session_stats():
+    """세션 스토어 상태 (세션 수, 만료/제거 수, 이력 요약 횟수)"""
+    return {**session_store.stats(), "history": history_manager.stats()}
+
 @app.get("/api/programs/available")
-def get_available_programs():
+def get_available_programs(request: Request):
     """
     사용 가능한 전공 목록 조회
 
     상세 교과과정이 제공되는 7개 전공
     """
     try:
-        config = load_config()
-        programs = config["routing"]["융합전공_교과과정"]["available_programs"]
-
-        # 전공명 한글로 변환
-        program_names = []
-        name_map = {
-            "빅데이터_전공": "빅데이터",
-            "지식재산_스마트융합": "지식재산 스마트융합",
-            "위기관리_전공": "위기관리",
-            "보안컨설팅_전공": "보안컨설팅",
-            "벤처비즈니스_전공": "벤처비즈니스",
-            "이차전지_융합전공": "이차전지융합",
-            "공공데이터사이언스_전공": "공공데이터사이언스"
-        }
-
-        for prog_id in programs:
-            program_names.append({
-                "id": prog_id,
-                "name": name_map.get(prog_id, prog_id),
-                "type": "융합전공"
-            })
-
-        return {"programs": program_names}
+        return _static_response(request, "available")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
 @app.get("/api/programs/catalog", response_model=ProgramCatalogResponse)
-def get_program_catalog():
+def get_program_catalog(request: Request):
     """
     전체 전공 현황 조회
 
     30개 융합전공 + 2개 연계전공
     """
     try:
-        catalog = load_program_catalog()
-        return ProgramCatalogResponse(**catalog)
+        return _static_response(request, "catalog")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
+@app.get("/api/programs/{program_id}/courses")
+def get_program_courses(
+    program_id: str,
+    type: Optional[str] = None,
+    year: Optional[int] = None,
+    semester: Optional[int] = None
+):
+    """
+    전공 교과목 조회 (교과과정 인덱스)
+
+    예: /api/programs/빅데이터_전공/courses?type=전필&year=3
+    """
+    courses = curriculum_index.courses(program_id, type, year, semester)
+    if courses is None:
+        raise HTTPException(status_code=404, detail=f"전공을 찾을 수 없습니다: {program_id}")
+
+    return {
+        "program_id": program_id,
+        "count": len(courses),
+        "credits": sum(c.credits for c in courses),
+        "courses": [c.to_dict() for c in courses]
+    }
+
+@app.get("/api/courses/{course_number}")
+def get_course(course_number: str):
+    """
+    교과목번호로 교과목 조회
+
+    - courses: 교육과정표에 개설된 전공별 행
+    - listings: 타학과 인정 / 중복·대체 인정을 포함해 이 교과목을 인정하는 모든 전공
+    """
+    courses = curriculum_index.find(course_number)
+    listings = course_overlap.find(course_number)
+    if not courses and not listings:
+        raise HTTPException(status_code=404, detail=f"교과목을 찾을 수 없습니다: {course_number}")
+
+    return {
+        "course_number": course_number,
+        "courses": [c.to_dict() for c in courses],
+        "listings": [listing.to_dict() for listing in listings]
+    }
+
+@app.post("/api/courses/overlap")
+def course_overlap_credits(request: CourseOverlapRequest):
+    """
+    이수 교과목 중복 인정 계산 (LLM 없이 교과과정 파일 표로 계산)
+
+    반환:
+    - programs: 전공별 인정 교과목, 이수구분별 학점, 미이수 전필, 제1전공 중복인정 학점(상한 적용)
+    - overlaps / overlap_credits: 선택한 전공 두 곳 이상에서 인정되는 교과목
+    - unique_credits: 어느 전공에서든 인정되는 교과목 학점 합계 (한 번씩)
+    - unmatched: 어느 전공에서도 인정되지 않는 교과목번호
+    """
+    limit = course_overlap.settings().get("max_completed_courses", 200)
+    if not request.programs:
+        raise HTTPException(status_code=400, detail="programs가 비어 있습니다")
+    if len(request.completed_courses) > limit:
+        raise HTTPException(status_code=413, detail=f"이수 교과목은 최대 {limit}개까지 계산할 수 있습니다")
+
+    try:
+        return course_overlap.calculate(request.programs, request.completed_courses, request.profile_dept or "")
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"전공을 찾을 수 없습니다: {e.args[0]}")
+
 @app.get("/api/config")
-def get_config():
+def get_config(request: Request):
     """설정 정보 조회"""
     try:
-        config = load_config()
-        return config
+        return _static_response(request, "config")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
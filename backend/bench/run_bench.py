@@ -0,0 +1,273 @@
+"""
+/api/chat 부하 테스트 / 지연 벤치마크
+Anthropic 스텁 서버와 백엔드를 띄우고 동시 요청을 보내 처리량, 지연 백분위, 단계별 시간을 JSON으로 출력
+
+실행 (backend 디렉토리에서):
+    python bench/run_bench.py --concurrency 8 --requests 200 --out bench/results.json
+
+    --target http://host:port  이미 떠 있는 백엔드를 측정 (스텁/백엔드 실행 생략)
+    --unique                   질문마다 번호를 붙여 답변 캐시를 우회 (LLM 경로 측정)
+    --stream                   /api/chat/stream 측정 (첫 delta까지 시간도 기록)
+
+단계별 시간은 백엔드의 Server-Timing 헤더(routing, prompt, llm, post, total)에서 수집
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = Path(__file__).parent
+BACKEND_DIR = BENCH_DIR.parent
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """nearest-rank 백분위"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(p / 100 * len(ordered) + 0.5)))
+    return round(ordered[rank - 1], 2)
+
+def summarize(values: List[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 2),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2),
+    }
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """"routing;dur=1.2, llm;dur=830.0" → {"routing": 1.2, "llm": 830.0}"""
+    timings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                timings[name] = float(value)
+    return timings
+
+async def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server not ready: {url}")
+
+def start_servers(args) -> List[subprocess.Popen]:
+    """스텁 서버와 백엔드(uvicorn)를 하위 프로세스로 실행"""
+    stub = subprocess.Popen(
+        [
+            sys.executable, str(BENCH_DIR / "stub_anthropic.py"),
+            "--port", str(args.stub_port),
+            "--ttft-median-ms", str(args.ttft_median_ms),
+            "--ttft-sigma", str(args.ttft_sigma),
+            "--router-median-ms", str(args.router_median_ms),
+            "--tokens-per-second", str(args.tokens_per_second),
+            "--answer-tokens", str(args.answer_tokens),
+            "--error-rate", str(args.error_rate),
+            "--seed", str(args.seed),
+        ],
+        cwd=BACKEND_DIR
+    )
+
+    env = dict(os.environ)
+    env["ANTHROPIC_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}"
+    env["ANTHROPIC_API_KEY"] = "bench-stub-key"
+    backend = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app:app",
+            "--port", str(args.app_port),
+            "--workers", str(args.workers),
+            "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+    return [stub, backend]
+
+async def one_request(client: httpx.AsyncClient, args, item: dict, index: int) -> dict:
+    question = f"{item['question']} ({index})" if args.unique else item["question"]
+    payload = {"question": question}
+    start = time.perf_counter()
+    first_delta_ms = None
+
+    try:
+        if args.stream:
+            async with client.stream("POST", "/api/chat/stream", json=payload) as response:
+                headers = response.headers
+                status = response.status_code
+                label = None
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[7:]
+                        if event == "delta" and first_delta_ms is None:
+                            first_delta_ms = (time.perf_counter() - start) * 1000
+                    elif line.startswith("data: ") and event == "done":
+                        label = json.loads(line[6:]).get("label")
+        else:
+            response = await client.post("/api/chat", json=payload)
+            headers = response.headers
+            status = response.status_code
+            label = response.json().get("label") if status == 200 else None
+
+    except httpx.HTTPError as e:
+        return {"ok": False, "error": repr(e), "latency_ms": (time.perf_counter() - start) * 1000}
+
+    return {
+        "ok": status == 200,
+        "status": status,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+        "first_delta_ms": first_delta_ms,
+        "expected_label": item["label"],
+        "label": label,
+        "stages": parse_server_timing(headers.get("server-timing", "")),
+    }
+
+async def run_load(args, base_url: str, corpus: List[dict]) -> dict:
+    results: List[dict] = []
+    counter = iter(range(args.warmup + args.requests))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+        async def worker():
+            for index in counter:
+                result = await one_request(client, args, corpus[index % len(corpus)], index)
+                if index >= args.warmup:
+                    results.append(result)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        duration = time.perf_counter() - start
+
+        server_stats = {}
+        for name, path in (
+            ("router", "/api/router/stats"),
+            ("cache", "/api/cache/stats"),
+            ("llm_usage", "/api/llm/usage"),
+            ("llm_health", "/api/llm/health"),
+        ):
+            try:
+                server_stats[name] = (await client.get(path)).json()
+            except (httpx.HTTPError, ValueError):
+                server_stats[name] = None
+
+    ok = [r for r in results if r["ok"]]
+    stages = defaultdict(list)
+    for r in ok:
+        for stage, ms in r["stages"].items():
+            stages[stage].append(ms)
+
+    by_label = defaultdict(list)
+    for r in ok:
+        by_label[r["expected_label"]].append(r)
+
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(ok) / duration, 2) if duration else None,
+        "latency_ms": summarize([r["latency_ms"] for r in ok]),
+        "first_delta_ms": summarize([r["first_delta_ms"] for r in ok if r["first_delta_ms"] is not None]),
+        "stages_ms": {stage: summarize(values) for stage, values in sorted(stages.items())},
+        "label_accuracy": round(sum(r["label"] == r["expected_label"] for r in ok) / len(ok), 4) if ok else None,
+        "by_expected_label": {
+            label: {
+                "latency_ms": summarize([r["latency_ms"] for r in items]),
+                "accuracy": round(sum(r["label"] == label for r in items) / len(items), 4),
+            }
+            for label, items in sorted(by_label.items())
+        },
+        "server": server_stats,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/chat 부하 테스트")
+    parser.add_argument("--target", default=None, help="측정할 백엔드 URL (지정 시 스텁/백엔드를 띄우지 않음)")
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "questions.json"))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--unique", action="store_true", help="질문에 번호를 붙여 답변 캐시 우회")
+    parser.add_argument("--stream", action="store_true", help="/api/chat/stream 측정")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--app-port", type=int, default=8800)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stub-port", type=int, default=8787)
+    parser.add_argument("--ttft-median-ms", type=float, default=400.0)
+    parser.add_argument("--ttft-sigma", type=float, default=0.4)
+    parser.add_argument("--router-median-ms", type=float, default=250.0)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--answer-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    processes = []
+    base_url = args.target
+    try:
+        if base_url is None:
+            processes = start_servers(args)
+            base_url = f"http://127.0.0.1:{args.app_port}"
+            asyncio.run(wait_ready(f"http://127.0.0.1:{args.stub_port}/health"))
+            asyncio.run(wait_ready(f"{base_url}/api/config"))
+
+        report = asyncio.run(run_load(args, base_url, corpus))
+
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    report = {
+        "benchmark": {
+            "endpoint": "/api/chat/stream" if args.stream else "/api/chat",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "unique_questions": args.unique,
+            "target": args.target or "local",
+            "stub": None if args.target else {
+                "ttft_median_ms": args.ttft_median_ms,
+                "ttft_sigma": args.ttft_sigma,
+                "router_median_ms": args.router_median_ms,
+                "tokens_per_second": args.tokens_per_second,
+                "answer_tokens": args.answer_tokens,
+                "error_rate": args.error_rate,
+            },
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        **report,
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Anthropic Messages API 스텁 서버
+실제 API 할당량을 쓰지 않고 지연 분포만 흉내 내는 벤치마크용 로컬 서버
+
+실행:
+    python bench/stub_anthropic.py --port 8787 --ttft-median-ms 400 --tokens-per-second 80
+
+백엔드는 ANTHROPIC_BASE_URL=http://127.0.0.1:8787 로 실행하면 이 서버를 호출함
+"""
+import re
+import json
+import math
+import random
+import asyncio
+import argparse
+from typing import List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# 라우터 응답용 간단한 키워드 규칙 (순서대로 검사)
+_ROUTE_RULES = [
+    ("Unmatched", re.compile(r"점심|날씨|코드|기숙사")),
+    ("융합전공_교과과정", re.compile(r"과목|교과|전선|학기|학년|인정")),
+    ("융합전공_졸업요건", re.compile(r"졸업|이수학점|학위명|몇 학점|전공필수")),
+    ("전공_현황", re.compile(r"목록|주임교수|수여학위|개설년도|관련학과|국책|어떤 게 있어")),
+]
+_PROGRAMS = {
+    "빅데이터": "빅데이터_전공",
+    "지식재산": "지식재산_스마트융합",
+    "위기관리": "위기관리_전공",
+    "보안컨설팅": "보안컨설팅_전공",
+    "벤처비즈니스": "벤처비즈니스_전공",
+    "이차전지": "이차전지_융합전공",
+    "공공데이터": "공공데이터사이언스_전공",
+}
+_QUESTION = re.compile(r"<question>\s*(.*?)\s*</question>", re.DOTALL)
+_FILLER = "다왕이가 알려줄게왕. 융합전공 교과과정과 졸업요건을 확인해보라왕. "
+
+class StubSettings:
+    ttft_median_ms = 400.0
+    ttft_sigma = 0.4
+    router_median_ms = 250.0
+    tokens_per_second = 80.0
+    answer_tokens = 300
+    error_rate = 0.0
+
+settings = StubSettings()
+app = FastAPI(title="Anthropic API stub")
+
+def _lognormal_ms(median_ms: float) -> float:
+    """중앙값이 median_ms인 로그정규 분포 샘플 (꼬리 지연 재현)"""
+    return median_ms * math.exp(random.gauss(0.0, settings.ttft_sigma))
+
+def _last_user_text(body: dict) -> str:
+    for message in reversed(body.get("messages", [])):
+        if message["role"] != "user":
+            continue
+        content = message["content"]
+        if isinstance(content, str):
+            return content
+        return " ".join(
+            block.get("text", "") or str(block.get("content", "")) for block in content
+        )
+    return ""
+
+def _classify(text: str) -> str:
+    match = _QUESTION.search(text)
+    question = match.group(1) if match else text
+    for label, pattern in _ROUTE_RULES:
+        if pattern.search(question):
+            return label
+    return "다전공_제도"
+
+def _program(text: str) -> str:
+    match = _QUESTION.search(text)
+    question = match.group(1) if match else text
+    for keyword, program in _PROGRAMS.items():
+        if keyword in question:
+            return program
+    return ""
+
+def _system_text(body: dict) -> str:
+    system = body.get("system", "")
+    if isinstance(system, list):
+        return " ".join(block.get("text", "") for block in system)
+    return system
+
+def _usage(body: dict, output_tokens: int) -> dict:
+    system = body.get("system", "")
+    cached = isinstance(system, list) and any("cache_control" in block for block in system)
+    input_tokens = len(json.dumps(body, ensure_ascii=False)) // 3
+    return {
+        "input_tokens": 50 if cached else input_tokens,
+        "output_tokens": output_tokens,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": input_tokens if cached else 0,
+    }
+
+def _answer_chunks(n_tokens: int) -> List[str]:
+    """약 n_tokens 토큰 분량의 답변을 토큰(≈3글자) 단위 조각으로"""
+    text = "<answer>" + (_FILLER * (n_tokens * 3 // len(_FILLER) + 1))[:n_tokens * 3] + "</answer>"
+    return [text[i:i + 3] for i in range(0, len(text), 3)]
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+@app.post("/v1/messages")
+async def messages(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+
+    if random.random() < settings.error_rate:
+        return JSONResponse(
+            status_code=529,
+            content={"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}}
+        )
+
+    user_text = _last_user_text(body)
+    is_router = "classification router" in _system_text(body) or "tool_choice" in body
+
+    if "tool_choice" in body:
+        label = _classify(user_text)
+        tool_input = {"label": label}
+        program = _program(user_text)
+        if program:
+            tool_input["program_name"] = program
+        content = [{"type": "tool_use", "id": "toolu_stub", "name": body["tool_choice"]["name"], "input": tool_input}]
+        chunks = []
+        stop_reason = "tool_use"
+    elif is_router:
+        chunks = [f"<output>{_classify(user_text)}</output>"]
+        content = [{"type": "text", "text": chunks[0]}]
+        stop_reason = "end_turn"
+    else:
+        chunks = _answer_chunks(settings.answer_tokens)
+        content = [{"type": "text", "text": "".join(chunks)}]
+        stop_reason = "end_turn"
+
+    output_tokens = max(len(chunks), 1)
+    usage = _usage(body, output_tokens)
+    message = {
+        "id": f"msg_stub_{random.getrandbits(48):012x}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": usage,
+    }
+
+    first_token_ms = _lognormal_ms(settings.router_median_ms if is_router else settings.ttft_median_ms)
+    token_interval = 1.0 / settings.tokens_per_second
+
+    if not body.get("stream"):
+        await asyncio.sleep(first_token_ms / 1000 + output_tokens * token_interval)
+        return JSONResponse(message)
+
+    async def event_stream():
+        await asyncio.sleep(first_token_ms / 1000)
+        yield _sse({"type": "message_start", "message": {**message, "content": [], "usage": {**usage, "output_tokens": 1}}})
+        yield _sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+        for chunk in chunks:
+            yield _sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}})
+            await asyncio.sleep(token_interval)
+        yield _sse({"type": "content_block_stop", "index": 0})
+        yield _sse({
+            "type": "message_delta",
+            "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+            "usage": {"output_tokens": output_tokens}
+        })
+        yield _sse({"type": "message_stop"})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+def main():
+    parser = argparse.ArgumentParser(description="Anthropic Messages API 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--ttft-median-ms", type=float, default=StubSettings.ttft_median_ms, help="답변 첫 토큰 지연 중앙값")
+    parser.add_argument("--ttft-sigma", type=float, default=StubSettings.ttft_sigma, help="로그정규 분포 sigma (클수록 꼬리 지연 증가)")
+    parser.add_argument("--router-median-ms", type=float, default=StubSettings.router_median_ms, help="라우터 호출 지연 중앙값")
+    parser.add_argument("--tokens-per-second", type=float, default=StubSettings.tokens_per_second)
+    parser.add_argument("--answer-tokens", type=int, default=StubSettings.answer_tokens)
+    parser.add_argument("--error-rate", type=float, default=StubSettings.error_rate, help="529 overloaded 응답 비율")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings.ttft_median_ms = args.ttft_median_ms
+    settings.ttft_sigma = args.ttft_sigma
+    settings.router_median_ms = args.router_median_ms
+    settings.tokens_per_second = args.tokens_per_second
+    settings.answer_tokens = args.answer_tokens
+    settings.error_rate = args.error_rate
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
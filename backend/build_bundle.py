@@ -0,0 +1,78 @@
+"""
+지식 번들 빌드 CLI
+config.json, 프롬프트, 데이터 파일과 컴파일된 템플릿 / 전공 현황 / 교과과정 표를 스냅샷 파일 하나로 묶음
+
+실행 (backend 디렉토리에서, 배포 빌드 단계에 넣는 것을 권장):
+    python build_bundle.py
+    python build_bundle.py --out /tmp/knowledge.bundle   # 서버는 DAWANGI_BUNDLE 환경 변수로 경로 지정
+
+번들은 원본 파일의 mtime/크기를 기록하므로 배포될 파일과 같은 체크아웃에서 빌드해야 그대로 사용됨
+(바뀐 파일은 서버가 디스크에서 다시 읽음)
+"""
+import json
+import argparse
+from pathlib import Path
+
+from knowledge_bundle import knowledge_bundle, write_bundle, bundle_path, ROOT_DIR
+from data_loader import (
+    load_config, load_file, file_signature, get_prompt_template, template_bundle_key, template_sources,
+    load_program_catalog, PROGRAM_CATALOG_PATH
+)
+from curriculum_index import parse_curriculum
+
+SOURCE_GLOBS = ("config.json", "prompt/*.txt", "data/**/*.md")
+
+def collect_sources() -> dict:
+    """원본 경로 → (내용, 시그니처)"""
+    sources = {}
+    for pattern in SOURCE_GLOBS:
+        for path in sorted(ROOT_DIR.glob(pattern)):
+            relative = path.relative_to(ROOT_DIR).as_posix()
+            sources[relative] = (load_file(relative), file_signature(relative))
+    return sources
+
+def collect_derived() -> dict:
+    """파생 항목 이름 → (내용, 의존 원본 경로 목록)"""
+    derived = {}
+    routing = load_config()["routing"]
+
+    for label, route_config in routing.items():
+        programs = route_config.get("available_programs", []) if "data_template" in route_config else [None]
+        for program in programs:
+            template = get_prompt_template(label, program)
+            derived[template_bundle_key(label, program)] = (template.text, template_sources(label, program))
+
+    derived["catalog"] = (
+        json.dumps(load_program_catalog(), ensure_ascii=False),
+        [PROGRAM_CATALOG_PATH]
+    )
+
+    curriculum = routing["융합전공_교과과정"]
+    for program in curriculum.get("available_programs", []):
+        path = curriculum["data_template"].replace("{program_name}", program)
+        courses = [course.to_dict() for course in parse_curriculum(program, load_file(path))]
+        derived[f"curriculum:{program}"] = (json.dumps(courses, ensure_ascii=False), [path])
+
+    return derived
+
+def main():
+    parser = argparse.ArgumentParser(description="지식 번들 빌드")
+    parser.add_argument("--out", default=str(bundle_path()), help="번들 저장 경로")
+    args = parser.parse_args()
+
+    # 기존 번들이 아니라 디스크 원본에서 빌드
+    knowledge_bundle.disable()
+
+    out_path = Path(args.out)
+    manifest = write_bundle(out_path, collect_sources(), collect_derived())
+    print(json.dumps({
+        "path": str(out_path),
+        "version": manifest["version"],
+        "built_at": manifest["built_at"],
+        "sources": len(manifest["sources"]),
+        "derived": sorted(manifest["derived"]),
+        "bytes": out_path.stat().st_size
+    }, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+서킷 브레이커 모듈
+업스트림(Anthropic API) 장애가 이어지면 일정 시간 호출을 막고 즉시 실패시켜 스레드/소켓이 쌓이지 않게 함
+"""
+import time
+import threading
+from typing import Optional
+
+from data_loader import load_config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않고 바로 실패"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"circuit open, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    연속 실패 기반 서킷 브레이커
+
+    - closed: 정상. 연속 실패가 failure_threshold에 도달하면 open
+    - open: reset_timeout 동안 모든 호출을 CircuitOpenError로 즉시 거부
+    - half_open: reset_timeout 후 half_open_max_calls개의 시험 호출만 허용,
+      성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def before_call(self) -> bool:
+        """
+        호출 전 확인 (열려 있으면 CircuitOpenError)
+
+        Returns:
+            half_open 시험 호출 허가를 받았으면 True (결과를 기록하지 못하면 release_trial로 반납)
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.rejected += 1
+            raise CircuitOpenError(self._retry_after())
+
+    def release_trial(self) -> None:
+        """성공/실패를 기록하지 못하고 끝난 시험 호출(취소, 입장 거부 등)의 허가 반납"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            self._failures += 1
+            if state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_after": round(self._retry_after(), 1) if state == OPEN else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected
+            }
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+def _create_breaker(settings: Optional[dict] = None) -> CircuitBreaker:
+    """config.json의 llm.circuit_breaker 설정으로 생성"""
+    if settings is None:
+        settings = load_config().get("llm", {}).get("circuit_breaker", {})
+    return CircuitBreaker(
+        failure_threshold=settings.get("failure_threshold", 5),
+        reset_timeout=settings.get("reset_timeout_seconds", 30.0),
+        half_open_max_calls=settings.get("half_open_max_calls", 1)
+    )
+
+# 싱글톤 인스턴스 (Anthropic API 전체에 하나)
+llm_breaker = _create_breaker()
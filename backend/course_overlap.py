@@ -0,0 +1,494 @@
+"""
+교과목 중복 인정 모듈
+data/majors/*_교과과정.md의 교육과정 / 타학과 인정 / 중복(대체) 인정 표를 교과목번호 역색인으로 묶고,
+학생의 전공 목록과 이수 교과목으로 전공별 인정 학점, 전공 간 중복, 제1전공 중복인정 학점을 계산
+"""
+import re
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from data_loader import load_config, load_file, file_signature, PROGRAM_CATALOG_PATH
+from curriculum_index import curriculum_index, parse_markdown_tables
+
+_CURRICULUM_HEADER = ["학년", "학기", "이수구분", "교과목번호"]
+_COURSE_NUMBER = re.compile(r"^\d{5,}$")
+_BR = re.compile(r"<br\s*/?>", re.IGNORECASE)
+# 카드형 셀 항목: "**교과목번호**: 6543093"
+_CARD_FIELD = re.compile(r"^\*\*([^*]+)\*\*\s*:\s*(.*)$")
+# 과목명 뒤 학점 표기: "회계원리 (3-3-0)"
+_CREDIT_SUFFIX = re.compile(r"\s*\((\d+)-\d+-[^)]*\)\s*$")
+_LEADING_INT = re.compile(r"^\s*(\d+)")
+_ENGLISH_SUFFIX = re.compile(r"\s*\(([^()]*[A-Za-z][^()]*)\)\s*$")
+
+# 요청별 이수 교과목 (/api/chat 등에서 프로필로 받은 값, 요청 밖에서는 빈 튜플)
+_completed: ContextVar[Tuple[str, ...]] = ContextVar("completed_courses", default=())
+
+@dataclass(frozen=True, slots=True)
+class CourseListing:
+    """한 전공에서 인정되는 교과목 하나"""
+    program: str
+    number: str
+    name: str
+    department: str
+    category: str            # 전필 / 전선 (타학과 인정은 전선, 대체 교과목은 대상 교과목의 이수구분)
+    credits: int
+    credits_estimated: bool  # 표에 학점이 없어 기본값을 쓴 경우
+    source: str              # curriculum(교육과정표) / recognized(타학과 인정) / equivalent(중복·대체 인정)
+    counts_as: str           # 이 교과목으로 인정되는 교육과정 교과목번호 (대체 교과목이 아니면 자기 번호)
+
+    def to_dict(self) -> dict:
+        return {
+            "program": self.program,
+            "number": self.number,
+            "name": self.name,
+            "department": self.department,
+            "category": self.category,
+            "credits": self.credits,
+            "credits_estimated": self.credits_estimated,
+            "source": self.source,
+            "counts_as": self.counts_as
+        }
+
+def _clean(cell: str) -> str:
+    return _BR.sub(" ", cell).replace("**", "").strip()
+
+def _credit(text: str) -> Optional[int]:
+    """'3-3-0' → 3, '-' / '' → None"""
+    match = _LEADING_INT.match(text or "")
+    return int(match.group(1)) if match else None
+
+def _course_name(text: str) -> str:
+    """'통계적공정관리 (Statistical Process Control)' → '통계적공정관리'"""
+    return _ENGLISH_SUFFIX.sub("", _CREDIT_SUFFIX.sub("", text)).strip()
+
+def _parse_card(cell: str) -> Optional[dict]:
+    """
+    카드형 셀 파싱
+
+    '**교과목번호**: 6210001<br>**교과목**: 회계원리 (3-3-0)<br>**개설학과**: 경영학부'
+    → {"number", "name", "department", "credits"} (교과목번호가 없으면 None)
+    """
+    fields: Dict[str, str] = {}
+    key = None
+    for part in _BR.split(cell):
+        part = part.strip()
+        match = _CARD_FIELD.match(part)
+        if match:
+            key = match.group(1).strip()
+            fields[key] = match.group(2).strip()
+        elif key and part:
+            fields[key] += " " + part
+
+    number = fields.get("교과목번호", "")
+    if not _COURSE_NUMBER.match(number):
+        return None
+
+    name = fields.get("교과목") or fields.get("교과목명") or ""
+    credits = _credit(fields.get("학점", ""))
+    suffix = _CREDIT_SUFFIX.search(name)
+    if credits is None and suffix:
+        credits = int(suffix.group(1))
+    return {
+        "number": number,
+        "name": _course_name(name),
+        "department": fields.get("개설학과", ""),
+        "credits": credits
+    }
+
+def _column(header: List[str], *names: str) -> Optional[int]:
+    for i, title in enumerate(header):
+        if any(title.startswith(name) for name in names):
+            return i
+    return None
+
+def _cell(cells: List[str], index: Optional[int]) -> str:
+    return _clean(cells[index]) if index is not None and index < len(cells) else ""
+
+def parse_extra_listings(md_content: str) -> List[Tuple[str, dict, Optional[str]]]:
+    """
+    교육과정표 밖의 인정 교과목 표 파싱
+
+    Returns:
+        [(source, 교과목 {"number", "name", "department", "credits"}, 대상 교과목번호), ...]
+        - recognized: 타학과 전공선택 인정 표 (대상 교과목번호 None)
+        - equivalent: 중복/대체/상호 인정 표 (왼쪽 교육과정 교과목 대신 인정되는 오른쪽 교과목)
+    """
+    listings = []
+    for heading, header, rows in parse_markdown_tables(md_content, any_heading=True):
+        if header[:4] == _CURRICULUM_HEADER:
+            continue
+
+        number_columns = [i for i, title in enumerate(header) if title == "교과목번호"]
+        dept_column = _column(header, "개설학과")
+        credit_column = _column(header, "학점")
+
+        if len(number_columns) >= 2:
+            # | 융합전공 교과목 | 교과목번호 | 타학과 교과목 | 교과목번호 | 개설학과 | 학점 |
+            target_column, number_column = number_columns[:2]
+            for cells in rows:
+                number = _cell(cells, number_column)
+                if not _COURSE_NUMBER.match(number):
+                    continue
+                target = _cell(cells, target_column)
+                course = {
+                    "number": number,
+                    "name": _course_name(_cell(cells, number_column - 1)),
+                    "department": _cell(cells, dept_column),
+                    "credits": _credit(_cell(cells, credit_column))
+                }
+                if _COURSE_NUMBER.match(target):
+                    listings.append(("equivalent", course, target))
+                else:
+                    # 대상 교과목번호가 없는 행('-')은 타학과 인정 교과목으로 취급
+                    listings.append(("recognized", course, None))
+
+        elif len(number_columns) == 1:
+            # | (개설학과) | 교과목번호 | 교과목명(영문) | (학점) | - 개설학과 열이 없으면 #### 학과명 제목
+            number_column = number_columns[0]
+            name_column = _column(header, "교과목명")
+            for cells in rows:
+                number = _cell(cells, number_column)
+                if not _COURSE_NUMBER.match(number):
+                    continue
+                listings.append(("recognized", {
+                    "number": number,
+                    "name": _course_name(_cell(cells, name_column)),
+                    "department": _cell(cells, dept_column) or heading,
+                    "credits": _credit(_cell(cells, credit_column))
+                }, None))
+
+        else:
+            # | 융합전공 교과목(카드) | 대체 가능 교과목(카드) | - 왼쪽이 빈 행은 윗 행의 교과목
+            target = None
+            for cells in rows:
+                left = _parse_card(cells[0]) if cells else None
+                if left is not None:
+                    target = left
+                    listings.append(("recognized", left, None))
+                if target is None:
+                    continue
+                for i, cell in enumerate(cells[1:], start=1):
+                    card = _parse_card(cell)
+                    if card is None:
+                        continue
+                    if not card["department"] and i < len(header):
+                        card["department"] = header[i]
+                    listings.append(("equivalent", card, target["number"]))
+    return listings
+
+def parse_national_projects(catalog_md: str) -> List[str]:
+    """전공 현황 파일에서 '참여 국책사업'이 있는 전공 이름 (공백 제거) 목록"""
+    names = []
+    for section in re.split(r"^###\s+", catalog_md, flags=re.MULTILINE)[1:]:
+        title, _, body = section.partition("\n")
+        match = re.search(r"참여 국책사업\**\s*:\s*(.+)", body)
+        if match and match.group(1).strip() not in ("-", "없음"):
+            names.append(re.sub(r"^\d+\.\s*", "", title).replace(" ", ""))
+    return names
+
+def _same_department(course_department: str, profile_dept: str) -> bool:
+    """개설학과가 소속 학과와 같은지 ('소프트웨어학부 인공지능전공' ↔ '소프트웨어학부' 포함)"""
+    if not course_department or not profile_dept:
+        return False
+    profile = profile_dept.replace(" ", "")
+    return course_department.replace(" ", "") == profile or profile in course_department.split()
+
+class CourseOverlapIndex:
+    """
+    교과목번호 → 그 교과목을 인정하는 전공별 항목 역색인
+
+    - 교육과정표는 교과과정 인덱스의 결과를 그대로 쓰고, 타학과 인정 / 중복·대체 인정 표를 더함
+    - 표에 학점이 없는 교과목('-')은 다른 표의 같은 교과목 학점, 그것도 없으면 default_credits (추정 표시)
+    - 제1전공 중복인정 상한: 전공별 program_caps > 국책사업 참여 전공 national_project_cap > first_major_cap
+    - 원본(config, 전공 파일, 전공 현황)이 바뀌면 다시 구성
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._by_program: Dict[str, Dict[str, CourseListing]] = {}
+        self._by_number: Dict[str, Tuple[CourseListing, ...]] = {}
+        self._national: Set[str] = set()
+
+    def settings(self) -> dict:
+        return load_config().get("course_overlap", {})
+
+    # --- 요청별 이수 교과목 ---
+
+    def normalize(self, courses: Optional[Iterable[str]]) -> Tuple[str, ...]:
+        """공백 제거 + 중복 제거 (입력 순서 유지, 최대 max_completed_courses개)"""
+        limit = self.settings().get("max_completed_courses", 200)
+        seen = []
+        for course in courses or ():
+            number = str(course).strip()
+            if number and number not in seen:
+                seen.append(number)
+        return tuple(seen[:limit])
+
+    @contextmanager
+    def scope(self, courses: Optional[Iterable[str]]):
+        """이 블록의 답변 프롬프트에 넣을 이수 교과목 지정"""
+        token = _completed.set(self.normalize(courses))
+        try:
+            yield
+        finally:
+            _completed.reset(token)
+
+    def completed(self) -> Tuple[str, ...]:
+        return _completed.get()
+
+    def prompt_json(self, program_name: Optional[str], profile_dept: str = "") -> str:
+        """
+        프롬프트 {{completed_courses_json}} 슬롯 값
+
+        전공이 정해진 요청이면 이수 교과목마다 그 전공에서의 인정 여부/이수구분/학점/제1전공 중복인정 여부를,
+        아니면 교과목번호만 넣음
+        """
+        completed = self.completed()
+        if not completed:
+            return "[]"
+
+        self.ensure()
+        if program_name not in self._by_program:
+            return json.dumps([{"number": number} for number in completed], ensure_ascii=False, separators=(",", ":"))
+
+        result = self._program_result(program_name, completed, profile_dept)
+        double_counted = set(result["first_major"]["courses"])
+        counted = {course["number"]: course for course in result["courses"]}
+        items = []
+        for number in completed:
+            course = counted.get(number)
+            if course is None:
+                items.append({"number": number, "counted": False})
+                continue
+            item = {
+                "number": number,
+                "name": course["name"],
+                "category": course["category"],
+                "credits": course["credits"],
+                "counted": True,
+                "first_major_double_count": number in double_counted
+            }
+            if course["counts_as"] != number:
+                item["counts_as"] = course["counts_as"]
+            items.append(item)
+        return json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+
+    # --- 조회 / 계산 ---
+
+    def programs(self) -> List[str]:
+        self.ensure()
+        return list(self._by_program)
+
+    def find(self, number: str) -> List[CourseListing]:
+        """교과목번호를 인정하는 모든 전공 항목"""
+        self.ensure()
+        return list(self._by_number.get(number, ()))
+
+    def first_major_cap(self, program: str) -> int:
+        self.ensure()
+        settings = self.settings()
+        caps = settings.get("program_caps", {})
+        if program in caps:
+            return caps[program]
+        if program in self._national:
+            return settings.get("national_project_cap_credits", 12)
+        return settings.get("first_major_cap_credits", 9)
+
+    def calculate(self, programs: List[str], completed: Iterable[str], profile_dept: str = "") -> dict:
+        """
+        전공별 인정 학점 + 전공 간 중복 + 제1전공 중복인정 학점 계산
+
+        Args:
+            programs: 이수 중인 전공 ID 목록
+            completed: 이수한 교과목번호 목록
+            profile_dept: 소속 학과 (제1전공)
+
+        Raises:
+            KeyError: 없는 전공
+        """
+        self.ensure()
+        unknown = [program for program in programs if program not in self._by_program]
+        if unknown:
+            raise KeyError(unknown[0])
+
+        completed = self.normalize(completed)
+        results = {program: self._program_result(program, completed, profile_dept) for program in programs}
+
+        # 선택한 전공 두 곳 이상에서 인정되는 이수 교과목
+        overlaps, unique_credits, unmatched = [], 0, []
+        for number in completed:
+            owners = [
+                (program, course) for program, result in results.items()
+                for course in result["courses"] if course["number"] == number
+            ]
+            if not owners:
+                unmatched.append(number)
+                continue
+            credits = owners[0][1]["credits"]
+            unique_credits += credits
+            if len(owners) >= 2:
+                overlaps.append({
+                    "number": number,
+                    "name": owners[0][1]["name"],
+                    "credits": credits,
+                    "programs": [program for program, _ in owners]
+                })
+
+        return {
+            "profile_dept": profile_dept,
+            "completed": len(completed),
+            "programs": results,
+            "overlaps": overlaps,
+            "overlap_credits": sum(item["credits"] for item in overlaps),
+            "unique_credits": unique_credits,
+            "unmatched": unmatched
+        }
+
+    def _program_result(self, program: str, completed: Tuple[str, ...], profile_dept: str) -> dict:
+        listings = self._by_program[program]
+        courses, duplicates = [], []
+        satisfied: Dict[str, str] = {}
+        for number in completed:
+            listing = listings.get(number)
+            if listing is None:
+                continue
+            if listing.counts_as in satisfied:
+                # 같은 교육과정 교과목으로 이미 인정된 대체 교과목은 한 번만 인정
+                duplicates.append({"number": number, "counts_as": listing.counts_as, "counted_by": satisfied[listing.counts_as]})
+                continue
+            satisfied[listing.counts_as] = number
+            courses.append(listing.to_dict())
+
+        credits = {"전필": 0, "전선": 0}
+        for course in courses:
+            credits[course["category"]] = credits.get(course["category"], 0) + course["credits"]
+        credits["total"] = sum(course["credits"] for course in courses)
+
+        missing_required = [
+            {"number": listing.number, "name": listing.name, "credits": listing.credits}
+            for listing in listings.values()
+            if listing.source == "curriculum" and listing.category == "전필" and listing.number not in satisfied
+        ]
+
+        # 소속 학과 개설 교과목은 제1전공과 중복인정 (상한까지, 과목 단위)
+        cap = self.first_major_cap(program)
+        double_counted, over_cap, used = [], [], 0
+        for course in courses:
+            if not _same_department(course["department"], profile_dept):
+                continue
+            if used + course["credits"] <= cap:
+                used += course["credits"]
+                double_counted.append(course["number"])
+            else:
+                over_cap.append(course["number"])
+
+        return {
+            "courses": courses,
+            "duplicates": duplicates,
+            "credits": credits,
+            "missing_required": missing_required,
+            "first_major": {
+                "cap": cap,
+                "national_project": program in self._national,
+                "credits": used,
+                "courses": double_counted,
+                "over_cap": over_cap
+            }
+        }
+
+    # --- 색인 구성 ---
+
+    def ensure(self) -> None:
+        """원본 파일이 바뀌었으면 색인 재구성"""
+        paths = self._source_paths()
+        signature = tuple(file_signature(path, pinned=False) for _, path in paths) + (
+            file_signature(PROGRAM_CATALOG_PATH, pinned=False),
+        )
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if signature != self._signature:
+                self._build(paths)
+                self._signature = signature
+
+    def _source_paths(self) -> List[Tuple[str, str]]:
+        route_config = load_config()["routing"]["융합전공_교과과정"]
+        return [
+            (program, route_config["data_template"].replace("{program_name}", program))
+            for program in route_config.get("available_programs", [])
+        ]
+
+    def _build(self, paths: List[Tuple[str, str]]) -> None:
+        raw: Dict[str, Dict[str, dict]] = {}
+        for program, path in paths:
+            entries = raw.setdefault(program, {})
+            for course in curriculum_index.courses(program) or []:
+                entries.setdefault(course.number, {
+                    "number": course.number,
+                    "name": course.name,
+                    "department": course.department,
+                    "category": course.category,
+                    "credits": course.credits or None,
+                    "source": "curriculum",
+                    "counts_as": course.number
+                })
+
+            for source, course, target in parse_extra_listings(load_file(path)):
+                if course["number"] in entries:
+                    continue
+                category = "전선"
+                if target is not None:
+                    # 대체 교과목은 대상 교과목의 이수구분으로 인정
+                    category = entries[target]["category"] if target in entries else "전선"
+                entries[course["number"]] = {
+                    **course,
+                    "category": category,
+                    "source": source,
+                    "counts_as": target or course["number"]
+                }
+
+        # 학점이 빠진 교과목은 다른 표의 같은 교과목 학점으로 채움
+        known = {}
+        for entries in raw.values():
+            for entry in entries.values():
+                if entry["credits"]:
+                    known.setdefault(entry["number"], entry["credits"])
+
+        default_credits = self.settings().get("default_credits", 3)
+        by_program: Dict[str, Dict[str, CourseListing]] = {}
+        by_number: Dict[str, List[CourseListing]] = {}
+        for program, entries in raw.items():
+            listings = {}
+            for number, entry in entries.items():
+                credits = entry["credits"] or known.get(number)
+                listing = CourseListing(
+                    program=program,
+                    number=number,
+                    name=entry["name"],
+                    department=entry["department"],
+                    category=entry["category"],
+                    credits=credits or default_credits,
+                    credits_estimated=credits is None,
+                    source=entry["source"],
+                    counts_as=entry["counts_as"]
+                )
+                listings[number] = listing
+                by_number.setdefault(number, []).append(listing)
+            by_program[program] = listings
+
+        names = parse_national_projects(load_file(PROGRAM_CATALOG_PATH))
+        self._national = {
+            program for program in by_program
+            if any(program.split("_")[0] in name for name in names)
+        }
+        self._by_program = by_program
+        self._by_number = {number: tuple(listings) for number, listings in by_number.items()}
+
+# 싱글톤 인스턴스
+course_overlap = CourseOverlapIndex()
@@ -0,0 +1,249 @@
+"""
+교과과정 인덱스 모듈
+data/majors/*_교과과정.md의 교육과정 표를 파싱해 전공/교과목번호/학년·학기/이수구분으로 조회
+"""
+import re
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from data_loader import load_config, load_file, file_signature
+from knowledge_bundle import knowledge_bundle
+
+CATEGORY_ALIASES = {
+    "전필": "전필",
+    "전공필수": "전필",
+    "전선": "전선",
+    "전공선택": "전선",
+}
+
+_BR = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_ENGLISH_NAME = re.compile(r"^(.*?)\s*\(([^()]*[A-Za-z][^()]*)\)\s*$")
+
+@dataclass(frozen=True, slots=True)
+class Course:
+    """교육과정 표의 한 행"""
+    program: str
+    year: Optional[int]
+    semester: Optional[int]
+    category: str
+    number: str
+    name: str
+    name_en: str
+    department: str
+    credits: int
+    credit_detail: str
+
+    def to_dict(self) -> dict:
+        return {
+            "program": self.program,
+            "year": self.year,
+            "semester": self.semester,
+            "category": self.category,
+            "number": self.number,
+            "name": self.name,
+            "name_en": self.name_en,
+            "department": self.department,
+            "credits": self.credits,
+            "credit_detail": self.credit_detail
+        }
+
+def _clean_cell(cell: str) -> str:
+    return _BR.sub(" ", cell).replace("**", "").strip()
+
+def parse_markdown_tables(
+    md_content: str,
+    any_heading: bool = False
+) -> List[Tuple[str, List[str], List[List[str]]]]:
+    """
+    마크다운 표 파싱
+
+    Args:
+        any_heading: True면 ## 대신 수준과 관계없이 가장 가까운 제목 (#### 학과명 등)
+
+    Returns:
+        [(표 위의 가장 가까운 ## 제목, 헤더, 행 목록), ...]
+    """
+    tables = []
+    heading = ""
+    header: Optional[List[str]] = None
+    rows: List[List[str]] = []
+
+    def flush():
+        if header is not None:
+            tables.append((heading, header, rows))
+
+    for line in md_content.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("## ") or (any_heading and stripped.startswith("#")):
+            heading = stripped.lstrip("#").strip()
+        if not stripped.startswith("|"):
+            flush()
+            header, rows = None, []
+            continue
+
+        cells = [c.strip() for c in stripped.strip("|").split("|")]
+        if header is None:
+            header = [_clean_cell(c) for c in cells]
+        elif all(set(c) <= set(":- ") for c in cells):
+            continue  # 구분선
+        else:
+            rows.append(cells)
+
+    flush()
+    return tables
+
+def _split_name(raw: str) -> Tuple[str, str]:
+    """'파이썬 프로그래밍<br>(Python Programming)' → ('파이썬 프로그래밍', 'Python Programming')"""
+    text = _clean_cell(raw)
+    match = _ENGLISH_NAME.match(text)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return text, ""
+
+def _to_int(value: str) -> Optional[int]:
+    return int(value) if value.strip().isdigit() else None
+
+def parse_curriculum(program: str, md_content: str) -> List[Course]:
+    """전공 교과과정 파일의 교육과정 표(학년/학기/이수구분/...)를 Course 목록으로 변환"""
+    courses = []
+    for _, header, rows in parse_markdown_tables(md_content):
+        if header[:4] != ["학년", "학기", "이수구분", "교과목번호"]:
+            continue
+        for cells in rows:
+            if len(cells) < 7:
+                continue
+            year, semester, category, number, name, department, credit = cells[:7]
+            name_ko, name_en = _split_name(name)
+            credit_detail = _clean_cell(credit)
+            courses.append(Course(
+                program=program,
+                year=_to_int(year),
+                semester=_to_int(semester),
+                category=CATEGORY_ALIASES.get(_clean_cell(category), _clean_cell(category)),
+                number=_clean_cell(number),
+                name=name_ko,
+                name_en=name_en,
+                department=_clean_cell(department),
+                credits=_to_int(credit_detail.split("-")[0]) or 0,
+                credit_detail=credit_detail
+            ))
+    return courses
+
+class CurriculumIndex:
+    """
+    전공별 교육과정 인덱스
+
+    슬롯별 사전(전공, 교과목번호, (전공, 학년, 학기), (전공, 이수구분))을 미리 만들어
+    조회 시 파일 읽기나 표 파싱 없이 바로 반환
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._by_program: Dict[str, Tuple[Course, ...]] = {}
+        self._by_number: Dict[str, Tuple[Course, ...]] = {}
+        self._by_term: Dict[Tuple[str, Optional[int], Optional[int]], Tuple[Course, ...]] = {}
+        self._by_category: Dict[Tuple[str, str], Tuple[Course, ...]] = {}
+
+    def programs(self) -> List[str]:
+        self.ensure()
+        return list(self._by_program)
+
+    def courses(
+        self,
+        program: str,
+        category: Optional[str] = None,
+        year: Optional[int] = None,
+        semester: Optional[int] = None
+    ) -> Optional[List[Course]]:
+        """
+        조건에 맞는 교과목 목록 (교육과정 표 순서 유지)
+
+        Returns:
+            없는 전공이면 None
+        """
+        self.ensure()
+        if program not in self._by_program:
+            return None
+
+        category = CATEGORY_ALIASES.get(category, category) if category else None
+        if year is not None and semester is not None:
+            candidates = self._by_term.get((program, year, semester), ())
+        elif category:
+            candidates = self._by_category.get((program, category), ())
+        else:
+            candidates = self._by_program[program]
+
+        return [
+            c for c in candidates
+            if (category is None or c.category == category)
+            and (year is None or c.year == year)
+            and (semester is None or c.semester == semester)
+        ]
+
+    def find(self, number: str) -> List[Course]:
+        """교과목번호로 모든 전공의 교과목 조회"""
+        self.ensure()
+        return list(self._by_number.get(number, ()))
+
+    def summary(self, program: str) -> Optional[dict]:
+        """이수구분별 과목 수 / 학점 합계"""
+        courses = self.courses(program)
+        if courses is None:
+            return None
+
+        summary = {}
+        for course in courses:
+            item = summary.setdefault(course.category, {"courses": 0, "credits": 0})
+            item["courses"] += 1
+            item["credits"] += course.credits
+        return summary
+
+    def ensure(self) -> None:
+        """원본 파일이 바뀌었으면 인덱스 재구성"""
+        paths = self._source_paths()
+        signature = tuple(file_signature(p, pinned=False) for _, p in paths)
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if signature != self._signature:
+                self._build(paths)
+                self._signature = signature
+
+    def _source_paths(self) -> List[Tuple[str, str]]:
+        route_config = load_config()["routing"]["융합전공_교과과정"]
+        return [
+            (program, route_config["data_template"].replace("{program_name}", program))
+            for program in route_config.get("available_programs", [])
+        ]
+
+    def _build(self, paths: List[Tuple[str, str]]) -> None:
+        by_program, by_number, by_term, by_category = {}, {}, {}, {}
+        for program, path in paths:
+            courses = self._load_courses(program, path)
+            by_program[program] = courses
+            for course in courses:
+                by_number.setdefault(course.number, []).append(course)
+                by_term.setdefault((program, course.year, course.semester), []).append(course)
+                by_category.setdefault((program, course.category), []).append(course)
+
+        def freeze(index: dict) -> dict:
+            return {key: tuple(value) for key, value in index.items()}
+
+        self._by_program = freeze(by_program)
+        self._by_number = freeze(by_number)
+        self._by_term = freeze(by_term)
+        self._by_category = freeze(by_category)
+
+    def _load_courses(self, program: str, path: str) -> List[Course]:
+        """번들에 파싱된 표가 있으면 사용, 없으면 마크다운 파싱"""
+        bundled = knowledge_bundle.derived(f"curriculum:{program}")
+        if bundled is not None:
+            return [Course(**row) for row in json.loads(bundled)]
+        return parse_curriculum(program, load_file(path))
+
+# 싱글톤 인스턴스
+curriculum_index = CurriculumIndex()
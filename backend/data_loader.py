@@ -3,15 +3,40 @@ MD 파일 로더 모듈
 프롬프트와 데이터 파일을 로드하여 LLM에 주입
 """
 import os
+import re
 import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional, Tuple
+from diagnostics import diagnostics
+from section_retriever import section_retriever
+from knowledge_bundle import knowledge_bundle
 
 # 프로젝트 루트 경로
 ROOT_DIR = Path(__file__).parent.parent
 
+# 요청마다 값이 바뀌는 슬롯 (나머지 플레이스홀더는 컴파일 시점에 고정)
+# DATA: 섹션 검색을 쓰는 라벨은 데이터 블록도 질문마다 달라짐
+# completed_courses_json: 프로필의 이수 교과목 (course_overlap이 전공별로 계산, 없으면 "[]")
+DYNAMIC_SLOTS = ("QUESTION", "profile_dept", "selected_program", "completed_courses_json", "DATA")
+_SLOT_PATTERN = re.compile(r"\{\{(" + "|".join(DYNAMIC_SLOTS) + r")\}\}")
+
+# JSON 플레이스홀더 기본값
+STATIC_DEFAULTS = {
+    "eligible_programs_json": "[]",
+    "entry_year": "2024",
+    "version": "2025-06",
+}
+
 def load_file(file_path: str) -> str:
-    """파일 내용을 읽어서 반환"""
+    """파일 내용을 읽어서 반환 (지식 번들에 최신 내용이 있으면 번들에서)"""
+    bundled = knowledge_bundle.read(file_path)
+    if bundled is not None:
+        return bundled
+
     full_path = ROOT_DIR / file_path
     if not full_path.exists():
         raise FileNotFoundError(f"File not found: {full_path}")
@@ -19,11 +44,107 @@ def load_file(file_path: str) -> str:
     with open(full_path, "r", encoding="utf-8") as f:
         return f.read()
 
+class SourceTable:
+    """
+    파일 감시기가 발행하는 감시 대상 파일 시그니처 스냅샷 (불변)
+
+    발행되어 있으면 file_signature는 stat 대신 이 표를 사용하고,
+    요청은 시작 시점의 표에 고정(pin)되어 처리 도중 새 버전이 발행돼도 같은 버전을 봄
+    """
+
+    def __init__(self, generation: int, signatures: Dict[str, Tuple[str, int, int]]):
+        self.generation = generation
+        self.signatures = signatures
+
+_published: Optional[SourceTable] = None
+_pinned: ContextVar[Optional[SourceTable]] = ContextVar("source_table", default=None)
+
+def publish_sources(table: Optional[SourceTable]) -> None:
+    """새 시그니처 표 발행 (None이면 감시 해제, 다시 stat으로 확인)"""
+    global _published
+    _published = table
+
+def published_sources() -> Optional[SourceTable]:
+    return _published
+
+def pin_sources() -> None:
+    """현재 요청(컨텍스트)을 지금 발행된 버전에 고정"""
+    _pinned.set(_published)
+
+@contextmanager
+def pinned_sources(table: SourceTable) -> Iterator[None]:
+    """발행 전의 새 버전으로 템플릿을 미리 만들 때 사용"""
+    token = _pinned.set(table)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+def file_signature(file_path: str, pinned: bool = True) -> Tuple[str, int, int]:
+    """
+    파일 변경 감지용 시그니처 (경로, mtime, 크기)
+
+    Args:
+        pinned: False면 요청 고정 버전 대신 최신 발행 버전 사용
+            (요청 간에 하나만 유지하는 전역 색인이 이전 버전으로 되돌아가 재구성되지 않도록)
+    """
+    table = (_pinned.get() if pinned else None) or _published
+    if table is not None:
+        signature = table.signatures.get(file_path)
+        if signature is not None:
+            return signature
+
+    try:
+        stat = (ROOT_DIR / file_path).stat()
+    except FileNotFoundError:
+        # 디스크에 없고 번들에만 있는 파일은 빌드 시점 시그니처 사용
+        signature = knowledge_bundle.signature(file_path)
+        if signature is None:
+            raise
+        return signature
+    return (file_path, stat.st_mtime_ns, stat.st_size)
+
+# 버전별로 최근 2개까지 유지 (교체 직후 이전 버전에 고정된 요청용)
+_KEEP_VERSIONS = 2
+
+def _keep_latest(versions: dict, key, value) -> dict:
+    """versions에 key를 추가한 새 dict (오래된 항목부터 _KEEP_VERSIONS개만 남김)"""
+    versions = {k: v for k, v in versions.items() if k != key}
+    versions[key] = value
+    while len(versions) > _KEEP_VERSIONS:
+        versions.pop(next(iter(versions)))
+    return versions
+
+_config_cache: Dict[tuple, Dict] = {}
+
 def load_config() -> Dict:
-    """config.json 파일 로드"""
-    config_path = ROOT_DIR / "config.json"
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """
+    config.json 파일 로드
+
+    파일이 바뀌지 않았으면 이전에 파싱한 결과를 그대로 반환 (호출자는 수정 금지)
+    """
+    global _config_cache
+    signature = file_signature("config.json")
+    config = _config_cache.get(signature)
+    if config is not None:
+        return config
+
+    config = json.loads(load_file("config.json"))
+    _config_cache = _keep_latest(_config_cache, signature, config)
+    return config
+
+_file_cache: Dict[str, Tuple[tuple, str]] = {}
+
+def load_file_cached(file_path: str) -> str:
+    """요청마다 쓰는 작은 파일용: 시그니처가 같으면 이전에 읽은 내용 재사용"""
+    signature = file_signature(file_path)
+    cached = _file_cache.get(file_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    text = load_file(file_path)
+    _file_cache[file_path] = (signature, text)
+    return text
 
 def inject_data_to_prompt(prompt: str, md_content: str, label: str) -> str:
     """
@@ -57,26 +178,101 @@ def inject_data_to_prompt(prompt: str, md_content: str, label: str) -> str:
 
     return prompt
 
-def get_prompt_and_data(
-    label: str,
-    program_name: Optional[str] = None,
-    profile_dept: str = "",
-    selected_program: str = "",
-    question: str = ""
-) -> tuple[str, str]:
+# 프롬프트 최상위 블록: <tag>...</tag>
+_BLOCK_PATTERN = re.compile(r"<(\w+)>.*?</\1>", re.DOTALL)
+
+class _SlotText:
+    """슬롯 위치를 미리 분리해 둔 문자열"""
+
+    def __init__(self, text: str):
+        # [문자열, 슬롯, 문자열, 슬롯, ..., 문자열] 형태로 분리
+        parts = _SLOT_PATTERN.split(text)
+        self._literals = parts[0::2]
+        self._slots = parts[1::2]
+
+    def render(self, values: Dict[str, str]) -> str:
+        out = [self._literals[0]]
+        for slot, literal in zip(self._slots, self._literals[1:]):
+            out.append(values.get(slot, ""))
+            out.append(literal)
+        return "".join(out)
+
+class PromptTemplate:
     """
-    라벨에 따라 프롬프트와 데이터를 로드하고 병합
+    (label, program) 조합별로 한 번만 컴파일되는 프롬프트 템플릿
 
-    Args:
-        label: 라우팅 라벨 (다전공_제도, 전공_현황 등)
-        program_name: 전공명 (융합전공_교과과정인 경우 필수)
-        profile_dept: 사용자 소속 학과
-        selected_program: 선택된 전공
-        question: 사용자 질문
+    데이터 주입과 고정 플레이스홀더 치환은 컴파일 시점에 끝내고,
+    요청마다 바뀌는 슬롯(DYNAMIC_SLOTS)만 남겨 한 번의 순회로 렌더링
 
-    Returns:
-        (prompt, data) 튜플
+    최상위 블록 중 슬롯이 없는 블록(지시문, 데이터)은 static_text로,
+    슬롯이 있는 블록(프로필, 질문)은 동적 부분으로 나눠 프롬프트 캐싱에 사용
     """
+
+    def __init__(
+        self,
+        label: str,
+        program_name: Optional[str],
+        text: str,
+        md_content: str,
+        data_path: str,
+        signature: tuple
+    ):
+        self.label = label
+        self.program_name = program_name
+        self.md_content = md_content
+        self.data_path = data_path
+        self.signature = signature
+        self.text = text
+        # 컴파일된 프롬프트 + 데이터 내용 해시 - 답변 캐시 키에 사용
+        self.content_hash = hashlib.sha256((text + "\0" + md_content).encode("utf-8")).hexdigest()[:16]
+        # 데이터 블록이 {{DATA}} 슬롯이면 질문별 섹션 검색 대상
+        self.retrieval = "{{DATA}}" in text
+
+        self._full = _SlotText(text)
+
+        static_blocks, dynamic_blocks = [], []
+        for match in _BLOCK_PATTERN.finditer(text):
+            block = match.group(0)
+            if _SLOT_PATTERN.search(block):
+                dynamic_blocks.append(block)
+            else:
+                static_blocks.append(block)
+
+        if static_blocks:
+            self.static_text = "\n\n".join(static_blocks)
+            self._dynamic = _SlotText("\n\n".join(dynamic_blocks))
+        else:
+            # 블록 구조가 없는 프롬프트는 전체를 동적 부분으로 취급
+            self.static_text = ""
+            self._dynamic = self._full
+
+    def render(self, **values: str) -> str:
+        """슬롯 값을 채워 최종 프롬프트 생성"""
+        return self._full.render(self._with_data(values))
+
+    def render_dynamic(self, **values: str) -> str:
+        """슬롯 값을 채워 요청마다 바뀌는 부분(프로필, 질문 등)만 생성"""
+        return self._dynamic.render(self._with_data(values))
+
+    def _with_data(self, values: Dict[str, str]) -> Dict[str, str]:
+        """섹션 검색 대상이면 질문과 관련된 섹션으로 DATA 슬롯 채움"""
+        if not self.retrieval or "DATA" in values:
+            return values
+
+        settings = load_config().get("retrieval", {})
+        values = dict(values)
+        values["DATA"] = section_retriever.retrieve(
+            self.data_path,
+            self.md_content,
+            values.get("QUESTION", ""),
+            top_k=settings.get("top_k", 3),
+            max_chars=settings.get("max_chars", 4000),
+            min_share=settings.get("min_share", 0.3)
+        )
+        return values
+
+def _source_paths(label: str, program_name: Optional[str]) -> Tuple[str, str]:
+    """라벨에 해당하는 (프롬프트 경로, 데이터 경로) 반환"""
     config = load_config()
 
     if label not in config["routing"]:
@@ -84,10 +280,6 @@ def get_prompt_and_data(
 
     route_config = config["routing"][label]
 
-    # 프롬프트 로드
-    prompt = load_file(route_config["prompt"])
-
-    # 데이터 로드
     if label == "융합전공_교과과정":
         if not program_name:
             raise ValueError("program_name is required for 융합전공_교과과정")
@@ -95,74 +287,181 @@ def get_prompt_and_data(
     else:
         data_path = route_config["data"]
 
+    return route_config["prompt"], data_path
+
+def template_bundle_key(label: str, program_name: Optional[str]) -> str:
+    """지식 번들의 컴파일된 템플릿 항목 이름"""
+    return f"template:{label}:{program_name or ''}"
+
+def template_sources(label: str, program_name: Optional[str]) -> list:
+    """템플릿이 의존하는 원본 파일 (config, 프롬프트, 데이터)"""
+    return ["config.json", *_source_paths(label, program_name)]
+
+def _compile_template(label: str, program_name: Optional[str]) -> PromptTemplate:
+    """프롬프트와 데이터를 읽어 템플릿으로 컴파일"""
+    prompt_path, data_path = _source_paths(label, program_name)
+    signature = (
+        file_signature("config.json"),
+        file_signature(prompt_path),
+        file_signature(data_path),
+    )
+
     md_content = load_file(data_path)
 
-    # 프롬프트에 데이터 주입
-    prompt = inject_data_to_prompt(prompt, md_content, label)
+    # 번들에 빌드 시점 그대로인 컴파일 결과가 있으면 재사용
+    prompt = knowledge_bundle.derived(template_bundle_key(label, program_name))
+    if prompt is None:
+        prompt = load_file(prompt_path)
+
+        # 프롬프트에 데이터 주입 (섹션 검색 라벨은 질문별로 채울 슬롯만 남김)
+        settings = load_config().get("retrieval", {})
+        if settings.get("enabled", False) and label in settings.get("labels", []):
+            prompt = inject_data_to_prompt(prompt, "{{DATA}}", label)
+        else:
+            prompt = inject_data_to_prompt(prompt, md_content, label)
+
+        # 고정 변수 치환
+        static_values = dict(STATIC_DEFAULTS)
+        static_values["program_name"] = program_name or ""
+        static_values["program_id"] = program_name or ""
+        for key, value in static_values.items():
+            prompt = prompt.replace("{{" + key + "}}", value)
+
+    return PromptTemplate(label, program_name, prompt, md_content, data_path, signature)
+
+# (라벨, 전공) → {시그니처: 템플릿}
+_template_cache: Dict[Tuple[str, str], Dict[tuple, PromptTemplate]] = {}
+_template_lock = threading.Lock()
+
+def get_prompt_template(label: str, program_name: Optional[str] = None) -> PromptTemplate:
+    """
+    컴파일된 프롬프트 템플릿 반환
+
+    원본 파일(config, 프롬프트, 데이터)이 바뀌면 다시 컴파일.
+    직전 버전도 남겨 두어 교체 전에 시작한 요청은 끝까지 같은 템플릿을 사용
+    """
+    prompt_path, data_path = _source_paths(label, program_name)
+    key = (label, program_name or "")
+
+    current = (
+        file_signature("config.json"),
+        file_signature(prompt_path),
+        file_signature(data_path),
+    )
+
+    template = _template_cache.get(key, {}).get(current)
+    if template is not None:
+        return template
+
+    with _template_lock:
+        # 다른 스레드가 먼저 컴파일했으면 재사용
+        versions = _template_cache.get(key, {})
+        template = versions.get(current)
+        if template is None:
+            template = _compile_template(label, program_name)
+            _template_cache[key] = _keep_latest(versions, current, template)
+
+    return template
+
+def get_prompt_and_data(
+    label: str,
+    program_name: Optional[str] = None,
+    profile_dept: str = "",
+    selected_program: str = "",
+    question: str = "",
+    completed_courses_json: str = "[]"
+) -> tuple[str, str]:
+    """
+    라벨에 따라 프롬프트와 데이터를 로드하고 병합
+
+    Args:
+        label: 라우팅 라벨 (다전공_제도, 전공_현황 등)
+        program_name: 전공명 (융합전공_교과과정인 경우 필수)
+        profile_dept: 사용자 소속 학과
+        selected_program: 선택된 전공
+        question: 사용자 질문
+        completed_courses_json: 이수 교과목 JSON (프로필)
+
+    Returns:
+        (prompt, data) 튜플
+    """
+    template = get_prompt_template(label, program_name)
+    md_content = template.md_content
 
     # 변수 치환
-    prompt = prompt.replace("{{profile_dept}}", profile_dept)
-    prompt = prompt.replace("{{selected_program}}", selected_program)
-    prompt = prompt.replace("{{program_name}}", program_name or "")
-    prompt = prompt.replace("{{program_id}}", program_name or "")
-    prompt = prompt.replace("{{QUESTION}}", question)
-
-    # JSON 플레이스홀더 기본값 설정
-    prompt = prompt.replace("{{completed_courses_json}}", "[]")
-    prompt = prompt.replace("{{eligible_programs_json}}", "[]")
-    prompt = prompt.replace("{{entry_year}}", "2024")
-    prompt = prompt.replace("{{version}}", "2025-06")
-
-    # 🔍 디버깅 로그
-    print(f"\n{'='*80}")
-    print(f"🔍 디버깅: 프롬프트 생성 완료")
-    print(f"{'='*80}")
-    print(f"📌 라벨: {label}")
-    print(f"📌 전공명: {program_name or 'N/A'}")
-    print(f"📌 로드된 데이터 파일: {data_path}")
-    print(f"📌 데이터 파일 크기: {len(md_content)} 글자")
-    print(f"📌 최종 프롬프트 크기: {len(prompt)} 글자")
-
-    # 중복 인정 과목 섹션이 있는지 확인
-    if "전공간 중복 학점인정 교과목" in md_content:
-        print(f"✅ '전공간 중복 학점인정 교과목' 섹션 발견!")
-        # 해당 섹션의 위치와 일부 내용 출력
-        idx = md_content.find("전공간 중복 학점인정 교과목")
-        snippet = md_content[idx:idx+500]
-        print(f"📄 섹션 미리보기:\n{snippet}\n...")
-    else:
-        print(f"❌ '전공간 중복 학점인정 교과목' 섹션 없음")
-
-    # profile_dept가 데이터에 있는지 확인
-    if profile_dept and profile_dept in md_content:
-        print(f"✅ 사용자 학과 '{profile_dept}' 데이터에서 발견!")
-        # 해당 학과 주변 내용 출력
-        idx = md_content.find(profile_dept)
-        snippet = md_content[max(0, idx-100):idx+200]
-        print(f"📄 학과 주변 내용:\n...{snippet}...")
-    elif profile_dept:
-        print(f"❌ 사용자 학과 '{profile_dept}' 데이터에 없음")
-
-    print(f"{'='*80}\n")
-
-    # 최종 프롬프트를 파일로 저장 (디버깅용)
-    debug_dir = ROOT_DIR / "debug_prompts"
-    debug_dir.mkdir(exist_ok=True)
-    debug_file = debug_dir / f"prompt_{label}_{program_name or 'common'}.txt"
-    with open(debug_file, "w", encoding="utf-8") as f:
-        f.write(prompt)
-    print(f"💾 최종 프롬프트 저장: {debug_file}\n")
+    prompt = template.render(
+        profile_dept=profile_dept,
+        selected_program=selected_program,
+        completed_courses_json=completed_courses_json,
+        QUESTION=question
+    )
+
+    _log_prompt(template, prompt, profile_dept)
 
     return prompt, md_content
 
+def get_prompt_parts(
+    label: str,
+    program_name: Optional[str] = None,
+    profile_dept: str = "",
+    selected_program: str = "",
+    question: str = "",
+    completed_courses_json: str = "[]"
+) -> tuple[str, str]:
+    """
+    프롬프트 캐싱용으로 고정 부분과 요청별 부분을 나눠 반환
+
+    Returns:
+        (static_text, dynamic_prompt) 튜플
+        - static_text: 지시문 + 주입된 데이터 (캐시 대상 시스템 블록)
+        - dynamic_prompt: 프로필, 질문 등 요청마다 바뀌는 사용자 메시지
+    """
+    template = get_prompt_template(label, program_name)
+    dynamic_prompt = template.render_dynamic(
+        profile_dept=profile_dept,
+        selected_program=selected_program,
+        completed_courses_json=completed_courses_json,
+        QUESTION=question
+    )
+
+    if diagnostics.sampled(label):
+        _log_prompt(template, template.static_text + "\n\n" + dynamic_prompt, profile_dept, sampled=True)
+
+    return template.static_text, dynamic_prompt
+
+def _log_prompt(template: PromptTemplate, prompt: str, profile_dept: str, sampled: bool = False) -> None:
+    """🔍 디버깅 로그 (샘플링된 요청만, 백그라운드 기록)"""
+    if not sampled and not diagnostics.sampled(template.label):
+        return
+
+    md_content = template.md_content
+    diagnostics.emit(
+        "prompt_built",
+        label=template.label,
+        program_name=template.program_name,
+        data_path=template.data_path,
+        data_chars=len(md_content),
+        prompt_chars=len(prompt),
+        has_overlap_section="전공간 중복 학점인정 교과목" in md_content,
+        profile_dept=profile_dept,
+        dept_in_data=bool(profile_dept) and profile_dept in md_content
+    )
+    diagnostics.dump_prompt(template.label, template.program_name, prompt)
+
 def get_available_programs() -> list[str]:
     """사용 가능한 전공 목록 반환"""
     config = load_config()
     return config["routing"]["융합전공_교과과정"]["available_programs"]
 
+PROGRAM_CATALOG_PATH = "data/common/융합전공_연계전공_현황.md"
+
 def load_program_catalog() -> Dict:
-    """전공 현황 데이터를 파싱하여 반환"""
-    md_content = load_file("data/common/융합전공_연계전공_현황.md")
+    """전공 현황 데이터를 파싱하여 반환 (번들에 파싱 결과가 있으면 그대로 사용)"""
+    bundled = knowledge_bundle.derived("catalog")
+    if bundled is not None:
+        return json.loads(bundled)
+
+    md_content = load_file(PROGRAM_CATALOG_PATH)
 
     # 간단한 파싱 (실제로는 더 정교하게 파싱 필요)
     programs = []
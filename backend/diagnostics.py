@@ -0,0 +1,158 @@
+"""
+진단 로그 모듈
+요청 스레드를 막지 않는 샘플링 기반 디버그 싱크 (기본 비활성)
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import random
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Iterable
+
+# 프로젝트 루트 경로 (data_loader와 순환 import를 피하기 위해 직접 계산)
+ROOT_DIR = Path(__file__).parent.parent
+
+class DiagnosticsSink:
+    """
+    구조화된 진단 레코드를 백그라운드 스레드로 넘겨 기록
+
+    - 비활성 상태에서는 디버그 레코드를 만들지도 않음 (에러 레코드만 기록)
+    - 활성 시 sample_rate 비율 또는 지정 라벨에 대해서만 샘플링
+    - 큐가 가득 차면 레코드를 버리고 dropped 카운터만 증가 (요청 스레드는 대기하지 않음)
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 1.0,
+        labels: Optional[Iterable[str]] = None,
+        dump_prompts: bool = False,
+        queue_size: int = 1000
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.labels = set(labels or [])
+        self.dump_prompts = dump_prompts
+        self.dump_dir = ROOT_DIR / "debug_prompts"
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+
+    def sampled(self, label: Optional[str] = None) -> bool:
+        """이번 요청의 디버그 레코드를 기록할지 결정"""
+        if not self.enabled:
+            return False
+        if label and label in self.labels:
+            return True
+        return random.random() < self.sample_rate
+
+    def log(self, event: str, label: Optional[str] = None, **fields) -> None:
+        """샘플링된 디버그 레코드 기록"""
+        if self.sampled(label):
+            self._enqueue("debug", event, label, fields)
+
+    def emit(self, event: str, label: Optional[str] = None, **fields) -> None:
+        """샘플링 여부를 이미 결정한 호출자가 쓰는 디버그 레코드 기록"""
+        self._enqueue("debug", event, label, fields)
+
+    def error(self, event: str, label: Optional[str] = None, **fields) -> None:
+        """에러 레코드는 진단 활성화 여부와 관계없이 기록"""
+        self._enqueue("error", event, label, fields)
+
+    def dump_prompt(self, label: str, program_name: Optional[str], prompt: str) -> None:
+        """최종 프롬프트를 요청마다 고유한 파일로 저장 (백그라운드)"""
+        if not self.dump_prompts:
+            return
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        file_name = f"{stamp}_{label}_{program_name or 'common'}_{uuid.uuid4().hex[:8]}.txt"
+        self._put(("prompt", file_name, prompt))
+
+    def stats(self) -> dict:
+        """싱크 상태 조회"""
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "labels": sorted(self.labels),
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped
+        }
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """큐에 남은 레코드를 가능한 만큼 기록 (종료 시 사용)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _enqueue(self, level: str, event: str, label: Optional[str], fields: dict) -> None:
+        record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "level": level,
+            "event": event,
+        }
+        if label:
+            record["label"] = label
+        record.update(fields)
+        self._put(("record", record))
+
+    def _put(self, item: tuple) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="diagnostics-writer", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item[0] == "prompt":
+                    _, file_name, prompt = item
+                    self.dump_dir.mkdir(exist_ok=True)
+                    with open(self.dump_dir / file_name, "w", encoding="utf-8") as f:
+                        f.write(prompt)
+                else:
+                    sys.stdout.write(json.dumps(item[1], ensure_ascii=False, default=str) + "\n")
+                    sys.stdout.flush()
+                self.written += 1
+            except Exception:
+                self.dropped += 1
+            finally:
+                self._queue.task_done()
+
+def _create_sink() -> DiagnosticsSink:
+    """config.json의 diagnostics 설정으로 싱크 생성 (DAWANGI_DEBUG=1 로 강제 활성화)"""
+    with open(ROOT_DIR / "config.json", "r", encoding="utf-8") as f:
+        settings = json.load(f).get("diagnostics", {})
+    enabled = settings.get("enabled", False) or os.getenv("DAWANGI_DEBUG") == "1"
+
+    return DiagnosticsSink(
+        enabled=enabled,
+        sample_rate=settings.get("sample_rate", 1.0),
+        labels=settings.get("labels", []),
+        dump_prompts=enabled and settings.get("dump_prompts", False),
+        queue_size=settings.get("queue_size", 1000)
+    )
+
+# 싱글톤 인스턴스
+diagnostics = _create_sink()
+atexit.register(diagnostics.flush)
@@ -0,0 +1,210 @@
+"""
+파일 감시 모듈
+config.json, prompt/, data/ 변경을 감지해 템플릿/색인/캐시를 새 버전으로 미리 만든 뒤 한 번에 교체
+"""
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+from data_loader import (
+    ROOT_DIR, load_config, SourceTable, publish_sources, published_sources, pinned_sources
+)
+from diagnostics import diagnostics
+from warmup import warmup
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # 선택 의존성: 없으면 mtime 폴링
+    INotify = None
+
+WATCH_FILES = ("config.json",)
+WATCH_DIRS = ("prompt", "data")
+
+class FileWatcher:
+    """
+    감시 대상 파일의 내용 해시가 바뀌면 새 SourceTable을 발행
+
+    교체 순서:
+        1. 새 표에 고정한 상태로 모든 템플릿 컴파일 (이전 버전 템플릿은 그대로 남음)
+        2. 새 표 발행 - 이후 시작하는 요청부터 새 버전 사용, 진행 중인 요청은 이전 버전 유지
+        3. 전역 색인(라우터, 교과과정, 정적 응답) 재구성
+
+    발행된 표가 있는 동안 요청 경로는 파일 stat 없이 표만 비교하므로 평상시 읽기 비용이 거의 없음.
+    mtime만 바뀌고 내용이 같으면(touch, 같은 내용 재저장) 교체하지 않음.
+    새 버전 컴파일이 실패하면(편집 중 JSON 오류 등) 이전 버전을 계속 사용
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._disk: Dict[str, tuple] = {}
+        # 교체에 실패한 디스크 상태 (같은 상태로 반복 재시도하지 않음)
+        self._failed_disk: Optional[Dict[str, tuple]] = None
+        self._hashes: Dict[str, str] = {}
+        self.backend: Optional[str] = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_changed: List[str] = []
+        self.last_reload_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    def settings(self) -> dict:
+        return load_config().get("hot_reload", {})
+
+    def start(self) -> None:
+        """초기 버전 발행 후 감시 스레드 시작"""
+        settings = self.settings()
+        if not settings.get("enabled", True) or self._thread is not None:
+            return
+
+        self.refresh()
+
+        backend = settings.get("backend", "auto")
+        if backend == "inotify" and INotify is None:
+            diagnostics.error("inotify_unavailable", fallback="polling")
+        self.backend = "inotify" if backend in ("auto", "inotify") and INotify is not None else "polling"
+
+        self._stop.clear()
+        target = self._run_inotify if self.backend == "inotify" else self._run_polling
+        self._thread = threading.Thread(target=target, name="file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        publish_sources(None)
+
+    def refresh(self) -> bool:
+        """
+        디스크를 다시 훑어 내용이 바뀐 파일이 있으면 새 버전으로 교체
+
+        Returns:
+            교체했으면 True
+        """
+        with self._lock:
+            disk = self._scan()
+            if disk == self._disk or disk == self._failed_disk:
+                return False
+
+            current = published_sources()
+            old_signatures = current.signatures if current else {}
+            signatures, hashes, changed = {}, {}, []
+            for path, signature in disk.items():
+                if self._disk.get(path) == signature and path in old_signatures:
+                    signatures[path] = old_signatures[path]
+                    hashes[path] = self._hashes[path]
+                    continue
+
+                digest = hashlib.sha256((ROOT_DIR / path).read_bytes()).hexdigest()
+                hashes[path] = digest
+                if self._hashes.get(path) == digest and path in old_signatures:
+                    # 내용이 같으면 이전 시그니처를 유지해 캐시를 그대로 사용
+                    signatures[path] = old_signatures[path]
+                else:
+                    signatures[path] = signature
+                    changed.append(path)
+            changed += sorted(set(old_signatures) - set(disk))
+
+            if not changed:
+                self._disk, self._hashes = disk, hashes
+                return False
+
+            table = SourceTable((current.generation + 1) if current else 1, signatures)
+            try:
+                with pinned_sources(table):
+                    warmup.warm_templates()
+            except Exception as e:
+                self._failed_disk = disk
+                self.failures += 1
+                self.last_error = repr(e)
+                diagnostics.error("content_reload_failed", changed=changed, error=repr(e))
+                return False
+
+            publish_sources(table)
+            self._disk, self._hashes = disk, hashes
+            warmup.warm_indexes()
+
+            self.reloads += 1
+            self.last_changed = changed
+            self.last_reload_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.last_error = None
+            diagnostics.log("content_reloaded", generation=table.generation, changed=changed)
+            return True
+
+    def stats(self) -> dict:
+        table = published_sources()
+        return {
+            "enabled": self._thread is not None,
+            "backend": self.backend,
+            "generation": table.generation if table else None,
+            "files": len(table.signatures) if table else 0,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_changed": self.last_changed,
+            "last_reload_at": self.last_reload_at,
+            "last_error": self.last_error
+        }
+
+    def _scan(self) -> Dict[str, tuple]:
+        """감시 대상 파일의 실제 stat 시그니처 (발행된 표를 거치지 않음)"""
+        paths = [name for name in WATCH_FILES if (ROOT_DIR / name).is_file()]
+        for directory in WATCH_DIRS:
+            paths += [
+                path.relative_to(ROOT_DIR).as_posix()
+                for path in sorted((ROOT_DIR / directory).rglob("*"))
+                if path.is_file()
+            ]
+        signatures = {}
+        for path in paths:
+            stat = (ROOT_DIR / path).stat()
+            signatures[path] = (path, stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _safe_refresh(self) -> None:
+        try:
+            self.refresh()
+        except OSError as e:
+            # 저장 도중 파일이 잠시 사라지는 경우 등: 다음 이벤트/주기에 다시 시도
+            diagnostics.error("content_scan_failed", error=repr(e))
+
+    def _run_polling(self) -> None:
+        interval = self.settings().get("poll_interval_seconds", 2.0)
+        while not self._stop.wait(interval):
+            self._safe_refresh()
+
+    def _run_inotify(self) -> None:
+        debounce = self.settings().get("debounce_ms", 200)
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM | flags.CREATE | flags.DELETE
+        inotify = INotify()
+        watched = self._add_watches(inotify, mask, set())
+        try:
+            while not self._stop.is_set():
+                if not inotify.read(timeout=1000):
+                    continue
+                # 편집기가 여러 번 나눠 쓰는 경우를 한 번에 처리
+                while inotify.read(timeout=debounce):
+                    pass
+                watched = self._add_watches(inotify, mask, watched)
+                self._safe_refresh()
+        finally:
+            inotify.close()
+
+    def _add_watches(self, inotify, mask, watched: set) -> set:
+        """루트(config.json)와 감시 디렉토리 전체(새로 생긴 하위 디렉토리 포함)에 watch 추가"""
+        directories = [ROOT_DIR]
+        for directory in WATCH_DIRS:
+            root = ROOT_DIR / directory
+            if root.is_dir():
+                directories += [root] + [path for path in root.rglob("*") if path.is_dir()]
+        for directory in directories:
+            if directory not in watched:
+                inotify.add_watch(str(directory), mask)
+                watched.add(directory)
+        return watched
+
+# 싱글톤 인스턴스
+file_watcher = FileWatcher()
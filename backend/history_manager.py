@@ -0,0 +1,173 @@
+"""
+대화 이력 관리 모듈
+토큰 예산 안에서 최근 대화만 그대로 보내고, 오래된 대화는 요약으로 접어 세션에 보관
+"""
+import re
+from typing import Dict, List
+
+from data_loader import load_config
+from diagnostics import diagnostics
+from llm_client import async_claude_client
+from admission import admission
+from session_store import session_store
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ]")
+
+SUMMARY_SYSTEM = "You maintain a compact running summary of a student advising conversation. Write in Korean."
+SUMMARY_PROMPT = """<previous_summary>
+{summary}
+</previous_summary>
+
+<conversation>
+{conversation}
+</conversation>
+
+위 요약과 대화를 합쳐 이후 답변에 필요한 정보(학생의 소속, 관심 전공, 이미 안내한 내용, 남은 질문)만
+{max_chars}자 이내의 개조식 한국어 요약으로 작성하라. 요약만 출력하라."""
+
+def estimate_tokens(text: str) -> int:
+    """
+    로컬 토큰 수 추정 (API 호출 없음)
+
+    한글은 글자당 약 1토큰, 그 외 문자는 약 4글자당 1토큰으로 계산
+    """
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+def _message_tokens(message: dict) -> int:
+    # 역할/구분자 오버헤드 포함
+    return estimate_tokens(message["content"]) + 4
+
+class HistoryManager:
+    """
+    라벨별 토큰 예산으로 대화 이력을 잘라 보내고, 예산을 넘긴 이력은 응답 후 요약으로 접음
+
+    - select(): 요청 경로. 최근 메시지부터 예산 안에서 그대로 유지 (user로 시작하도록 정렬)
+    - fold(): 응답 후 백그라운드. 최근 keep_recent_messages개를 제외한 이력을
+      기존 요약과 합쳐 새 요약으로 만들고 세션에서 제거
+    """
+
+    def __init__(self):
+        self._folding: set = set()
+        self.folds = 0
+        self.fold_failures = 0
+        self.trimmed_messages = 0
+
+    def settings(self) -> dict:
+        """config.json의 history 설정"""
+        return load_config().get("history", {})
+
+    def budget(self, label: str) -> int:
+        """라벨별 이력 토큰 예산"""
+        settings = self.settings()
+        return settings.get("label_budgets", {}).get(label, settings.get("budget_tokens", 2000))
+
+    def select(self, chat_history: List[dict], label: str) -> List[dict]:
+        """토큰 예산 안에 들어가는 최근 메시지만 반환"""
+        if not chat_history:
+            return []
+
+        budget = self.budget(label)
+        used = 0
+        start = len(chat_history)
+        for i in range(len(chat_history) - 1, -1, -1):
+            used += _message_tokens(chat_history[i])
+            if used > budget:
+                break
+            start = i
+
+        # 메시지는 user 턴부터 시작해야 함
+        while start < len(chat_history) and chat_history[start]["role"] != "user":
+            start += 1
+
+        self.trimmed_messages += start
+        return chat_history[start:]
+
+    def summary_block(self, summary: str) -> str:
+        """세션 요약을 사용자 메시지 앞에 붙일 블록으로 변환 (요약이 없으면 빈 문자열)"""
+        if not summary:
+            return ""
+        return f"<conversation_summary>\n{summary}\n</conversation_summary>\n\n"
+
+    def needs_fold(self, session: dict) -> bool:
+        settings = self.settings()
+        if not settings.get("summarize", True):
+            return False
+        history = session["history"]
+        return (
+            len(history) > settings.get("keep_recent_messages", 4)
+            and sum(_message_tokens(m) for m in history) > settings.get("fold_threshold_tokens", 2000)
+        )
+
+    async def fold(self, session_id: str) -> None:
+        """
+        오래된 이력을 요약으로 접어 세션에 저장 (응답 전송 후 백그라운드에서 실행)
+
+        요약을 만드는 동안 새 메시지가 추가될 수 있으므로, 저장 직전에 세션을 다시 읽어
+        요약한 메시지만 앞에서 제거
+        """
+        if session_id in self._folding:
+            return
+
+        session = await session_store.run(session_store.get_or_create, session_id, {})
+        if not self.needs_fold(session):
+            return
+
+        settings = self.settings()
+        history = session["history"]
+        split = len(history) - settings.get("keep_recent_messages", 4)
+        # 남기는 부분이 user 턴으로 시작하도록 조정
+        while split > 0 and history[split]["role"] != "user":
+            split -= 1
+        if split <= 0:
+            return
+        folded = history[:split]
+
+        self._folding.add(session_id)
+        try:
+            conversation = "\n".join(
+                f"{'학생' if m['role'] == 'user' else '다왕이'}: {m['content']}" for m in folded
+            )
+            max_chars = settings.get("summary_max_chars", 600)
+            # 응답 전송 후 작업이므로 대화 요청보다 낮은 우선순위로 호출
+            with admission.scope("batch"):
+                summary = await async_claude_client.call(
+                    prompt=SUMMARY_PROMPT.format(
+                        summary=session.get("summary", "") or "(없음)",
+                        conversation=conversation,
+                        max_chars=max_chars
+                    ),
+                    max_tokens=settings.get("summary_max_tokens", 512),
+                    temperature=0.0,
+                    system=SUMMARY_SYSTEM,
+                    usage_key="summary"
+                )
+
+            # 저장 시점의 최신 세션에 잠금 안에서 반영 (요약하는 동안 추가된 턴 유지)
+            def apply(latest: dict) -> bool:
+                if latest["history"][:split] != folded:
+                    return False
+                latest["history"] = latest["history"][split:]
+                latest["summary"] = summary.strip()[:max_chars * 2]
+                self.folds += 1
+                return True
+
+            await session_store.run(session_store.update, session_id, apply)
+
+        except Exception as e:
+            self.fold_failures += 1
+            diagnostics.error("history_fold_failed", session_id=session_id, error=repr(e))
+
+        finally:
+            self._folding.discard(session_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "folds": self.folds,
+            "fold_failures": self.fold_failures,
+            "folding": len(self._folding),
+            "trimmed_messages": self.trimmed_messages
+        }
+
+# 싱글톤 인스턴스
+history_manager = HistoryManager()
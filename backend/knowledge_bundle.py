@@ -0,0 +1,238 @@
+"""
+지식 번들 모듈
+config.json, 프롬프트, 데이터 파일과 컴파일된 템플릿/전공 현황/교과과정 표를 하나의 스냅샷 파일로 묶고 mmap으로 로드
+
+파일 형식:
+    MAGIC(8) | 형식 버전(u32) | 매니페스트 길이(u32) | 매니페스트 JSON | 본문 blob들
+    - 매니페스트에는 원본 파일별 (offset, length, mtime_ns, size, sha256)과
+      파생 항목별 (offset, length, 의존 파일 목록)이 들어 있음
+    - 본문은 필요할 때만 mmap에서 잘라 디코딩
+
+원본 파일이 빌드 이후 바뀌었으면(mtime/크기 불일치) 그 파일과 그 파일에 의존하는 파생 항목은
+번들 대신 디스크에서 읽음. 디스크에 파일이 없으면 번들 내용을 사용
+"""
+import os
+import json
+import mmap
+import struct
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).parent.parent
+
+MAGIC = b"DWGBNDL\x00"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+
+DEFAULT_PATH = ROOT_DIR / "build" / "knowledge.bundle"
+
+def bundle_path() -> Path:
+    """번들 경로 (환경 변수 DAWANGI_BUNDLE로 변경 가능)"""
+    return Path(os.getenv("DAWANGI_BUNDLE", str(DEFAULT_PATH)))
+
+def write_bundle(
+    out_path: Path,
+    sources: Dict[str, Tuple[str, tuple]],
+    derived: Dict[str, Tuple[str, List[str]]]
+) -> dict:
+    """
+    번들 파일 작성
+
+    Args:
+        out_path: 저장 경로 (임시 파일에 쓴 뒤 교체)
+        sources: 원본 경로 → (내용, file_signature 결과)
+        derived: 파생 항목 이름 → (내용, 의존 원본 경로 목록)
+
+    Returns:
+        매니페스트 (본문 위치 제외 요약 포함)
+    """
+    blobs, offset = [], 0
+    manifest_sources, manifest_derived = {}, {}
+
+    for path in sorted(sources):
+        text, signature = sources[path]
+        data = text.encode("utf-8")
+        manifest_sources[path] = {
+            "offset": offset,
+            "length": len(data),
+            "mtime_ns": signature[1],
+            "size": signature[2],
+            "sha256": hashlib.sha256(data).hexdigest()
+        }
+        blobs.append(data)
+        offset += len(data)
+
+    for name in sorted(derived):
+        text, deps = derived[name]
+        data = text.encode("utf-8")
+        manifest_derived[name] = {"offset": offset, "length": len(data), "deps": sorted(deps)}
+        blobs.append(data)
+        offset += len(data)
+
+    # 콘텐츠 버전: 원본 내용이 같으면 어디서 빌드해도 같은 값
+    version = hashlib.sha256(
+        "".join(f"{path}\0{entry['sha256']}\n" for path, entry in manifest_sources.items()).encode("utf-8")
+    ).hexdigest()[:16]
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sources": manifest_sources,
+        "derived": manifest_derived
+    }
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(manifest_bytes)))
+        f.write(manifest_bytes)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, out_path)
+    return manifest
+
+class KnowledgeBundle:
+    """
+    mmap으로 연 번들 스냅샷
+
+    처음 조회될 때 한 번 로드 (RouterService 생성 등 import 시점의 파일 읽기부터 적용).
+    번들 파일이 없거나 형식이 다르면 디스크 파일만 사용
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._attempted = False
+        self._disabled = False
+        self._mmap: Optional[mmap.mmap] = None
+        self._base = 0
+        self.manifest: Optional[dict] = None
+        self.path: Optional[Path] = None
+        self.error: Optional[str] = None
+        self.hits = 0
+        self.stale_reads = 0
+
+    @property
+    def loaded(self) -> bool:
+        self.ensure()
+        return self.manifest is not None
+
+    def disable(self) -> None:
+        """번들을 쓰지 않고 디스크 파일만 사용 (번들 빌드 시)"""
+        self._disabled = True
+        self._attempted = True
+
+    def ensure(self) -> None:
+        if not self._attempted:
+            self.load()
+
+    def load(self, path: Optional[Path] = None) -> bool:
+        """번들 파일을 mmap으로 열고 매니페스트를 읽음"""
+        with self._lock:
+            if self._attempted and path is None:
+                return self.manifest is not None
+            self._attempted = True
+            if self._disabled:
+                return False
+
+            path = Path(path) if path else bundle_path()
+            self.path = path
+            if not path.exists():
+                self.error = "not_found"
+                return False
+
+            try:
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, manifest_len = _HEADER.unpack_from(mapped, 0)
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    mapped.close()
+                    self.error = f"unsupported format (magic={magic!r}, version={version})"
+                    return False
+                start = _HEADER.size
+                manifest = json.loads(mapped[start:start + manifest_len].decode("utf-8"))
+            except (OSError, ValueError, struct.error) as e:
+                self.error = repr(e)
+                return False
+
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mapped
+            self._base = start + manifest_len
+            self.manifest = manifest
+            self.error = None
+            return True
+
+    def read(self, path: str) -> Optional[str]:
+        """번들의 원본 파일 내용 (번들이 없거나 디스크 파일이 바뀌었으면 None)"""
+        self.ensure()
+        if self.manifest is None:
+            return None
+        entry = self.manifest["sources"].get(path)
+        if entry is None:
+            return None
+        if not self._fresh(path, entry):
+            self.stale_reads += 1
+            return None
+        self.hits += 1
+        return self._blob(entry)
+
+    def signature(self, path: str) -> Optional[Tuple[str, int, int]]:
+        """디스크에 없는 파일의 file_signature 대체값 (번들에 기록된 값)"""
+        self.ensure()
+        if self.manifest is None:
+            return None
+        entry = self.manifest["sources"].get(path)
+        if entry is None:
+            return None
+        return (path, entry["mtime_ns"], entry["size"])
+
+    def derived(self, name: str) -> Optional[str]:
+        """파생 항목 내용 (의존 파일이 모두 빌드 시점 그대로일 때만)"""
+        self.ensure()
+        if self.manifest is None:
+            return None
+        entry = self.manifest["derived"].get(name)
+        if entry is None:
+            return None
+        sources = self.manifest["sources"]
+        for dep in entry["deps"]:
+            if dep not in sources or not self._fresh(dep, sources[dep]):
+                self.stale_reads += 1
+                return None
+        self.hits += 1
+        return self._blob(entry)
+
+    def stats(self) -> dict:
+        self.ensure()
+        if self.manifest is None:
+            return {"loaded": False, "path": str(self.path) if self.path else None, "error": self.error}
+        return {
+            "loaded": True,
+            "path": str(self.path),
+            "format": self.manifest["format"],
+            "version": self.manifest["version"],
+            "built_at": self.manifest["built_at"],
+            "sources": len(self.manifest["sources"]),
+            "derived": len(self.manifest["derived"]),
+            "bytes": len(self._mmap),
+            "hits": self.hits,
+            "stale_reads": self.stale_reads
+        }
+
+    def _fresh(self, path: str, entry: dict) -> bool:
+        try:
+            stat = (ROOT_DIR / path).stat()
+        except FileNotFoundError:
+            return True
+        return stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["size"]
+
+    def _blob(self, entry: dict) -> str:
+        start = self._base + entry["offset"]
+        return self._mmap[start:start + entry["length"]].decode("utf-8")
+
+# 싱글톤 인스턴스
+knowledge_bundle = KnowledgeBundle()
@@ -0,0 +1,219 @@
+"""
+로컬 어휘 기반 라우터
+키워드 + 문자 n-gram 점수로 질문을 분류하고, 확신이 낮을 때만 LLM 라우터로 넘김
+"""
+import re
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from data_loader import load_config, load_file, file_signature
+from diagnostics import diagnostics
+from timings import timed
+import metrics
+
+# 라우터 프롬프트 규칙 줄: "- 제도/절차/신청 → 다전공_제도"
+_RULE_PATTERN = re.compile(r"^-\s*(.+?)\s*→\s*(\S+)\s*$", re.MULTILINE)
+_NON_WORD = re.compile(r"[^0-9A-Za-z가-힣]+")
+
+def _normalize(text: str) -> str:
+    """공백/기호 제거 + 소문자화"""
+    return _NON_WORD.sub("", text).lower()
+
+def _bigrams(text: str) -> List[str]:
+    normalized = _normalize(text)
+    return [normalized[i:i + 2] for i in range(len(normalized) - 1)]
+
+@dataclass(frozen=True)
+class RouteGuess:
+    """로컬 분류 결과"""
+    label: str
+    confidence: float
+    scores: Dict[str, float]
+    keyword_hits: int = 0
+
+class LexicalRouter:
+    """
+    config.json의 라우트 설명, 라우터 프롬프트 규칙, 데이터 파일로 만든 결정적 분류기
+
+    - 키워드: 라우트 설명/규칙에서 추출, 여러 라벨에 걸친 키워드는 가중치를 나눔
+    - n-gram: 라벨별 데이터 파일의 문자 bigram 분포로 나이브 베이즈 점수 계산
+    - 신뢰도: 라벨 점수의 softmax 확률 (질문 bigram이 데이터에 거의 없으면 0)
+    - fast path: 신뢰도가 임계값 이상이고 선택된 라벨의 키워드가 질문에 있을 때만
+      (n-gram 점수만으로는 "A랑 B 전공 차이"처럼 전공 이름만 있는 질문도 높은 신뢰도가 나옴)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._keywords: Dict[str, Dict[str, float]] = {}
+        self._log_probs: Dict[str, Dict[str, float]] = {}
+        self._unseen: Dict[str, float] = {}
+        self._vocabulary: set = set()
+        self.labels: List[str] = []
+
+        self.hits = 0
+        self.fallbacks = 0
+        self.hits_by_label: Counter = Counter()
+
+    def settings(self) -> dict:
+        """config.json의 router.fast_path 설정"""
+        return load_config().get("router", {}).get("fast_path", {})
+
+    def classify(self, question: str) -> RouteGuess:
+        """질문을 분류해 (라벨, 신뢰도) 반환 (통계는 기록하지 않음)"""
+        self.ensure()
+        settings = self.settings()
+
+        question_norm = _normalize(question)
+        grams = _bigrams(question)
+        if not grams:
+            return RouteGuess("Unmatched", 0.0, {})
+
+        scores, hits = {}, {}
+        for label in self.labels:
+            matched = [
+                weight for keyword, weight in self._keywords[label].items()
+                if keyword in question_norm
+            ]
+            keyword_score = sum(matched)
+            hits[label] = len(matched)
+            log_probs = self._log_probs[label]
+            unseen = self._unseen[label]
+            ngram_score = sum(log_probs.get(g, unseen) for g in grams) / len(grams)
+            scores[label] = settings.get("keyword_weight", 2.0) * keyword_score + ngram_score
+
+        # softmax로 신뢰도 계산
+        top = max(scores.values())
+        exp_scores = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(exp_scores.values())
+        label = max(scores, key=scores.get)
+        confidence = exp_scores[label] / total
+
+        # 데이터에 거의 등장하지 않는 질문은 범위 밖일 가능성이 높음
+        coverage = sum(1 for g in grams if g in self._vocabulary) / len(grams)
+        if coverage < settings.get("min_coverage", 0.5):
+            confidence = 0.0
+
+        return RouteGuess(label, confidence, scores, hits[label])
+
+    @timed("routing")
+    def route(self, question: str) -> Optional[str]:
+        """
+        신뢰도가 임계값 이상이고 라벨 키워드가 min_keyword_hits개 이상 있으면 라벨 반환,
+        아니면 None (LLM 라우터로 폴백)
+        """
+        settings = self.settings()
+        if not settings.get("enabled", True):
+            return None
+
+        guess = self.classify(question)
+        diagnostics.log(
+            "fast_path_route", label=guess.label, question=question,
+            confidence=round(guess.confidence, 3), keyword_hits=guess.keyword_hits
+        )
+        if (guess.confidence >= settings.get("threshold", 0.8)
+                and guess.keyword_hits >= settings.get("min_keyword_hits", 1)):
+            self.hits += 1
+            self.hits_by_label[guess.label] += 1
+            metrics.record_route(guess.label, "fast_path")
+            return guess.label
+
+        self.fallbacks += 1
+        return None
+
+    def stats(self) -> dict:
+        """fast-path 적중률 통계"""
+        total = self.hits + self.fallbacks
+        return {
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "hit_rate": self.hits / total if total else 0.0,
+            "fallback_rate": self.fallbacks / total if total else 0.0,
+            "hits_by_label": dict(self.hits_by_label)
+        }
+
+    def _sources(self) -> Dict[str, List[str]]:
+        """라벨별 데이터 파일 목록"""
+        config = load_config()
+        sources = {}
+        for label, route_config in config["routing"].items():
+            if "data_template" in route_config:
+                sources[label] = [
+                    route_config["data_template"].replace("{program_name}", program)
+                    for program in route_config.get("available_programs", [])
+                ]
+            else:
+                sources[label] = [route_config["data"]]
+        return sources
+
+    def ensure(self) -> None:
+        """원본 파일이 바뀌었으면 색인 재구성"""
+        config = load_config()
+        sources = self._sources()
+        router_prompt = config.get("router", {}).get("prompt", "prompt/prompt_multi_routing.txt")
+        paths = ["config.json", router_prompt] + [p for files in sources.values() for p in files]
+        signature = tuple(file_signature(p, pinned=False) for p in paths)
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if signature != self._signature:
+                self._build(config, sources, router_prompt)
+                self._signature = signature
+
+    def _build(self, config: dict, sources: Dict[str, List[str]], router_prompt: str) -> None:
+        labels = list(config["routing"].keys())
+
+        # 1) 키워드: 라우트 설명 + 라우터 프롬프트 규칙 + 설정의 추가 키워드
+        raw_keywords: Dict[str, set] = {label: set() for label in labels}
+        for label, route_config in config["routing"].items():
+            raw_keywords[label].update(re.split(r"[,/\s]+", route_config.get("description", "")))
+        for terms, label in _RULE_PATTERN.findall(load_file(router_prompt)):
+            if label in raw_keywords:
+                raw_keywords[label].update(terms.split("/"))
+        extra = config.get("router", {}).get("fast_path", {}).get("keywords", {})
+        for label, terms in extra.items():
+            if label in raw_keywords:
+                raw_keywords[label].update(terms)
+
+        # 다른 라벨 이름에 들어 있는 단어(예: "융합전공")는 어느 라벨에도 흔하므로 제외
+        label_names = {label: _normalize(label) for label in labels}
+        normalized = {
+            label: {
+                k for k in map(_normalize, terms)
+                if len(k) >= 2 and not any(
+                    k in name for other, name in label_names.items() if other != label
+                )
+            }
+            for label, terms in raw_keywords.items()
+        }
+        # 여러 라벨에 등장하는 키워드는 변별력이 낮으므로 가중치를 나눔
+        owners = Counter(k for terms in normalized.values() for k in terms)
+        keywords = {
+            label: {k: 1.0 / owners[k] for k in terms}
+            for label, terms in normalized.items()
+        }
+
+        # 2) n-gram: 라벨별 bigram 분포 (add-one smoothing)
+        counts = {
+            label: Counter(g for path in sources[label] for g in _bigrams(load_file(path)))
+            for label in labels
+        }
+        vocabulary = set().union(*counts.values())
+        log_probs, unseen = {}, {}
+        for label, counter in counts.items():
+            total = sum(counter.values()) + len(vocabulary) + 1
+            log_probs[label] = {g: math.log((c + 1) / total) for g, c in counter.items()}
+            unseen[label] = math.log(1 / total)
+
+        self.labels = labels
+        self._keywords = keywords
+        self._log_probs = log_probs
+        self._unseen = unseen
+        self._vocabulary = vocabulary
+
+# 싱글톤 인스턴스
+lexical_router = LexicalRouter()
@@ -3,28 +3,358 @@ Claude API 클라이언트
 Anthropic Claude API를 호출하여 응답 생성
 """
 import os
-from typing import Optional
-from anthropic import Anthropic
+import time
+import random
+import asyncio
+import threading
+from collections import Counter, defaultdict
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import Optional, AsyncIterator, Union, Tuple
+import httpx
+import anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from dotenv import load_dotenv
+from data_loader import load_config
+from diagnostics import diagnostics
+from circuit_breaker import llm_breaker, CircuitOpenError
+from admission import admission
+from timings import timed
+import metrics
 
 # 환경 변수 로드
 load_dotenv()
 
+MODEL = "claude-sonnet-4-20250514"
+DEFAULT_SYSTEM = "You are a helpful assistant for Chungbuk National University multi-major program guidance."
+ROUTER_SYSTEM = "You are a classification router. Return only the exact label inside <output>...</output> tags."
+PROMPT_CACHING_BETA = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+# 재시도 대상 상태 코드 (그 외 5xx 포함)
+_RETRYABLE_STATUS = {408, 409, 429}
+
+def _get_api_key() -> str:
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+    return api_key
+
+def _llm_settings() -> dict:
+    return load_config().get("llm", {})
+
+def _transport_options() -> dict:
+    """
+    config.json llm.timeouts / llm.pool로 HTTP 클라이언트 옵션 구성
+
+    - connect는 짧게 잡아 장애 시 빨리 실패, read는 긴 답변 생성 시간을 고려
+    - 프로세스 전체가 클라이언트 하나(연결 풀 하나)를 공유
+    """
+    settings = _llm_settings()
+    timeouts = settings.get("timeouts", {})
+    pool = settings.get("pool", {})
+    return {
+        "timeout": httpx.Timeout(
+            connect=timeouts.get("connect", 5.0),
+            read=timeouts.get("read", 90.0),
+            write=timeouts.get("write", 10.0),
+            pool=timeouts.get("pool", 10.0)
+        ),
+        "limits": httpx.Limits(
+            max_connections=pool.get("max_connections", 100),
+            max_keepalive_connections=pool.get("max_keepalive_connections", 20),
+            keepalive_expiry=pool.get("keepalive_expiry", 30.0)
+        ),
+        "follow_redirects": True
+    }
+
+def _http_client() -> httpx.Client:
+    return httpx.Client(**_transport_options())
+
+def _async_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(**_transport_options())
+
+def _retry_reason(error: Exception) -> Optional[str]:
+    """재시도할 오류면 메트릭용 사유(상태 코드, timeout, connection), 아니면 None"""
+    if isinstance(error, anthropic.APITimeoutError):
+        return "timeout"
+    if isinstance(error, anthropic.APIConnectionError):
+        return "connection"
+    if isinstance(error, anthropic.APIStatusError):
+        status = error.status_code
+        if status in _RETRYABLE_STATUS or status >= 500:
+            return str(status)
+    return None
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """응답의 retry-after-ms / retry-after 헤더(초 또는 HTTP 날짜)를 초 단위로"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _backoff(error: Exception, attempt: int, settings: dict) -> Optional[float]:
+    """
+    attempt번째 재시도 전 대기 시간 (초). 재시도하지 않으면 None
+
+    지수 백오프에 지터를 섞어 동시에 실패한 요청들이 한꺼번에 다시 몰리지 않게 하고,
+    429/529에 retry-after가 있으면 그보다 먼저 보내지 않음.
+    retry-after가 max_retry_after보다 길면 기다리지 않고 실패
+    """
+    retry = settings.get("retry", {})
+    if attempt >= retry.get("max_retries", 3) or _retry_reason(error) is None:
+        return None
+
+    delay = min(retry.get("max_delay", 8.0), retry.get("base_delay", 0.5) * 2 ** attempt)
+    delay = random.uniform(delay / 2, delay)
+
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        if retry_after > retry.get("max_retry_after", 20.0):
+            return None
+        delay = max(delay, retry_after)
+    return delay
+
+def is_upstream_unavailable(error: Exception) -> bool:
+    """재시도를 소진한 업스트림 장애(과부하, 타임아웃, 연결 실패)이거나 서킷이 열려 거부된 경우"""
+    return isinstance(error, CircuitOpenError) or _retry_reason(error) is not None
+
+def _record_outcome(error: Exception) -> None:
+    """최종 실패를 서킷 브레이커에 반영 (4xx처럼 업스트림이 정상 응답한 오류는 성공으로 취급)"""
+    if _retry_reason(error) is not None:
+        llm_breaker.record_failure()
+    else:
+        llm_breaker.record_success()
+
+def _admission_outcome(error: Exception) -> str:
+    """동시성 한도를 줄여야 하는 실패(429, 529, 타임아웃)면 "overload", 아니면 빈 문자열"""
+    if isinstance(error, anthropic.APITimeoutError):
+        return "overload"
+    if isinstance(error, anthropic.APIStatusError) and error.status_code in (429, 529):
+        return "overload"
+    return ""
+
+def _send(create, **kwargs):
+    """
+    서킷 브레이커 확인 후 재시도(지터 백오프)를 포함해 API 요청
+
+    시도마다 입장 제어 슬롯을 받아 쓰고 응답과 함께 반납 (백오프 대기 중에는 슬롯을 잡지 않음)
+    서킷 브레이커 확인은 첫 슬롯을 받은 뒤에 하고, 결과를 기록하지 못한 채 끝나면
+    (입장 거부, 취소, API 외 오류) half_open 시험 호출 허가를 반납
+    """
+    settings = _llm_settings()
+    attempt = 0
+    trial = recorded = False
+    try:
+        while True:
+            admission.acquire()
+            start = time.monotonic()
+            try:
+                if attempt == 0:
+                    trial = llm_breaker.before_call()
+                result = create(**kwargs)
+            except anthropic.APIError as e:
+                admission.release(_admission_outcome(e))
+                delay = _backoff(e, attempt, settings)
+                if delay is None:
+                    _record_outcome(e)
+                    recorded = True
+                    raise
+                metrics.record_retry(_retry_reason(e))
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                admission.release()
+                raise
+            admission.release("ok", time.monotonic() - start)
+            llm_breaker.record_success()
+            recorded = True
+            return result
+    finally:
+        if trial and not recorded:
+            llm_breaker.release_trial()
+
+async def _send_async(create, **kwargs):
+    """
+    _send의 비동기 버전 (대기 중 이벤트 루프를 막지 않음)
+
+    stream=True 요청은 스트림이 끝날 때까지 슬롯을 유지 (지연 신호는 응답 헤더까지의 시간)
+    """
+    settings = _llm_settings()
+    attempt = 0
+    trial = recorded = False
+    try:
+        while True:
+            await admission.acquire_async()
+            start = time.monotonic()
+            try:
+                if attempt == 0:
+                    trial = llm_breaker.before_call()
+                result = await create(**kwargs)
+            except anthropic.APIError as e:
+                admission.release(_admission_outcome(e))
+                delay = _backoff(e, attempt, settings)
+                if delay is None:
+                    _record_outcome(e)
+                    recorded = True
+                    raise
+                metrics.record_retry(_retry_reason(e))
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                admission.release()
+                raise
+            llm_breaker.record_success()
+            recorded = True
+            if kwargs.get("stream"):
+                return _hold_slot(result, time.monotonic() - start)
+            admission.release("ok", time.monotonic() - start)
+            return result
+    finally:
+        if trial and not recorded:
+            llm_breaker.release_trial()
+
+async def _hold_slot(stream, latency: float):
+    """스트림 이벤트를 그대로 내보내고, 끝나거나 끊기면 입장 제어 슬롯 반납"""
+    outcome = ""
+    try:
+        async for event in stream:
+            yield event
+        outcome = "ok"
+    finally:
+        admission.release(outcome, latency if outcome else None)
+
+def _build_messages(prompt: str, chat_history: list) -> list:
+    """이전 대화 이력 뒤에 현재 질문을 붙여 메시지 리스트 구성"""
+    messages = [
+        {"role": turn["role"], "content": turn["content"]}
+        for turn in chat_history
+    ]
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+def _build_system(system: Optional[str], cached_system: Optional[str]) -> Union[str, list]:
+    """
+    시스템 프롬프트 구성
+
+    cached_system이 있으면 cache_control이 붙은 블록으로 추가해
+    같은 라벨/전공의 반복 요청에서 프롬프트 캐시를 재사용
+    """
+    base = system if system else DEFAULT_SYSTEM
+    if not cached_system:
+        return base
+    return [
+        {"type": "text", "text": base},
+        {"type": "text", "text": cached_system, "cache_control": {"type": "ephemeral"}}
+    ]
+
+class TokenUsage:
+    """API 응답의 usage 필드를 키(라벨:전공 등)별로 누적"""
+
+    FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+    def __init__(self):
+        self._totals: dict = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def record(self, usage, key: str) -> None:
+        if usage is None:
+            return
+        with self._lock:
+            totals = self._totals[key]
+            totals["calls"] += 1
+            for field in self.FIELDS:
+                totals[field] += getattr(usage, field, None) or 0
+        metrics.record_tokens(key, usage)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {key: dict(totals) for key, totals in self._totals.items()}
+
+token_usage = TokenUsage()
+
+def _tool_result_messages(messages: list, tool_use_id: str, result: str) -> list:
+    """도구 호출 턴 뒤에 tool_result 사용자 턴을 붙임"""
+    return messages + [{
+        "role": "user",
+        "content": [{"type": "tool_result", "tool_use_id": tool_use_id, "content": result}]
+    }]
+
+async def _stream_text(stream, usage_key: str) -> AsyncIterator[str]:
+    """
+    원시 스트리밍 이벤트에서 텍스트 조각을 내보내고, 끝나면 usage 기록
+
+    스트림 도중 끊기거나 error 이벤트(overloaded 등)가 오면 서킷 브레이커에 실패로 반영
+    """
+    usage = Counter()
+    try:
+        async for event in stream:
+            if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                yield event.delta.text
+            elif event.type == "message_start":
+                for field in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+                    usage[field] += getattr(event.message.usage, field, None) or 0
+            elif event.type == "message_delta":
+                usage["output_tokens"] += event.usage.output_tokens
+    except (anthropic.APIError, httpx.HTTPError):
+        llm_breaker.record_failure()
+        raise
+    token_usage.record(SimpleNamespace(**usage), usage_key)
+
+def _extract_text(message) -> str:
+    """응답 블록에서 텍스트만 추출"""
+    response_text = ""
+    for block in message.content:
+        if hasattr(block, 'text'):
+            response_text += block.text
+    return response_text
+
 class ClaudeClient:
     def __init__(self):
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+        # 재시도는 _send에서 직접 처리 (retry-after 상한, 서킷 브레이커 연동)
+        self._http = _http_client()
+        self.client = Anthropic(api_key=_get_api_key(), http_client=self._http, max_retries=0)
+        self.model = MODEL
 
-        self.client = Anthropic(api_key=api_key)
-        self.model = "claude-sonnet-4-20250514"
+    def warmup(self) -> bool:
+        """
+        업스트림 연결(DNS, TCP, TLS)을 미리 맺어 연결 풀에 넣어 둠
+
+        API 루트에 GET만 보내므로 토큰을 쓰지 않음 (응답 상태는 무관)
+        """
+        try:
+            self._http.get(str(self.client.base_url))
+            return True
+        except httpx.HTTPError as e:
+            diagnostics.error("llm_warmup_failed", error=repr(e))
+            return False
 
     def call(
         self,
         prompt: str,
         max_tokens: int = 4096,
         temperature: float = 0.7,
-        system: Optional[str] = None
+        system: Optional[str] = None,
+        usage_key: str = "other"
     ) -> str:
         """
         Claude API 호출
@@ -34,33 +364,29 @@ class ClaudeClient:
             max_tokens: 최대 토큰 수
             temperature: 온도 (0~1)
             system: 시스템 프롬프트
+            usage_key: 토큰 사용량 집계 키
 
         Returns:
             Claude의 응답 텍스트
         """
         try:
-            message = self.client.messages.create(
+            message = _send(
+                self.client.messages.create,
                 model=self.model,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                system=system if system else "You are a helpful assistant for Chungbuk National University multi-major program guidance.",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+                system=system if system else DEFAULT_SYSTEM,
+                messages=_build_messages(prompt, [])
             )
-
-            # 응답 추출
-            response_text = ""
-            for block in message.content:
-                if hasattr(block, 'text'):
-                    response_text += block.text
-
-            return response_text
+            token_usage.record(message.usage, usage_key)
+            return _extract_text(message)
 
         except Exception as e:
-            print(f"Error calling Claude API: {e}")
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_call_failed", error=repr(e), max_tokens=max_tokens)
             raise
 
+    @timed("routing")
     def call_router(self, prompt: str) -> str:
         """
         라우터 전용 호출 (온도 낮춤, 짧은 응답)
@@ -72,18 +398,22 @@ class ClaudeClient:
             prompt=prompt,
             max_tokens=100,
             temperature=0.3,
-            system="You are a classification router. Return only the exact label inside <output>...</output> tags."
+            system=ROUTER_SYSTEM,
+            usage_key="router"
         )
 
         return response.strip()
 
+    @timed("llm")
     def call_with_history(
         self,
         prompt: str,
         chat_history: list,
         max_tokens: int = 4096,
         temperature: float = 0.7,
-        system: Optional[str] = None
+        system: Optional[str] = None,
+        cached_system: Optional[str] = None,
+        usage_key: str = "other"
     ) -> str:
         """
         대화 이력을 포함한 Claude API 호출
@@ -94,47 +424,267 @@ class ClaudeClient:
             max_tokens: 최대 토큰 수
             temperature: 온도 (0~1)
             system: 시스템 프롬프트
+            cached_system: 프롬프트 캐시 대상 시스템 블록 (지시문 + 데이터 등 고정 부분)
+            usage_key: 토큰 사용량 집계 키
 
         Returns:
             Claude의 응답 텍스트
         """
         try:
-            # 메시지 리스트 구성
-            messages = []
-
-            # 이전 대화 이력 추가
-            for turn in chat_history:
-                messages.append({
-                    "role": turn["role"],
-                    "content": turn["content"]
-                })
-
-            # 현재 질문 추가
-            messages.append({
-                "role": "user",
-                "content": prompt
-            })
-
-            # Claude API 호출
-            message = self.client.messages.create(
+            message = _send(
+                self.client.messages.create,
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=_build_system(system, cached_system),
+                messages=_build_messages(prompt, chat_history),
+                extra_headers=PROMPT_CACHING_BETA if cached_system else None
+            )
+            token_usage.record(message.usage, usage_key)
+            return _extract_text(message)
+
+        except Exception as e:
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_call_failed", error=repr(e), history_turns=len(chat_history))
+            raise
+
+class AsyncClaudeClient:
+    """
+    ClaudeClient의 비동기 버전
+
+    이벤트 루프에서 직접 await 하므로 LLM 응답을 기다리는 동안 스레드를 점유하지 않음
+    """
+
+    def __init__(self):
+        self._http = _async_http_client()
+        self.client = AsyncAnthropic(api_key=_get_api_key(), http_client=self._http, max_retries=0)
+        self.model = MODEL
+
+    async def warmup(self) -> bool:
+        """ClaudeClient.warmup의 비동기 버전"""
+        try:
+            await self._http.get(str(self.client.base_url))
+            return True
+        except httpx.HTTPError as e:
+            diagnostics.error("llm_warmup_failed", error=repr(e))
+            return False
+
+    async def call(
+        self,
+        prompt: str,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        system: Optional[str] = None,
+        usage_key: str = "other"
+    ) -> str:
+        """Claude API 비동기 호출 (인자는 ClaudeClient.call과 동일)"""
+        try:
+            message = await _send_async(
+                self.client.messages.create,
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system if system else DEFAULT_SYSTEM,
+                messages=_build_messages(prompt, [])
+            )
+            token_usage.record(message.usage, usage_key)
+            return _extract_text(message)
+
+        except Exception as e:
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_call_failed", error=repr(e), max_tokens=max_tokens)
+            raise
+
+    @timed("routing")
+    async def call_router(self, prompt: str) -> str:
+        """라우터 전용 비동기 호출 (온도 낮춤, 짧은 응답)"""
+        response = await self.call(
+            prompt=prompt,
+            max_tokens=100,
+            temperature=0.3,
+            system=ROUTER_SYSTEM,
+            usage_key="router"
+        )
+
+        return response.strip()
+
+    @timed("llm")
+    async def call_with_history(
+        self,
+        prompt: str,
+        chat_history: list,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        system: Optional[str] = None,
+        cached_system: Optional[str] = None,
+        usage_key: str = "other"
+    ) -> str:
+        """대화 이력을 포함한 Claude API 비동기 호출 (인자는 ClaudeClient.call_with_history와 동일)"""
+        try:
+            message = await _send_async(
+                self.client.messages.create,
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=_build_system(system, cached_system),
+                messages=_build_messages(prompt, chat_history),
+                extra_headers=PROMPT_CACHING_BETA if cached_system else None
+            )
+            token_usage.record(message.usage, usage_key)
+            return _extract_text(message)
+
+        except Exception as e:
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_call_failed", error=repr(e), history_turns=len(chat_history))
+            raise
+
+    @timed("llm")
+    async def stream_with_history(
+        self,
+        prompt: str,
+        chat_history: list,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        system: Optional[str] = None,
+        cached_system: Optional[str] = None,
+        usage_key: str = "other"
+    ) -> AsyncIterator[str]:
+        """
+        대화 이력을 포함한 Claude API 스트리밍 호출 (인자는 call_with_history와 동일)
+
+        Yields:
+            생성되는 응답 텍스트 조각
+        """
+        try:
+            # 첫 이벤트 전 실패만 재시도 (이미 내보낸 조각은 되돌릴 수 없음)
+            stream = await _send_async(
+                self.client.messages.create,
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=_build_system(system, cached_system),
+                messages=_build_messages(prompt, chat_history),
+                extra_headers=PROMPT_CACHING_BETA if cached_system else None,
+                stream=True
+            )
+            async for text in _stream_text(stream, usage_key):
+                yield text
+
+        except Exception as e:
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_stream_failed", error=repr(e), history_turns=len(chat_history))
+            raise
+
+    @timed("routing")
+    async def call_tool(
+        self,
+        prompt: str,
+        chat_history: list,
+        tool: dict,
+        max_tokens: int = 256,
+        system: Optional[str] = None,
+        usage_key: str = "router"
+    ) -> Tuple[dict, str, list]:
+        """
+        지정한 도구 호출을 강제해 구조화된 선택을 받음
+
+        Returns:
+            (도구 입력, tool_use id, 도구 호출 턴까지의 메시지 리스트)
+            - 메시지 리스트는 continue_with_tool_result / stream_with_tool_result로 이어서 사용
+        """
+        messages = _build_messages(prompt, chat_history)
+        try:
+            message = await _send_async(
+                self.client.beta.tools.messages.create,
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=0.0,
+                system=system if system else DEFAULT_SYSTEM,
+                messages=messages,
+                tools=[tool],
+                # SDK 0.25에는 tool_choice 인자가 없어 요청 본문에 직접 추가
+                extra_body={"tool_choice": {"type": "tool", "name": tool["name"]}}
+            )
+            token_usage.record(message.usage, usage_key)
+
+        except Exception as e:
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_tool_call_failed", error=repr(e), tool=tool["name"])
+            raise
+
+        tool_use = next((b for b in message.content if b.type == "tool_use"), None)
+        if tool_use is None:
+            raise ValueError(f"tool_use block not found for {tool['name']}")
+
+        messages.append({
+            "role": "assistant",
+            "content": [{"type": "tool_use", "id": tool_use.id, "name": tool_use.name, "input": tool_use.input}]
+        })
+        return dict(tool_use.input), tool_use.id, messages
+
+    @timed("llm")
+    async def continue_with_tool_result(
+        self,
+        messages: list,
+        tool_use_id: str,
+        result: str,
+        tool: dict,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        system: Optional[str] = None,
+        usage_key: str = "other"
+    ) -> str:
+        """call_tool로 시작한 대화에 도구 결과를 넣어 이어서 답변 생성"""
+        try:
+            message = await _send_async(
+                self.client.beta.tools.messages.create,
                 model=self.model,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                system=system if system else "You are a helpful assistant for Chungbuk National University multi-major program guidance.",
-                messages=messages
+                system=system if system else DEFAULT_SYSTEM,
+                messages=_tool_result_messages(messages, tool_use_id, result),
+                tools=[tool]
             )
+            token_usage.record(message.usage, usage_key)
+            return _extract_text(message)
 
-            # 응답 추출
-            response_text = ""
-            for block in message.content:
-                if hasattr(block, 'text'):
-                    response_text += block.text
+        except Exception as e:
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_call_failed", error=repr(e), history_turns=len(messages))
+            raise
 
-            return response_text
+    @timed("llm")
+    async def stream_with_tool_result(
+        self,
+        messages: list,
+        tool_use_id: str,
+        result: str,
+        tool: dict,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        system: Optional[str] = None,
+        usage_key: str = "other"
+    ) -> AsyncIterator[str]:
+        """continue_with_tool_result의 스트리밍 버전"""
+        try:
+            stream = await _send_async(
+                self.client.beta.tools.messages.create,
+                model=self.model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system if system else DEFAULT_SYSTEM,
+                messages=_tool_result_messages(messages, tool_use_id, result),
+                tools=[tool],
+                stream=True
+            )
+            async for text in _stream_text(stream, usage_key):
+                yield text
 
         except Exception as e:
-            print(f"Error calling Claude API with history: {e}")
+            metrics.record_llm_error(e)
+            diagnostics.error("llm_stream_failed", error=repr(e), history_turns=len(messages))
             raise
 
 # 싱글톤 인스턴스
 claude_client = ClaudeClient()
+async_claude_client = AsyncClaudeClient()
@@ -0,0 +1,122 @@
+"""
+Prometheus 메트릭 모듈
+단계별 지연 히스토그램, 라벨/전공별 토큰, 라우팅 분포, 세션, LLM 오류/재시도 지표를 /metrics로 노출
+"""
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# 요청/단계 지연 버킷 (초): LLM 호출이 수 초 ~ 수십 초까지 걸리므로 꼬리를 넓게 잡음
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+REQUEST_LATENCY = Histogram(
+    "dawangi_request_duration_seconds",
+    "End-to-end request latency",
+    ["endpoint"],
+    buckets=_LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "dawangi_stage_duration_seconds",
+    "Time spent per pipeline stage (routing, prompt, llm, post)",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "dawangi_llm_tokens_total",
+    "Tokens reported in Anthropic usage fields",
+    ["label", "program", "type"]
+)
+LLM_CALLS = Counter(
+    "dawangi_llm_calls_total",
+    "Completed LLM calls",
+    ["label", "program"]
+)
+ROUTES = Counter(
+    "dawangi_routes_total",
+    "Routing decisions by label and source (fast_path, llm, tool, index, precomputed)",
+    ["label", "source"]
+)
+LLM_ERRORS = Counter(
+    "dawangi_llm_errors_total",
+    "LLM calls that failed after retries (CircuitOpenError / AdmissionRejected when rejected before sending)",
+    ["error"]
+)
+LLM_RETRIES = Counter(
+    "dawangi_llm_retries_total",
+    "Retries by reason (408/409/429/5xx status, timeout, connection)",
+    ["reason"]
+)
+LLM_CIRCUIT_STATE = Gauge(
+    "dawangi_llm_circuit_state",
+    "Anthropic API circuit breaker state (0 closed, 1 half-open, 2 open)"
+)
+COALESCED = Counter(
+    "dawangi_coalesced_requests_total",
+    "Requests that shared an identical in-flight request's result instead of calling the LLM"
+)
+ADMISSION_LIMIT = Gauge("dawangi_llm_admission_limit", "Adaptive (AIMD) concurrency limit for Anthropic API calls")
+ADMISSION_IN_FLIGHT = Gauge("dawangi_llm_admission_in_flight", "Anthropic API calls holding an admission slot")
+ADMISSION_QUEUED = Gauge("dawangi_llm_admission_queued", "LLM calls waiting in the admission queue")
+ADMISSION_REJECTED = Counter(
+    "dawangi_llm_admission_rejected_total",
+    "LLM calls rejected by admission control (queue_full, evicted, deadline)",
+    ["reason", "priority"]
+)
+SESSIONS = Gauge("dawangi_sessions", "Active sessions in the session store")
+SESSION_STORE_BYTES = Gauge("dawangi_session_store_bytes", "Approximate session store size in bytes")
+
+# usage 필드 → 메트릭 type 라벨
+_USAGE_FIELDS = {
+    "input_tokens": "input",
+    "output_tokens": "output",
+    "cache_read_input_tokens": "cache_read",
+    "cache_creation_input_tokens": "cache_creation",
+}
+_CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+def observe_request(endpoint: str, timings: Dict[str, float], total_ms: float) -> None:
+    """요청 종료 시 단계별 시간(ms) 기록"""
+    REQUEST_LATENCY.labels(endpoint).observe(total_ms / 1000)
+    for stage, ms in timings.items():
+        STAGE_LATENCY.labels(stage).observe(ms / 1000)
+
+def record_tokens(usage_key: str, usage) -> None:
+    """TokenUsage 집계 키("라벨:전공" 또는 "router" 등)를 label/program으로 나눠 기록"""
+    label, _, program = usage_key.partition(":")
+    LLM_CALLS.labels(label, program).inc()
+    for field, token_type in _USAGE_FIELDS.items():
+        value = getattr(usage, field, None)
+        if value:
+            LLM_TOKENS.labels(label, program, token_type).inc(value)
+
+def record_route(label: str, source: str) -> None:
+    ROUTES.labels(label, source).inc()
+
+def record_coalesced() -> None:
+    COALESCED.inc()
+
+def record_llm_error(error: Exception) -> None:
+    LLM_ERRORS.labels(type(error).__name__).inc()
+
+def record_retry(reason: str) -> None:
+    LLM_RETRIES.labels(reason).inc()
+
+def record_admission_rejected(reason: str, priority: str) -> None:
+    ADMISSION_REJECTED.labels(reason, priority).inc()
+
+def bind_admission(controller) -> None:
+    ADMISSION_LIMIT.set_function(lambda: controller.limit)
+    ADMISSION_IN_FLIGHT.set_function(lambda: controller.in_flight)
+    ADMISSION_QUEUED.set_function(lambda: controller.waiting)
+
+def bind_circuit_breaker(breaker) -> None:
+    LLM_CIRCUIT_STATE.set_function(lambda: _CIRCUIT_STATES[breaker.state])
+
+def bind_session_store(store) -> None:
+    """세션 수 / 저장소 크기는 스크레이프 시점에만 계산 (요청 경로에 비용 없음)"""
+    SESSIONS.set_function(store.backend.count)
+    SESSION_STORE_BYTES.set_function(store.backend.size_bytes)
+
+def render() -> tuple:
+    """(본문, Content-Type) 반환"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,161 @@
+"""
+FAQ 답변 사전 계산 CLI
+질문 목록을 현재 config.json / 프롬프트 / 데이터 파일로 미리 라우팅·답변해 사전 계산 답변 저장소에 기록
+
+실행 (backend 디렉토리에서, ANTHROPIC_API_KEY 필요):
+    python precompute.py --corpus faq_questions.json
+    python precompute.py --corpus faq_questions.json --dept 경영학부 --dept ""   # 학과별로 따로 계산
+    python precompute.py --corpus faq_questions.json --force                      # 전체 다시 생성
+    python precompute.py --corpus faq_questions.json --dry-run                    # 다시 만들 항목만 출력
+
+질문 목록 형식:
+    - .json: [{"question", "profile_dept"?, "selected_program"?, "program_name"?}, ...] 또는 질문 문자열 목록
+    - 그 외: 한 줄에 질문 하나 (#으로 시작하는 줄은 주석)
+    - 질문의 "{program}"은 config.json의 모든 전공 이름으로, program_name "*"은 모든 전공 ID로 펼침
+
+저장된 항목의 원본 해시(라우터 프롬프트/설정, 답변 프롬프트 + 데이터)가 현재와 같으면 건너뛰므로
+데이터/전공 파일을 고친 뒤 다시 실행하면 바뀐 파일에 해당하는 항목만 새로 생성됨.
+서버는 시작할 때 저장소를 읽음 (경로는 DAWANGI_ANSWER_STORE 환경 변수로 변경 가능)
+"""
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from data_loader import load_config
+from answer_store import answer_store, store_path
+from router_service import router_service
+from admission import admission
+
+BACKEND_DIR = Path(__file__).parent
+
+def program_ids() -> List[str]:
+    """config.json 라우팅에 등록된 전공 ID (등록 순서 유지)"""
+    programs = []
+    for route_config in load_config()["routing"].values():
+        for program in route_config.get("available_programs", []):
+            if program not in programs:
+                programs.append(program)
+    return programs
+
+def program_label(program: str) -> str:
+    """질문에 넣을 전공 이름 ("빅데이터_전공" → "빅데이터")"""
+    return program.split("_")[0]
+
+def load_corpus(path: Path, depts: List[str]) -> List[dict]:
+    """질문 목록 파일을 읽어 펼친 항목 목록 반환"""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        raw = [item if isinstance(item, dict) else {"question": item} for item in json.loads(text)]
+    else:
+        raw = [
+            {"question": line.strip()}
+            for line in text.splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+    items = []
+    for item in raw:
+        expanded = [item]
+        if "{program}" in item["question"]:
+            expanded = [
+                {**item, "question": item["question"].replace("{program}", program_label(program))}
+                for program in program_ids()
+            ]
+        if item.get("program_name") == "*":
+            expanded = [{**entry, "program_name": program} for entry in expanded for program in program_ids()]
+        if depts and "profile_dept" not in item:
+            expanded = [{**entry, "profile_dept": dept} for entry in expanded for dept in depts]
+        items += expanded
+    return items
+
+def item_key(item: dict) -> tuple:
+    return answer_store.make_key(
+        item["question"], item.get("profile_dept", ""), item.get("selected_program", ""), item.get("program_name")
+    )
+
+def compute(item: dict) -> Optional[tuple]:
+    # 가장 낮은 우선순위, 가장 긴 대기 기한 (업스트림 429를 받으면 동시 호출 수도 스스로 줄임)
+    with admission.scope("precompute"):
+        return router_service.precompute_answer(
+            question=item["question"],
+            profile_dept=item.get("profile_dept", ""),
+            selected_program=item.get("selected_program", ""),
+            program_name=item.get("program_name")
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="FAQ 답변 사전 계산")
+    parser.add_argument("--corpus", default=str(BACKEND_DIR / "faq_questions.json"), help="질문 목록 파일")
+    parser.add_argument("--out", default=str(store_path()), help="답변 저장소 경로")
+    parser.add_argument("--dept", action="append", default=[], help="profile_dept가 없는 질문에 적용할 소속 학과 (여러 번 지정 가능)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 LLM 호출 수")
+    parser.add_argument("--force", action="store_true", help="해시가 같아도 전부 다시 생성")
+    parser.add_argument("--prune", action="store_true", help="질문 목록에 없는 기존 항목 삭제")
+    parser.add_argument("--dry-run", action="store_true", help="생성하지 않고 다시 만들 항목만 출력")
+    args = parser.parse_args()
+
+    out_path = Path(args.out)
+    answer_store.load(out_path)
+    items = load_corpus(Path(args.corpus), args.dept)
+
+    # 같은 키는 한 번만 (질문 목록 중복 제거)
+    unique = {}
+    for item in items:
+        unique.setdefault(item_key(item), item)
+
+    pending = {
+        key: item for key, item in unique.items()
+        if args.force or key not in answer_store.entries or not answer_store.is_fresh(answer_store.entries[key])
+    }
+    summary = {"items": len(unique), "fresh": len(unique) - len(pending), "pending": len(pending)}
+
+    if args.dry_run:
+        summary["pending_questions"] = [item["question"] for item in pending.values()]
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+
+    start = time.perf_counter()
+    stored = skipped = 0
+    failures = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {pool.submit(compute, item): (key, item) for key, item in pending.items()}
+            for future in as_completed(futures):
+                key, item = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # 실패한 항목은 이전 항목(있으면)을 그대로 두고 다음 실행에서 다시 시도
+                    failures.append({"question": item["question"], "error": repr(e)})
+                    continue
+                if outcome is None:
+                    # 교과과정 인덱스로 바로 답하는 질문: 저장할 필요 없음
+                    answer_store.entries.pop(key, None)
+                    skipped += 1
+                    continue
+                result, program = outcome
+                answer_store.put(key, item["question"], program, result)
+                stored += 1
+    finally:
+        # 중단되어도 그때까지 만든 답변은 저장
+        if args.prune:
+            for key in set(answer_store.entries) - set(unique):
+                del answer_store.entries[key]
+        answer_store.save(out_path)
+
+    summary.update({
+        "stored": stored,
+        "index_answered": skipped,
+        "failed": len(failures),
+        "failures": failures[:20],
+        "entries": len(answer_store.entries),
+        "path": str(out_path),
+        "elapsed_s": round(time.perf_counter() - start, 1)
+    })
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+전공명 매칭 모듈
+config.json과 전공 현황 파일의 전공 이름/별칭으로 Aho-Corasick 오토마톤을 만들어
+질문을 한 번 훑으면서 여러 전공을 최장 일치로 찾고, 자모 n-gram 유사도로 오타도 허용
+"""
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from data_loader import load_config, load_file, file_signature, PROGRAM_CATALOG_PATH
+
+# 매칭 전에 질문/별칭에서 지우는 문자 (띄어쓰기, 가운뎃점, 구분자)
+_IGNORED = re.compile(r"[\s·ㆍ_\-]+")
+# 이름 끝에서 떼어 별칭으로도 쓰는 접미사 ("빅데이터전공" → "빅데이터")
+_SUFFIXES = ("융합전공", "전공", "융합")
+
+# 질문별 매칭 결과 보관 수 (한 요청에서 예측/라우팅/색인 답변이 같은 질문을 여러 번 매칭)
+_RESULT_CACHE_SIZE = 1024
+
+# 한글 음절 → 자모 (초성, 중성, 종성)
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+def normalize(text: str) -> str:
+    return _IGNORED.sub("", text).lower()
+
+@lru_cache(maxsize=4096)
+def jamo(char: str) -> str:
+    """'빅' → 'ㅂㅣㄱ' (한글 음절이 아니면 그대로)"""
+    code = ord(char) - 0xAC00
+    if not 0 <= code < 11172:
+        return char
+    return _CHO[code // 588] + _JUNG[code % 588 // 28] + _JONG[code % 28].strip()
+
+def _jamo_text(text: str) -> str:
+    return "".join(jamo(char) for char in text)
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+@dataclass(frozen=True, slots=True)
+class ProgramMatch:
+    """질문에서 찾은 전공 하나"""
+    program_id: Optional[str]  # config.json에 교과과정 데이터가 있는 전공 ID (없으면 None)
+    name: str                  # 전공 현황 파일의 이름 (없으면 전공 ID)
+    alias: str                 # 일치한 표기 (정규화)
+    start: int                 # 정규화한 질문 기준 위치
+    end: int
+    score: float               # 정확히 일치하면 1.0, 오타 허용 일치는 자모 bigram 유사도
+
+    def to_dict(self) -> dict:
+        return {
+            "program_id": self.program_id,
+            "name": self.name,
+            "alias": self.alias,
+            "score": round(self.score, 3)
+        }
+
+class _Automaton:
+    """Aho-Corasick 오토마톤 (문자 단위 전이, 실패 링크에 출력 병합)"""
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.out[state].append(index)
+
+        # 너비 우선으로 실패 링크 계산 (깊이 1은 루트)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                if state == 0:
+                    continue
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+        for child in self.goto[0].values():
+            self.fail[child] = 0
+
+    def step(self, state: int, char: str) -> int:
+        while state and char not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(char, 0)
+
+class ProgramMatcher:
+    """
+    전공 이름/별칭 → 전공
+
+    - 별칭: 전공 ID, 전공 현황의 이름, 접미사(전공/융합)를 뗀 이름, config.json program_matcher.aliases
+      (자동으로 만든 별칭이 두 전공에 겹치면 버림)
+    - 정확한 일치는 오토마톤으로 찾고 겹치면 가장 왼쪽 → 가장 긴 별칭 우선 ("보안컨설팅"이 "보안"보다 먼저)
+    - 같은 순회에서 질문의 자모 bigram 위치를 모아 두고, 정확히 일치하지 않은 전공은
+      별칭 길이만큼의 구간에서 별칭 bigram을 fuzzy_threshold 이상 포함하면 오타로 보고 일치 처리
+    - config.json / 전공 현황 파일이 바뀌면 다시 구성
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._aliases: List[str] = []
+        self._targets: List[Tuple[Optional[str], str]] = []  # 별칭별 (전공 ID, 이름)
+        self._automaton = _Automaton([])
+        self._alias_grams: List[Set[str]] = []
+        self._gram_index: Dict[str, List[int]] = {}
+        self._results: Dict[Tuple[str, bool], List[ProgramMatch]] = {}
+
+    def settings(self) -> dict:
+        return load_config().get("program_matcher", {})
+
+    def match(self, question: str, fuzzy_if_found: bool = True) -> List[ProgramMatch]:
+        """
+        질문에 나온 전공 목록 (나온 순서, 전공마다 한 번)
+
+        Args:
+            fuzzy_if_found: False면 교과과정 데이터가 있는 전공을 정확히 찾은 경우 오타 허용 검사 생략
+        """
+        self.ensure()
+        text = normalize(question)
+        key = (text, fuzzy_if_found)
+        cached = self._results.get(key)
+        if cached is not None:
+            return list(cached)
+
+        matches = self._match(text, fuzzy_if_found)
+        if len(self._results) >= _RESULT_CACHE_SIZE:
+            self._results = {}
+        self._results[key] = matches
+        return list(matches)
+
+    def _match(self, text: str, fuzzy_if_found: bool) -> List[ProgramMatch]:
+        settings = self.settings()
+        fuzzy = settings.get("fuzzy", True)
+        automaton = self._automaton
+
+        # 한 번의 순회: 오토마톤 전이 + 자모 bigram 위치 수집
+        hits: List[Tuple[int, int, int]] = []
+        grams: Dict[str, List[int]] = {}
+        jamo_chars: List[int] = []
+        previous = ""
+        state = 0
+        for position, char in enumerate(text):
+            state = automaton.step(state, char)
+            for index in automaton.out[state]:
+                hits.append((position + 1 - len(self._aliases[index]), position + 1, index))
+            if fuzzy:
+                for letter in jamo(char):
+                    if previous:
+                        grams.setdefault(previous + letter, []).append(len(jamo_chars) - 1)
+                    jamo_chars.append(position)
+                    previous = letter
+
+        matches = self._longest(hits)
+        if fuzzy and (fuzzy_if_found or not any(match.program_id for match in matches)):
+            matches += self._fuzzy(grams, jamo_chars, matches, settings)
+        matches.sort(key=lambda match: match.start)
+        return matches
+
+    def extract(self, question: str) -> Optional[str]:
+        """교과과정 데이터가 있는 전공 중 질문에 처음 나온 전공 ID"""
+        for match in self.match(question, fuzzy_if_found=False):
+            if match.program_id:
+                return match.program_id
+        return None
+
+    def _longest(self, hits: List[Tuple[int, int, int]]) -> List[ProgramMatch]:
+        """겹치는 일치 중 가장 왼쪽, 같은 위치면 가장 긴 별칭만 남김"""
+        matches, seen, covered = [], set(), 0
+        for start, end, index in sorted(hits, key=lambda hit: (hit[0], hit[0] - hit[1])):
+            if start < covered:
+                continue
+            covered = end
+            program_id, name = self._targets[index]
+            if name in seen:
+                continue
+            seen.add(name)
+            matches.append(ProgramMatch(program_id, name, self._aliases[index], start, end, 1.0))
+        return matches
+
+    def _fuzzy(
+        self,
+        grams: Dict[str, List[int]],
+        jamo_chars: List[int],
+        exact: List[ProgramMatch],
+        settings: dict
+    ) -> List[ProgramMatch]:
+        """정확히 일치하지 않은 전공 중 자모 bigram 유사도가 임계값 이상인 구간"""
+        threshold = settings.get("fuzzy_threshold", 0.75)
+        seen = {match.name for match in exact}
+        spans = [(match.start, match.end) for match in exact]
+
+        # 역색인으로 공유 bigram 수를 세어 후보만 구간 검사 (이미 찾은 전공의 별칭은 제외)
+        shared = Counter()
+        for gram in grams:
+            for index in self._gram_index.get(gram, ()):
+                if self._targets[index][1] not in seen:
+                    shared[index] += 1
+
+        best: Dict[str, ProgramMatch] = {}
+        for index, count in shared.items():
+            alias_grams = self._alias_grams[index]
+            if count < threshold * len(alias_grams):
+                continue
+            program_id, name = self._targets[index]
+
+            score, first, last = self._best_window(alias_grams, grams, len(alias_grams) + 2)
+            if score < threshold:
+                continue
+            start, end = jamo_chars[first], jamo_chars[last + 1] + 1
+            if any(start < span_end and span_start < end for span_start, span_end in spans):
+                continue
+            if name not in best or score > best[name].score:
+                best[name] = ProgramMatch(program_id, name, self._aliases[index], start, end, score)
+
+        # 오타 허용 일치끼리 겹치면 유사도가 높은 쪽만 남김 ("빅데이타" → 빅데이터, 공공데이터 아님)
+        kept: List[ProgramMatch] = []
+        for match in sorted(best.values(), key=lambda match: -match.score):
+            if not any(match.start < other.end and other.start < match.end for other in kept):
+                kept.append(match)
+        return kept
+
+    @staticmethod
+    def _best_window(alias_grams: Set[str], grams: Dict[str, List[int]], width: int) -> Tuple[float, int, int]:
+        """별칭 길이 구간 안에 들어오는 서로 다른 별칭 bigram 비율의 최댓값과 그 구간 (자모 위치)"""
+        positions = sorted((position, gram) for gram in alias_grams for position in grams.get(gram, ()))
+        window: Counter = Counter()
+        best, best_first, best_last, left = 0, 0, 0, 0
+        for right, (position, gram) in enumerate(positions):
+            window[gram] += 1
+            while position - positions[left][0] > width:
+                left_gram = positions[left][1]
+                window[left_gram] -= 1
+                if not window[left_gram]:
+                    del window[left_gram]
+                left += 1
+            if len(window) > best:
+                best, best_first, best_last = len(window), positions[left][0], position
+        return best / len(alias_grams), best_first, best_last
+
+    # --- 색인 구성 ---
+
+    def ensure(self) -> None:
+        """원본(config.json, 전공 현황 파일)이 바뀌었으면 다시 구성"""
+        signature = (
+            file_signature("config.json", pinned=False),
+            file_signature(PROGRAM_CATALOG_PATH, pinned=False),
+        )
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if signature != self._signature:
+                self._build()
+                self._signature = signature
+
+    def _build(self) -> None:
+        settings = self.settings()
+        config = load_config()
+        program_ids = []
+        for route_config in config["routing"].values():
+            for program in route_config.get("available_programs", []):
+                if program not in program_ids:
+                    program_ids.append(program)
+
+        # 이름 → 전공 ID (전공 현황에만 있는 전공은 None)
+        targets: Dict[str, Optional[str]] = {program: program for program in program_ids}
+        for name in parse_catalog_names(load_file(PROGRAM_CATALOG_PATH)):
+            key = normalize(name)
+            program_id = next((p for p in program_ids if normalize(p.split("_")[0]) in key), None)
+            if program_id is not None:
+                # 교과과정 데이터가 있는 전공은 전공 현황의 이름을 표시 이름으로
+                targets.pop(program_id, None)
+            targets[name] = program_id
+
+        # 자동 별칭 (두 전공에 겹치면 모호하므로 버림)
+        candidates: Dict[str, Set[str]] = {}
+        for name, program_id in targets.items():
+            names = {name, program_id.split("_")[0]} if program_id else {name}
+            if program_id:
+                names.add(program_id)
+            for value in names:
+                alias = normalize(value)
+                variants = {alias} | {
+                    alias[:-len(suffix)] for suffix in _SUFFIXES
+                    if alias.endswith(suffix) and len(alias) - len(suffix) >= 2
+                }
+                for variant in variants:
+                    candidates.setdefault(variant, set()).add(name)
+        aliases = {alias: owners.pop() for alias, owners in candidates.items() if len(owners) == 1}
+
+        # config.json 별칭 (전공 ID 또는 전공 현황 이름 → 별칭 목록)은 겹쳐도 우선
+        by_id = {program_id: name for name, program_id in targets.items() if program_id}
+        for target, extra in settings.get("aliases", {}).items():
+            name = by_id.get(target, target)
+            if name in targets:
+                for alias in extra:
+                    aliases[normalize(alias)] = name
+
+        alias_list = sorted(aliases)
+        self._aliases = alias_list
+        self._targets = [(targets[aliases[alias]], aliases[alias]) for alias in alias_list]
+        self._automaton = _Automaton(alias_list)
+
+        min_jamo = settings.get("fuzzy_min_jamo", 6)
+        self._alias_grams = []
+        gram_index: Dict[str, List[int]] = {}
+        for index, alias in enumerate(alias_list):
+            letters = _jamo_text(alias)
+            alias_grams = _bigrams(letters) if len(letters) >= min_jamo else set()
+            self._alias_grams.append(alias_grams)
+            for gram in alias_grams:
+                gram_index.setdefault(gram, []).append(index)
+        self._gram_index = gram_index
+        self._results = {}
+
+def parse_catalog_names(catalog_md: str) -> List[str]:
+    """전공 현황 파일의 '### 1. 노인복지' 제목에서 전공 이름 목록"""
+    return [
+        re.sub(r"^\d+\.\s*", "", match.group(1)).strip()
+        for match in re.finditer(r"^###\s+(.+)$", catalog_md, flags=re.MULTILINE)
+    ]
+
+# 싱글톤 인스턴스
+program_matcher = ProgramMatcher()
@@ -3,13 +3,45 @@
 질문을 분류하고 적절한 핸들러로 라우팅
 """
 import re
-from typing import Tuple, Optional
-from data_loader import load_file, get_prompt_and_data
-from llm_client import claude_client
+import math
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, List, Tuple, Optional, AsyncIterator
+from data_loader import load_config, load_file_cached, get_prompt_and_data, get_prompt_parts, get_prompt_template
+from llm_client import claude_client, async_claude_client, is_upstream_unavailable
+from diagnostics import diagnostics
+from timings import timed
+import metrics
+from lexical_router import lexical_router
+from answer_cache import answer_cache, normalize_question
+from answer_store import answer_store
+from curriculum_index import curriculum_index
+from course_overlap import course_overlap
+from program_matcher import program_matcher
+from history_manager import history_manager, estimate_tokens
+from speculation import speculation_stats
+from singleflight import singleflight
+from admission import admission, AdmissionRejected
+from circuit_breaker import CircuitOpenError
+
+VALID_LABELS = ["다전공_제도", "전공_현황", "융합전공_졸업요건", "융합전공_교과과정", "Unmatched"]
+
+# 교과과정 인덱스로 바로 답할 수 있는 질문 패턴
+_CATEGORY_CUE = re.compile(r"(전필|전공\s*필수|전선|전공\s*선택)")
+_YEAR_CUE = re.compile(r"([1-4])\s*학년")
+_SEMESTER_CUE = re.compile(r"([12])\s*학기")
+_LIST_CUE = re.compile(r"(목록|리스트|뭐|무엇|무슨|알려|어떤|과목)")
+_FREEFORM_CUE = re.compile(r"(중복|인정|타학과|대체|추천|차이|왜|어떻게|신청|졸업|논문|선수|난이도|교수|인데)")
+
+# 일괄 처리 중 같은 질문/프로필의 LLM 라우팅 결과 공유 (일괄 처리 밖에서는 None)
+_route_memo: ContextVar[Optional[Dict[tuple, asyncio.Future]]] = ContextVar("route_memo", default=None)
+
+UNAVAILABLE_MESSAGE = "지금은 답변 서버가 많이 바빠서 대답하기 어렵다왕... 😅\n잠시 후 다시 물어봐주라왕!"
 
 class RouterService:
-    def __init__(self):
-        self.router_prompt_template = load_file("prompt/prompt_multi_routing.txt")
+    def router_prompt_template(self) -> str:
+        """라우터 프롬프트 (파일이 바뀌면 다시 읽음)"""
+        return load_file_cached(load_config().get("router", {}).get("prompt", "prompt/prompt_multi_routing.txt"))
 
     def route_question(
         self,
@@ -28,23 +60,70 @@ class RouterService:
         Returns:
             라벨 (다전공_제도, 전공_현황, 융합전공_졸업요건, 융합전공_교과과정, Unmatched)
         """
-        # 프롬프트 변수 치환
-        router_prompt = self.router_prompt_template.replace("{{profile_dept}}", profile_dept)
-        router_prompt = router_prompt.replace("{{selected_program}}", selected_program)
-        router_prompt = router_prompt.replace("{{QUESTION}}", question)
+        # 로컬 fast-path로 확신할 수 있으면 LLM 호출 생략
+        label = lexical_router.route(question)
+        if label:
+            return label
+
+        router_prompt = self._build_router_prompt(question, profile_dept, selected_program)
 
         # LLM 호출
         response = claude_client.call_router(router_prompt)
 
-        # <output>라벨</output> 파싱
+        return self._parse_route(response, question)
+
+    async def route_question_async(
+        self,
+        question: str,
+        profile_dept: str = "",
+        selected_program: str = ""
+    ) -> str:
+        """route_question의 비동기 버전"""
+        label = lexical_router.route(question)
+        if label:
+            return label
+
+        return await self._route_llm_async(question, profile_dept, selected_program)
+
+    async def _route_llm_async(self, question: str, profile_dept: str, selected_program: str) -> str:
+        """LLM 라우터만 사용한 비동기 분류 (일괄 처리 중이면 같은 질문/프로필끼리 한 번만 호출)"""
+        memo = _route_memo.get()
+        if memo is None:
+            return await self._call_router_async(question, profile_dept, selected_program)
+
+        key = (normalize_question(question), profile_dept or "", selected_program or "")
+        future = memo.get(key)
+        if future is None:
+            future = memo[key] = asyncio.ensure_future(
+                self._call_router_async(question, profile_dept, selected_program)
+            )
+        # 기다리던 항목이 취소돼도 같은 라우팅을 기다리는 다른 항목에는 영향 없음
+        return await asyncio.shield(future)
+
+    async def _call_router_async(self, question: str, profile_dept: str, selected_program: str) -> str:
+        router_prompt = self._build_router_prompt(question, profile_dept, selected_program)
+        response = await async_claude_client.call_router(router_prompt)
+        return self._parse_route(response, question)
+
+    def _build_router_prompt(self, question: str, profile_dept: str, selected_program: str) -> str:
+        """라우터 프롬프트 변수 치환"""
+        router_prompt = self.router_prompt_template().replace("{{profile_dept}}", profile_dept)
+        router_prompt = router_prompt.replace("{{selected_program}}", selected_program)
+        return router_prompt.replace("{{QUESTION}}", question)
+
+    def _parse_route(self, response: str, question: str) -> str:
+        """<output>라벨</output> 파싱"""
         match = re.search(r'<output>(.+?)</output>', response)
         if match:
             label = match.group(1).strip()
             # 유효한 라벨인지 확인
-            valid_labels = ["다전공_제도", "전공_현황", "융합전공_졸업요건", "융합전공_교과과정", "Unmatched"]
-            if label in valid_labels:
+            if label in VALID_LABELS:
+                diagnostics.log("routed", label=label, question=question)
+                metrics.record_route(label, "llm")
                 return label
 
+        diagnostics.log("route_unparsed", label="Unmatched", question=question, response=response)
+        metrics.record_route("Unmatched", "llm")
         return "Unmatched"
 
     def generate_answer(
@@ -54,7 +133,8 @@ class RouterService:
         profile_dept: str = "",
         selected_program: str = "",
         program_name: Optional[str] = None,
-        chat_history: list = None
+        chat_history: list = None,
+        history_summary: str = ""
     ) -> Tuple[str, str]:
         """
         선택된 카테고리로 답변 생성
@@ -66,6 +146,7 @@ class RouterService:
             selected_program: 선택된 전공
             program_name: 전공명 (융합전공_교과과정인 경우)
             chat_history: 대화 이력
+            history_summary: 예산 밖으로 밀려난 이전 대화의 요약
 
         Returns:
             (answer, emotion) 튜플
@@ -76,30 +157,149 @@ class RouterService:
             chat_history = []
 
         try:
+            # 대화 이력이 없는 질문은 캐시 확인
+            cache_key = self._cache_key(question, label, profile_dept, selected_program, program_name, chat_history, history_summary)
+            cached = answer_cache.get(cache_key) if cache_key else None
+            if cached:
+                return cached
+
             # 프롬프트와 데이터 로드
-            prompt, _ = get_prompt_and_data(
-                label=label,
-                program_name=program_name,
-                profile_dept=profile_dept,
-                selected_program=selected_program,
-                question=question
+            request = self._answer_request(
+                question, label, profile_dept, selected_program, program_name, history_summary
             )
 
             # LLM 호출 (대화 이력 포함)
-            answer = claude_client.call_with_history(prompt, chat_history)
+            answer = claude_client.call_with_history(
+                chat_history=history_manager.select(chat_history, label), **request
+            )
 
             # 감정 상태 결정
             emotion = self._decide_emotion(answer, label)
 
+            if cache_key:
+                answer_cache.put(cache_key, answer, emotion)
+
             return answer, emotion
 
-        except FileNotFoundError as e:
-            error_msg = f"죄송해요, 해당 전공의 상세 정보를 찾을 수 없다왕... 😅\n교무과(043-261-3916, 3984)에 문의해보라왕!"
-            return error_msg, "embarrassed"
         except Exception as e:
-            error_msg = f"오류가 발생했다왕... 😅 잠시 후 다시 시도해보라왕!\n\n오류: {str(e)}"
+            return self._answer_error(e, label, program_name)
+
+    async def generate_answer_async(
+        self,
+        question: str,
+        label: str,
+        profile_dept: str = "",
+        selected_program: str = "",
+        program_name: Optional[str] = None,
+        chat_history: list = None,
+        history_summary: str = ""
+    ) -> Tuple[str, str]:
+        """generate_answer의 비동기 버전"""
+        if chat_history is None:
+            chat_history = []
+
+        try:
+            cache_key = self._cache_key(question, label, profile_dept, selected_program, program_name, chat_history, history_summary)
+            cached = answer_cache.get(cache_key) if cache_key else None
+            if cached:
+                return cached
+
+            request = self._answer_request(
+                question, label, profile_dept, selected_program, program_name, history_summary
+            )
+            answer = await async_claude_client.call_with_history(
+                chat_history=history_manager.select(chat_history, label), **request
+            )
+            emotion = self._decide_emotion(answer, label)
+
+            if cache_key:
+                answer_cache.put(cache_key, answer, emotion)
+
+            return answer, emotion
+
+        except Exception as e:
+            return self._answer_error(e, label, program_name)
+
+    @timed("prompt")
+    def _answer_request(
+        self,
+        question: str,
+        label: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        history_summary: str = ""
+    ) -> dict:
+        """
+        답변 생성 LLM 호출 인자 구성
+
+        프롬프트 캐싱이 켜져 있으면 지시문 + 데이터는 캐시 대상 시스템 블록으로,
+        프로필과 질문만 사용자 메시지로 보냄 (이전 대화 요약은 사용자 메시지 앞에 붙임)
+        """
+        usage_key = f"{label}:{program_name}" if program_name else label
+        summary = history_manager.summary_block(history_summary)
+        completed = course_overlap.prompt_json(program_name, profile_dept)
+
+        if load_config().get("llm", {}).get("prompt_caching", True):
+            cached_system, prompt = get_prompt_parts(
+                label=label,
+                program_name=program_name,
+                profile_dept=profile_dept,
+                selected_program=selected_program,
+                question=question,
+                completed_courses_json=completed
+            )
+            return {"prompt": summary + prompt, "cached_system": cached_system, "usage_key": usage_key}
+
+        prompt, _ = get_prompt_and_data(
+            label=label,
+            program_name=program_name,
+            profile_dept=profile_dept,
+            selected_program=selected_program,
+            question=question,
+            completed_courses_json=completed
+        )
+        return {"prompt": summary + prompt, "usage_key": usage_key}
+
+    def _cache_key(
+        self,
+        question: str,
+        label: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        chat_history: list,
+        history_summary: str = ""
+    ) -> Optional[tuple]:
+        """답변 캐시 키 생성 (캐시 비활성 또는 대화 이력/요약/이수 교과목이 있으면 None)"""
+        if answer_cache is None or chat_history or history_summary or course_overlap.completed():
+            return None
+        template = get_prompt_template(label, program_name)
+        return answer_cache.make_key(
+            question, label, program_name, profile_dept, selected_program, template.content_hash
+        )
+
+    def _answer_error(self, e: Exception, label: str, program_name: Optional[str]) -> Tuple[str, str]:
+        """
+        답변 생성 실패 시 사용자에게 보여줄 (메시지, 감정) 반환
+
+        입장 제어 거부와 서킷 open은 안내 문구 대신 그대로 올려 API가 429/503 + Retry-After로 응답하게 함
+        """
+        if isinstance(e, (AdmissionRejected, CircuitOpenError)):
+            raise e
+        if isinstance(e, FileNotFoundError):
+            diagnostics.error("data_not_found", label=label, program_name=program_name, error=str(e))
+            error_msg = f"죄송해요, 해당 전공의 상세 정보를 찾을 수 없다왕... 😅\n교무과(043-261-3916, 3984)에 문의해보라왕!"
             return error_msg, "embarrassed"
 
+        if is_upstream_unavailable(e):
+            diagnostics.error("llm_unavailable", label=label, program_name=program_name, error=repr(e))
+            return UNAVAILABLE_MESSAGE, "embarrassed"
+
+        diagnostics.error("generate_failed", label=label, program_name=program_name, error=repr(e))
+        error_msg = f"오류가 발생했다왕... 😅 잠시 후 다시 시도해보라왕!\n\n오류: {str(e)}"
+        return error_msg, "embarrassed"
+
     def _decide_emotion(self, answer: str, label: str) -> str:
         """
         답변 내용을 기반으로 감정 상태 결정
@@ -130,7 +330,8 @@ class RouterService:
         profile_dept: str = "",
         selected_program: str = "",
         program_name: Optional[str] = None,
-        chat_history: list = None
+        chat_history: list = None,
+        history_summary: str = ""
     ) -> dict:
         """
         전체 파이프라인 실행
@@ -141,6 +342,7 @@ class RouterService:
             selected_program: 선택된 전공
             program_name: 전공명 (융합전공_교과과정인 경우)
             chat_history: 대화 이력 (list of {role, content})
+            history_summary: 예산 밖으로 밀려난 이전 대화의 요약
 
         Returns:
             {
@@ -152,9 +354,621 @@ class RouterService:
         """
         if chat_history is None:
             chat_history = []
+        # Step 0: 교과과정 인덱스로 답할 수 있는 질문은 LLM 없이 바로 응답
+        structured = self._answer_from_index(question, program_name)
+        if structured:
+            return structured
+
+        precomputed = self._precomputed(question, profile_dept, selected_program, program_name, chat_history, history_summary)
+        if precomputed:
+            return precomputed
+
         # Step 1: 라우팅
+        try:
+            label = self.route_question(question, profile_dept, selected_program)
+        except Exception as e:
+            return self._route_error(e)
+
+        early = self._check_route(label, question, program_name)
+        if isinstance(early, dict):
+            return early
+        program_name = early
+
+        # Step 2: 답변 생성
+        answer, emotion = self.generate_answer(
+            question=question,
+            label=label,
+            profile_dept=profile_dept,
+            selected_program=selected_program,
+            program_name=program_name,
+            chat_history=chat_history,
+            history_summary=history_summary
+        )
+
+        return self._finalize(answer, label, emotion)
+
+    async def chatbot_pipeline_async(
+        self,
+        question: str,
+        profile_dept: str = "",
+        selected_program: str = "",
+        program_name: Optional[str] = None,
+        chat_history: list = None,
+        history_summary: str = "",
+        last_label: Optional[str] = None
+    ) -> dict:
+        """
+        chatbot_pipeline의 비동기 버전 (반환값 동일)
+
+        last_label: 직전 턴의 라우팅 라벨 (세션에 보관)
+
+        LLM 라우터를 불러야 할 때 이번 턴의 라벨을 예측할 수 있으면(명시된 전공,
+        직전 턴 라벨) 라우팅과 동시에 예측 라벨로 답변 생성을 시작하고,
+        라우팅 결과가 다르면 취소
+
+        대화 이력이 없는 요청은 같은 질문/프로필의 요청이 처리 중이면 그 결과를 공유
+        """
+        if chat_history is None:
+            chat_history = []
+
+        def run():
+            return self._run_pipeline_async(
+                question, profile_dept, selected_program, program_name, chat_history, history_summary, last_label
+            )
+
+        flight_key = self._flight_key(question, profile_dept, selected_program, program_name, chat_history, history_summary)
+        if flight_key is None:
+            return await run()
+
+        result, shared = await singleflight.do(flight_key, run)
+        if shared:
+            metrics.record_coalesced()
+        # 병합된 요청끼리 같은 dict를 공유하지 않도록 복사 (app.py에서 session_id를 추가함)
+        return dict(result)
+
+    async def chatbot_pipeline_batch(
+        self,
+        items: List[dict],
+        concurrency: int = 8
+    ) -> AsyncIterator[Tuple[List[int], dict]]:
+        """
+        여러 질문을 최대 concurrency개씩 동시에 처리하고 끝나는 순서대로 반환
+
+        Args:
+            items: {"question", "profile_dept", "selected_program", "program_name"} 목록 (대화 이력 없음)
+            concurrency: 동시에 실행할 파이프라인 수
+
+        Yields:
+            (이 결과를 받는 항목 인덱스 목록, chatbot_pipeline과 같은 결과 dict)
+
+        - 질문/프로필/전공이 같은 항목은 한 번만 처리하고 결과를 함께 반환
+        - 질문/프로필이 같은 항목끼리는 LLM 라우팅을 한 번만 호출
+        - 템플릿 컴파일/섹션 색인은 이미 (라벨, 전공)별로 캐시되어 항목 간에 공유됨
+        - 항목 하나가 실패해도 나머지는 계속 처리 (success False, error 포함)
+        """
+        groups: Dict[tuple, List[int]] = {}
+        for index, item in enumerate(items):
+            key = (
+                normalize_question(item["question"]),
+                item.get("profile_dept") or "",
+                item.get("selected_program") or "",
+                item.get("program_name") or ""
+            )
+            groups.setdefault(key, []).append(index)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        token = _route_memo.set({})
+
+        async def run(indexes: List[int]) -> Tuple[List[int], dict]:
+            item = items[indexes[0]]
+            async with semaphore:
+                try:
+                    # 대화 요청보다 낮은 우선순위 (호출마다 batch 대기 기한 적용)
+                    with admission.scope("batch"):
+                        result = await self.chatbot_pipeline_async(
+                            question=item["question"],
+                            profile_dept=item.get("profile_dept") or "",
+                            selected_program=item.get("selected_program") or "",
+                            program_name=item.get("program_name")
+                        )
+                except (AdmissionRejected, CircuitOpenError) as e:
+                    result = {"success": False, "error": str(e), "retry_after": math.ceil(e.retry_after)}
+                except Exception as e:
+                    diagnostics.error("batch_item_failed", error=repr(e))
+                    result = {"success": False, "error": str(e)}
+            return indexes, result
+
+        # 태스크가 만들어질 때 컨텍스트(라우팅 공유 dict)가 복사됨
+        tasks = [asyncio.create_task(run(indexes)) for indexes in groups.values()]
+        _route_memo.reset(token)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 클라이언트가 연결을 끊으면 남은 항목 취소
+            for task in tasks:
+                task.cancel()
+
+    def _flight_key(
+        self,
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        chat_history: list,
+        history_summary: str
+    ) -> Optional[tuple]:
+        """요청 병합 키 (비활성이거나 대화 이력/요약/이수 교과목이 있어 답변이 달라질 수 있으면 None)"""
+        if chat_history or history_summary or course_overlap.completed():
+            return None
+        if not load_config().get("singleflight", {}).get("enabled", True):
+            return None
+        return (normalize_question(question), profile_dept or "", selected_program or "", program_name or "")
+
+    async def _run_pipeline_async(
+        self,
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        chat_history: list,
+        history_summary: str,
+        last_label: Optional[str]
+    ) -> dict:
+        """chatbot_pipeline_async 본체 (요청 병합 없이 실행)"""
+        structured = self._answer_from_index(question, program_name)
+        if structured:
+            return structured
+
+        precomputed = self._precomputed(question, profile_dept, selected_program, program_name, chat_history, history_summary)
+        if precomputed:
+            return precomputed
+
+        answer_args = dict(
+            question=question,
+            profile_dept=profile_dept,
+            selected_program=selected_program,
+            chat_history=chat_history,
+            history_summary=history_summary
+        )
+
+        label = lexical_router.route(question)
+        if not label and self._single_call():
+            return await self._single_call_pipeline(
+                program_name=program_name, **answer_args
+            )
+
+        prediction = None if label else self._predict_route(question, program_name, last_label)
+        speculative = None
+        if prediction:
+            speculative = asyncio.create_task(self.generate_answer_async(
+                label=prediction[0], program_name=prediction[1], **answer_args
+            ))
+
+        try:
+            if not label:
+                label = await self._route_llm_async(question, profile_dept, selected_program)
+        except BaseException as e:
+            if speculative:
+                speculative.cancel()
+            if isinstance(e, Exception):
+                return self._route_error(e)
+            raise
+
+        early = self._check_route(label, question, program_name)
+        program_name = None if isinstance(early, dict) else early
+
+        if speculative:
+            if (label, program_name) == prediction:
+                speculation_stats.record_hit(label, program_name)
+                answer, emotion = await speculative
+                return self._finalize(answer, label, emotion)
+            self._discard_speculation(speculative, prediction, question, label)
+
+        if isinstance(early, dict):
+            return early
+
+        answer, emotion = await self.generate_answer_async(
+            label=label, program_name=program_name, **answer_args
+        )
+
+        return self._finalize(answer, label, emotion)
+
+    def _predict_route(
+        self,
+        question: str,
+        program_name: Optional[str],
+        last_label: Optional[str]
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        추측 실행용 (라벨, 전공) 예측
+
+        - 전공이 명시되어 있으면 융합전공_교과과정
+        - 아니면 직전 턴의 라벨을 그대로 사용 (후속 질문은 대부분 같은 주제)
+        """
+        if not load_config().get("speculation", {}).get("enabled", True):
+            return None
+
+        if program_name:
+            return "융합전공_교과과정", program_name
+
+        if not last_label or last_label == "Unmatched":
+            return None
+
+        # 교과과정은 질문에서 전공을 찾을 수 있을 때만 (없으면 라우팅 후에도 답변 생성 안 함)
+        if last_label == "융합전공_교과과정":
+            program = self._extract_program_name(question)
+            return (last_label, program) if program else None
+
+        return last_label, None
+
+    def _discard_speculation(
+        self,
+        task: "asyncio.Task",
+        prediction: Tuple[str, Optional[str]],
+        question: str,
+        label: str
+    ) -> None:
+        """
+        빗나간 추측 호출 취소 + 낭비된 토큰 추정치 기록
+
+        추측 호출의 실패(입장 거부, 업스트림 오류 등)는 요청 결과에 영향을 주지 않도록 여기서 소비
+        """
+        finished = task.done() and not task.cancelled()
+        task.cancel()
+        # 이미 실패로 끝난 태스크는 예외를 꺼내 두어 다시 올라오지 않게 함 (답변 토큰도 없음)
+        if finished and task.exception() is not None:
+            finished = False
+
+        predicted_label, predicted_program = prediction
+        try:
+            template = get_prompt_template(predicted_label, predicted_program)
+            wasted = estimate_tokens(template.static_text or template.md_content) + estimate_tokens(question)
+        except Exception:
+            wasted = 0
+        if finished:
+            wasted += estimate_tokens(task.result()[0])
+
+        speculation_stats.record_miss(predicted_label, label, wasted)
+
+    async def chatbot_pipeline_stream(
+        self,
+        question: str,
+        profile_dept: str = "",
+        selected_program: str = "",
+        program_name: Optional[str] = None,
+        chat_history: list = None,
+        history_summary: str = ""
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        답변을 토큰 단위로 흘려보내는 파이프라인
+
+        Yields:
+            (이벤트명, 데이터) 튜플
+            - ("meta", {"label"}): 라우팅 직후 1회
+            - ("delta", {"text"}): 생성되는 답변 조각
+            - ("done", chatbot_pipeline과 같은 결과 dict): 마지막 1회
+        """
+        if chat_history is None:
+            chat_history = []
+
+        structured = self._answer_from_index(question, program_name) or self._precomputed(
+            question, profile_dept, selected_program, program_name, chat_history, history_summary
+        )
+        if structured:
+            yield "meta", {"label": structured["label"]}
+            yield "delta", {"text": structured["answer"]}
+            yield "done", structured
+            return
+
+        label = lexical_router.route(question)
+        if not label and self._single_call():
+            async for event in self._single_call_stream(
+                question, profile_dept, selected_program, program_name, chat_history, history_summary
+            ):
+                yield event
+            return
+
+        if not label:
+            try:
+                label = await self._route_llm_async(question, profile_dept, selected_program)
+            except Exception as e:
+                result = self._route_error(e)
+                yield "meta", {"label": result["label"]}
+                yield "done", result
+                return
+        yield "meta", {"label": label}
+
+        early = self._check_route(label, question, program_name)
+        if isinstance(early, dict):
+            yield "done", early
+            return
+        program_name = early
+
+        chunks = []
+        try:
+            cache_key = self._cache_key(question, label, profile_dept, selected_program, program_name, chat_history, history_summary)
+            cached = answer_cache.get(cache_key) if cache_key else None
+            if cached:
+                yield "delta", {"text": cached[0]}
+                yield "done", self._finalize(cached[0], label, cached[1])
+                return
+
+            request = self._answer_request(
+                question, label, profile_dept, selected_program, program_name, history_summary
+            )
+            async for text in async_claude_client.stream_with_history(
+                chat_history=history_manager.select(chat_history, label), **request
+            ):
+                chunks.append(text)
+                yield "delta", {"text": text}
+
+            answer = "".join(chunks)
+            emotion = self._decide_emotion(answer, label)
+
+            if cache_key:
+                answer_cache.put(cache_key, answer, emotion)
+
+        except Exception as e:
+            answer, emotion = self._answer_error(e, label, program_name)
+
+        yield "done", self._finalize(answer, label, emotion)
+
+    def _single_call(self) -> bool:
+        """config.json pipeline.mode가 single_call이면 라우팅과 답변을 한 대화로 처리"""
+        return load_config().get("pipeline", {}).get("mode", "two_call") == "single_call"
+
+    def _route_tool(self) -> dict:
+        """단일 호출 모드에서 라벨/전공 선택에 쓰는 도구 정의 (config.json 라우트 설명으로 구성)"""
+        config = load_config()
+        routing = config["routing"]
+        return {
+            "name": "select_route",
+            "description": "질문을 처리할 카테고리를 선택한다. 선택하면 해당 카테고리의 안내 지시문과 데이터가 반환된다.",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "label": {
+                        "type": "string",
+                        "enum": VALID_LABELS,
+                        "description": "; ".join(
+                            f"{label}: {route.get('description', '')}" for label, route in routing.items()
+                        ) + "; Unmatched: 다(부)전공과 무관한 질문"
+                    },
+                    "program_name": {
+                        "type": "string",
+                        "enum": routing["융합전공_교과과정"].get("available_programs", []),
+                        "description": "label이 융합전공_교과과정일 때 질문이 가리키는 전공"
+                    }
+                },
+                "required": ["label"]
+            }
+        }
+
+    async def _select_route_by_tool(
+        self,
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        chat_history: list
+    ) -> tuple:
+        """
+        단일 호출 모드의 라우팅: 라우터 프롬프트와 함께 select_route 도구 호출을 강제
+
+        Returns:
+            (label, _check_route 결과, tool_use id, 이어갈 메시지 리스트)
+        """
+        tool = self._route_tool()
+        selection, tool_use_id, messages = await async_claude_client.call_tool(
+            prompt=self._build_router_prompt(question, profile_dept, selected_program),
+            chat_history=history_manager.select(chat_history, "router"),
+            tool=tool
+        )
+
+        label = selection.get("label")
+        if label not in VALID_LABELS:
+            label = "Unmatched"
+        diagnostics.log("routed", label=label, question=question, mode="single_call")
+        metrics.record_route(label, "tool")
+
+        if label == "융합전공_교과과정" and not program_name:
+            program_name = selection.get("program_name")
+        early = self._check_route(label, question, program_name)
+        return label, early, tool_use_id, messages
+
+    @timed("prompt")
+    def _tool_result(
+        self,
+        question: str,
+        label: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        history_summary: str
+    ) -> str:
+        """select_route 도구 결과: 선택된 라벨의 지시문 + 데이터 + 질문"""
+        prompt, _ = get_prompt_and_data(
+            label=label,
+            program_name=program_name,
+            profile_dept=profile_dept,
+            selected_program=selected_program,
+            question=question,
+            completed_courses_json=course_overlap.prompt_json(program_name, profile_dept)
+        )
+        return history_manager.summary_block(history_summary) + prompt
+
+    async def _single_call_pipeline(
+        self,
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        chat_history: list,
+        history_summary: str
+    ) -> dict:
+        """
+        단일 대화 파이프라인
+
+        라우터 호출(텍스트 라벨 파싱) 대신 select_route 도구 호출로 라벨/전공을 받고,
+        같은 대화에 tool_result로 데이터를 넣어 바로 답변을 이어서 생성
+        """
+        try:
+            label, early, tool_use_id, messages = await self._select_route_by_tool(
+                question, profile_dept, selected_program, program_name, chat_history
+            )
+        except Exception as e:
+            return self._route_error(e)
+        if isinstance(early, dict):
+            return early
+        program_name = early
+
+        try:
+            cache_key = self._cache_key(question, label, profile_dept, selected_program, program_name, chat_history, history_summary)
+            cached = answer_cache.get(cache_key) if cache_key else None
+            if cached:
+                return self._finalize(cached[0], label, cached[1])
+
+            answer = await async_claude_client.continue_with_tool_result(
+                messages=messages,
+                tool_use_id=tool_use_id,
+                result=self._tool_result(
+                    question, label, profile_dept, selected_program, program_name, history_summary
+                ),
+                tool=self._route_tool(),
+                usage_key=f"{label}:{program_name}" if program_name else label
+            )
+            emotion = self._decide_emotion(answer, label)
+
+            if cache_key and answer:
+                answer_cache.put(cache_key, answer, emotion)
+
+        except Exception as e:
+            answer, emotion = self._answer_error(e, label, program_name)
+
+        # 모델이 텍스트 없이 끝낸 경우 일반 답변 생성으로 대체
+        if not answer:
+            answer, emotion = await self.generate_answer_async(
+                question=question,
+                label=label,
+                profile_dept=profile_dept,
+                selected_program=selected_program,
+                program_name=program_name,
+                chat_history=chat_history,
+                history_summary=history_summary
+            )
+
+        return self._finalize(answer, label, emotion)
+
+    async def _single_call_stream(
+        self,
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        chat_history: list,
+        history_summary: str
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """_single_call_pipeline의 스트리밍 버전 (이벤트 형식은 chatbot_pipeline_stream과 동일)"""
+        try:
+            label, early, tool_use_id, messages = await self._select_route_by_tool(
+                question, profile_dept, selected_program, program_name, chat_history
+            )
+        except Exception as e:
+            result = self._route_error(e)
+            yield "meta", {"label": result["label"]}
+            yield "done", result
+            return
+        yield "meta", {"label": label}
+        if isinstance(early, dict):
+            yield "done", early
+            return
+        program_name = early
+
+        chunks = []
+        try:
+            cache_key = self._cache_key(question, label, profile_dept, selected_program, program_name, chat_history, history_summary)
+            cached = answer_cache.get(cache_key) if cache_key else None
+            if cached:
+                yield "delta", {"text": cached[0]}
+                yield "done", self._finalize(cached[0], label, cached[1])
+                return
+
+            async for text in async_claude_client.stream_with_tool_result(
+                messages=messages,
+                tool_use_id=tool_use_id,
+                result=self._tool_result(
+                    question, label, profile_dept, selected_program, program_name, history_summary
+                ),
+                tool=self._route_tool(),
+                usage_key=f"{label}:{program_name}" if program_name else label
+            ):
+                chunks.append(text)
+                yield "delta", {"text": text}
+
+            answer = "".join(chunks)
+            emotion = self._decide_emotion(answer, label)
+
+            if cache_key and answer:
+                answer_cache.put(cache_key, answer, emotion)
+
+        except Exception as e:
+            answer, emotion = self._answer_error(e, label, program_name)
+
+        yield "done", self._finalize(answer, label, emotion)
+
+    def _precomputed(
+        self,
+        question: str,
+        profile_dept: str,
+        selected_program: str,
+        program_name: Optional[str],
+        chat_history: list,
+        history_summary: str
+    ) -> Optional[dict]:
+        """사전 계산 저장소의 결과 (대화 이력/요약/이수 교과목이 있으면 사용하지 않음)"""
+        if chat_history or history_summary or course_overlap.completed():
+            return None
+        result = answer_store.lookup(question, profile_dept, selected_program, program_name)
+        if result:
+            metrics.record_route(result["label"], "precomputed")
+        return result
+
+    def precompute_answer(
+        self,
+        question: str,
+        profile_dept: str = "",
+        selected_program: str = "",
+        program_name: Optional[str] = None
+    ) -> Optional[Tuple[dict, Optional[str]]]:
+        """
+        사전 계산용 파이프라인 (precompute.py)
+
+        chatbot_pipeline과 같은 순서로 처리하되 LLM 오류를 안내 문구로 바꾸지 않고 그대로 올림
+        (오류 문구가 저장되지 않도록)
+
+        Returns:
+            (결과 dict, 답변에 쓴 전공명). 교과과정 인덱스로 바로 답하는 질문은 None (저장 불필요)
+        """
+        if self._answer_from_index(question, program_name):
+            return None
+
         label = self.route_question(question, profile_dept, selected_program)
+        early = self._check_route(label, question, program_name)
+        if isinstance(early, dict):
+            return early, None
+
+        request = self._answer_request(question, label, profile_dept, selected_program, early)
+        answer = claude_client.call_with_history(chat_history=[], **request)
+        return self._finalize(answer, label, self._decide_emotion(answer, label)), early
+
+    def _check_route(self, label: str, question: str, program_name: Optional[str]):
+        """
+        라우팅 결과로 답변 생성이 가능한지 확인
 
+        Returns:
+            바로 반환할 결과 dict, 또는 답변 생성에 쓸 program_name (None 가능)
+        """
         if label == "Unmatched":
             return {
                 "answer": "죄송해요, 저는 충북대 다(부)전공 안내만 도와드릴 수 있어요. 😅",
@@ -163,7 +977,6 @@ class RouterService:
                 "success": False
             }
 
-        # Step 2: 답변 생성
         # 융합전공_교과과정인 경우 program_name 필요
         if label == "융합전공_교과과정" and not program_name:
             # 질문에서 전공명 추출 시도
@@ -176,57 +989,96 @@ class RouterService:
                     "success": False
                 }
 
-        answer, emotion = self.generate_answer(
-            question=question,
-            label=label,
-            profile_dept=profile_dept,
-            selected_program=selected_program,
-            program_name=program_name,
-            chat_history=chat_history
-        )
+        return program_name
 
-        # 다왕 말투 적용
-        answer = self._apply_dawangi_tone(answer)
+    def _route_error(self, e: Exception) -> dict:
+        """
+        라우팅 LLM 호출 실패 시 바로 반환할 결과
 
+        업스트림 장애(재시도 소진)는 500 대신 다왕 안내 메시지(success False)로 응답하고,
+        서킷 open은 API가 503 + Retry-After로 응답하도록, 그 외 오류와 함께 그대로 올림
+        """
+        if isinstance(e, CircuitOpenError) or not is_upstream_unavailable(e):
+            raise e
+        diagnostics.error("route_unavailable", error=repr(e))
         return {
-            "answer": answer,
+            "answer": UNAVAILABLE_MESSAGE,
+            "label": "Unmatched",
+            "emotion": "embarrassed",
+            "success": False
+        }
+
+    @timed("post")
+    def _finalize(self, answer: str, label: str, emotion: str) -> dict:
+        """다왕 말투를 적용해 최종 결과 구성 (업스트림 장애 안내는 실패로 표시)"""
+        return {
+            "answer": self._apply_dawangi_tone(answer),
             "label": label,
             "emotion": emotion,
-            "success": True
+            "success": answer != UNAVAILABLE_MESSAGE
         }
 
-    def _extract_program_name(self, question: str) -> Optional[str]:
-        """질문에서 전공명 추출"""
-        available_programs = [
-            "빅데이터_전공",
-            "지식재산_스마트융합",
-            "위기관리_전공",
-            "보안컨설팅_전공",
-            "벤처비즈니스_전공",
-            "이차전지_융합전공",
-            "공공데이터사이언스_전공"
-        ]
-
-        # 키워드 매칭
-        keywords_map = {
-            "빅데이터": "빅데이터_전공",
-            "지식재산": "지식재산_스마트융합",
-            "스마트융합": "지식재산_스마트융합",
-            "위기관리": "위기관리_전공",
-            "보안컨설팅": "보안컨설팅_전공",
-            "보안": "보안컨설팅_전공",
-            "벤처비즈니스": "벤처비즈니스_전공",
-            "벤처": "벤처비즈니스_전공",
-            "이차전지": "이차전지_융합전공",
-            "공공데이터사이언스": "공공데이터사이언스_전공",
-            "공공데이터": "공공데이터사이언스_전공"
-        }
+    def _answer_from_index(self, question: str, program_name: Optional[str] = None) -> Optional[dict]:
+        """
+        "빅데이터 전필 과목 목록" 같은 순수 조회형 질문을 교과과정 인덱스로 바로 답변
+
+        전공 + (이수구분 또는 학년) + 목록 요청만 있고 설명이 필요한 단서가 없을 때만 처리
+
+        Returns:
+            chatbot_pipeline과 같은 결과 dict, 처리할 수 없으면 None
+        """
+        if not load_config().get("curriculum_index", {}).get("structured_answers", True):
+            return None
+        if _FREEFORM_CUE.search(question) or not _LIST_CUE.search(question):
+            return None
+
+        category_match = _CATEGORY_CUE.search(question)
+        year_match = _YEAR_CUE.search(question)
+        semester_match = _SEMESTER_CUE.search(question)
+        if not category_match and not year_match:
+            return None
 
-        for keyword, program in keywords_map.items():
-            if keyword in question:
-                return program
+        program = program_name or self._extract_program_name(question)
+        if not program:
+            return None
 
-        return None
+        category = category_match.group(1).replace(" ", "") if category_match else None
+        year = int(year_match.group(1)) if year_match else None
+        semester = int(semester_match.group(1)) if semester_match else None
+        courses = curriculum_index.courses(program, category, year, semester)
+        if courses is None:
+            return None
+
+        # 조건 설명: "3학년 1학기 전필"
+        condition = " ".join(filter(None, [
+            f"{year}학년" if year else None,
+            f"{semester}학기" if semester else None,
+            category
+        ]))
+        program_label = program.replace("_", " ")
+
+        if not courses:
+            answer = f"{program_label} 교육과정에는 {condition} 과목이 없다왕!"
+        else:
+            total_credits = sum(c.credits for c in courses)
+            lines = [f"{program_label} {condition} 과목은 총 **{len(courses)}과목 {total_credits}학점**이다왕!", ""]
+            for c in courses:
+                term = f"{c.year}학년 {c.semester}학기" if c.semester else (f"{c.year}학년" if c.year else "-")
+                lines.append(f"• {term} | {c.category} | {c.name} ({c.number}) | {c.department} | {c.credits}학점")
+            answer = "\n".join(lines)
+
+        diagnostics.log("answered_from_index", label="융합전공_교과과정", program_name=program, question=question)
+        metrics.record_route("융합전공_교과과정", "index")
+        return {
+            "answer": answer,
+            "label": "융합전공_교과과정",
+            "emotion": "joy" if courses else "neutral",
+            "success": True
+        }
+
+    def _extract_program_name(self, question: str) -> Optional[str]:
+        """질문에서 전공명 추출 (교과과정 데이터가 있는 전공 중 처음 나온 전공)"""
+        return program_matcher.extract(question)
 
     def _apply_dawangi_tone(self, text: str) -> str:
         """
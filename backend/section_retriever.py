@@ -0,0 +1,210 @@
+"""
+섹션 검색 모듈
+MD 데이터 파일을 제목 단위로 나누고 질문과 관련된 섹션만 골라 프롬프트에 주입
+"""
+import re
+import math
+import threading
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Dict, List, Tuple
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_NON_WORD = re.compile(r"[^0-9A-Za-z가-힣]+")
+
+# BM25 파라미터
+_K1 = 1.2
+_B = 0.75
+# 최고 점수 대비 이 비율 미만인 섹션은 top_k 안이라도 제외
+_RELATIVE_CUTOFF = 0.25
+
+def _terms(text: str) -> List[str]:
+    """공백/기호를 제거한 문자열의 문자 2-gram + 3-gram (형태소 분석 없이 한국어 부분 일치)"""
+    normalized = _NON_WORD.sub("", text).lower()
+    grams = [normalized[i:i + 2] for i in range(len(normalized) - 1)]
+    grams += [normalized[i:i + 3] for i in range(len(normalized) - 2)]
+    return grams
+
+@dataclass(frozen=True)
+class Section:
+    """제목 하나와 그 아래 본문 (상위 제목 경로 포함)"""
+    index: int
+    path: Tuple[str, ...]
+    text: str
+
+def _truncate(text: str, limit: int) -> str:
+    """limit 글자 안의 마지막 줄바꿈까지 자름 (한 줄이 limit보다 길면 글자 단위)"""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit + 1)
+    return text[:cut if cut > 0 else max(limit, 0)]
+
+def chunk_markdown(md_content: str) -> List[Section]:
+    """
+    MD 문서를 제목 줄 기준으로 분할
+
+    각 섹션은 상위 제목 경로를 함께 가지므로 "## 연계전공 > ### 1. 통합사회"처럼
+    어느 분류에 속한 섹션인지 잃지 않음
+    """
+    sections = []
+    stack: List[Tuple[int, str]] = []
+    lines: List[str] = []
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if text:
+            sections.append(Section(len(sections), tuple(title for _, title in stack), text))
+
+    for line in md_content.split("\n"):
+        match = _HEADING.match(line.strip())
+        if match:
+            flush()
+            lines = []
+            level = len(match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, line.strip()))
+        lines.append(line)
+
+    flush()
+    return sections
+
+class _SectionIndex:
+    """한 파일의 섹션별 BM25 색인"""
+
+    def __init__(self, md_content: str):
+        self.sections = chunk_markdown(md_content)
+        self.term_freqs = [Counter(_terms(" ".join(s.path) + " " + s.text)) for s in self.sections]
+        lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.lengths = lengths
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+        doc_freq = Counter(term for tf in self.term_freqs for term in tf)
+        n = len(self.sections)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def scores(self, question: str) -> List[float]:
+        query = Counter(_terms(question))
+        scores = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            norm = _K1 * (1 - _B + _B * length / self.avg_length) if self.avg_length else _K1
+            score = 0.0
+            for term, q_count in query.items():
+                f = tf.get(term)
+                if f:
+                    score += self.idf[term] * f * (_K1 + 1) / (f + norm) * q_count
+            scores.append(score)
+        return scores
+
+class SectionRetriever:
+    """
+    파일별 섹션 색인을 캐시하고 질문과 관련된 상위 섹션만 반환
+
+    - 색인은 (파일 경로, 내용) 단위로 한 번만 생성
+    - 최고 점수 섹션이 전체 점수에서 차지하는 비율이 낮으면(질문이 여러 섹션에 고르게 걸침)
+      검색을 포기하고 전체 파일을 사용
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, Tuple[str, _SectionIndex]] = {}
+        self._lock = threading.Lock()
+        self.retrieved = 0
+        self.fallbacks = 0
+        self.chars_saved = 0
+
+    def retrieve(
+        self,
+        key: str,
+        md_content: str,
+        question: str,
+        top_k: int = 3,
+        max_chars: int = 4000,
+        min_share: float = 0.3
+    ) -> str:
+        """
+        질문과 관련된 섹션만 문서 순서대로 이어 붙여 반환
+
+        Args:
+            key: 색인 캐시 키 (데이터 파일 경로)
+            md_content: 파일 내용
+            question: 사용자 질문
+            top_k: 최대 섹션 수
+            max_chars: 주입할 최대 글자 수
+            min_share: 최고 점수 섹션의 최소 점수 비율 (미달 시 전체 파일 반환)
+
+        Returns:
+            선택된 섹션 텍스트 (max_chars 이하, 가장 관련 높은 섹션이 혼자 넘으면 줄 단위로 잘라 맞춤),
+            검색 확신이 낮으면 md_content 그대로
+        """
+        if len(md_content) <= max_chars:
+            return md_content
+
+        index = self._index(key, md_content)
+        scores = index.scores(question)
+        total = sum(scores)
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+
+        if not total or scores[ranked[0]] / total < min_share:
+            self.fallbacks += 1
+            return md_content
+
+        chosen, used = [], 0
+        for i in ranked[:top_k]:
+            if scores[i] < scores[ranked[0]] * _RELATIVE_CUTOFF:
+                break
+            section = index.sections[i]
+            # 출력 길이 상한: 상위 제목 경로 + 본문(자기 제목 포함), 각각 구분자 \n\n
+            size = sum(len(title) + 2 for title in section.path[:-1]) + len(section.text) + 2
+            if used + size > max_chars:
+                if chosen:
+                    break
+                section = replace(section, text=_truncate(section.text, max_chars - (size - len(section.text))))
+                size = max_chars
+            chosen.append(section)
+            used += size
+
+        # 상위 제목 경로는 중복 없이 한 번만 출력
+        out, printed = [], set()
+        for section in sorted(chosen, key=lambda s: s.index):
+            for title in section.path[:-1]:
+                if title not in printed:
+                    out.append(title)
+                    printed.add(title)
+            out.append(section.text)
+        retrieved = "\n\n".join(out)
+
+        self.retrieved += 1
+        self.chars_saved += len(md_content) - len(retrieved)
+        return retrieved
+
+    def warm(self, key: str, md_content: str) -> None:
+        """질문 없이 색인만 미리 생성 (서버 시작 시)"""
+        self._index(key, md_content)
+
+    def stats(self) -> dict:
+        total = self.retrieved + self.fallbacks
+        return {
+            "retrieved": self.retrieved,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": self.fallbacks / total if total else 0.0,
+            "chars_saved": self.chars_saved,
+            "indexed_files": len(self._indexes)
+        }
+
+    def _index(self, key: str, md_content: str) -> _SectionIndex:
+        cached = self._indexes.get(key)
+        if cached is not None and cached[0] == md_content:
+            return cached[1]
+
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached is None or cached[0] != md_content:
+                cached = (md_content, _SectionIndex(md_content))
+                self._indexes[key] = cached
+        return cached[1]
+
+# 싱글톤 인스턴스
+section_retriever = SectionRetriever()
@@ -0,0 +1,369 @@
+"""
+세션 스토어 모듈
+대화 이력을 유휴 TTL / 최대 세션 수 제한과 함께 보관 (메모리 또는 SQLite 백엔드)
+"""
+import copy
+import json
+import time
+import zlib
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from data_loader import ROOT_DIR, load_config
+from diagnostics import diagnostics
+
+class SessionBackend:
+    """
+    세션 저장소 백엔드 인터페이스
+
+    레코드 형식: {"fields": dict, "recent": list, "archive": bytes, "last_accessed": float}
+    - fields: history를 제외한 세션 필드 (profile 등)
+    - recent: 최근 메시지 (그대로 보관)
+    - archive: 오래된 메시지 (zlib 압축 JSON)
+    """
+
+    def load(self, session_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def exists(self, session_id: str) -> bool:
+        """레코드를 읽지 않고 존재 여부만 확인"""
+        raise NotImplementedError
+
+    def save(self, session_id: str, record: dict) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def purge_idle(self, cutoff: float) -> int:
+        """last_accessed가 cutoff 이전인 세션 삭제, 삭제 수 반환"""
+        raise NotImplementedError
+
+    def evict_oldest(self, keep: int) -> int:
+        """가장 오래 사용하지 않은 세션부터 삭제해 keep개만 남김, 삭제 수 반환"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def size_bytes(self) -> int:
+        """저장소 크기 (근사치)"""
+        raise NotImplementedError
+
+class MemorySessionBackend(SessionBackend):
+    """프로세스 메모리 백엔드 (접근 순서를 유지해 오래된 세션부터 제거)"""
+
+    def __init__(self):
+        self._records: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._records.get(session_id)
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._records
+
+    def save(self, session_id: str, record: dict) -> None:
+        with self._lock:
+            self._records[session_id] = record
+            self._records.move_to_end(session_id)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+
+    def purge_idle(self, cutoff: float) -> int:
+        with self._lock:
+            expired = [sid for sid, record in self._records.items() if record["last_accessed"] < cutoff]
+            for sid in expired:
+                del self._records[sid]
+            return len(expired)
+
+    def evict_oldest(self, keep: int) -> int:
+        with self._lock:
+            evicted = 0
+            while len(self._records) > keep:
+                self._records.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            records = list(self._records.values())
+        return sum(
+            len(record["archive"]) + sum(len(m["content"].encode("utf-8")) for m in record["recent"])
+            for record in records
+        )
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    SQLite 백엔드
+
+    재시작 후에도 세션이 유지되고, 같은 호스트의 여러 uvicorn 워커가 파일을 공유
+    (WAL 모드, 스레드별 연결)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " fields TEXT NOT NULL,"
+            " recent TEXT NOT NULL,"
+            " archive BLOB,"
+            " last_accessed REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_accessed ON sessions(last_accessed)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT fields, recent, archive, last_accessed FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "fields": json.loads(row[0]),
+            "recent": json.loads(row[1]),
+            "archive": row[2] or b"",
+            "last_accessed": row[3]
+        }
+
+    def exists(self, session_id: str) -> bool:
+        return self._conn().execute(
+            "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone() is not None
+
+    def save(self, session_id: str, record: dict) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, fields, recent, archive, last_accessed)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                session_id,
+                json.dumps(record["fields"], ensure_ascii=False),
+                json.dumps(record["recent"], ensure_ascii=False),
+                record["archive"],
+                record["last_accessed"]
+            )
+        )
+        conn.commit()
+
+    def delete(self, session_id: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.commit()
+
+    def purge_idle(self, cutoff: float) -> int:
+        conn = self._conn()
+        cursor = conn.execute("DELETE FROM sessions WHERE last_accessed < ?", (cutoff,))
+        conn.commit()
+        return cursor.rowcount
+
+    def evict_oldest(self, keep: int) -> int:
+        conn = self._conn()
+        cursor = conn.execute(
+            "DELETE FROM sessions WHERE session_id IN ("
+            " SELECT session_id FROM sessions ORDER BY last_accessed DESC LIMIT -1 OFFSET ?)",
+            (keep,)
+        )
+        conn.commit()
+        return cursor.rowcount
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        conn = self._conn()
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+# 세션 잠금 개수
+_LOCK_STRIPES = 64
+
+class SessionStore:
+    """
+    세션 스토어
+
+    - 세션은 {"history": [...], "profile": {...}, ...} 형태의 dict로 다룸 (요청마다 복사본)
+    - 변경은 update()로 세션 단위 잠금 안에서 최신 상태를 다시 읽어 적용
+      (같은 세션의 겹친 요청/이력 접기가 서로의 변경을 덮어쓰지 않음)
+    - 저장 시 최근 verbatim_messages개 메시지만 그대로 두고 나머지는 압축
+    - 백그라운드 스위퍼가 idle_ttl_seconds 동안 사용되지 않은 세션과 max_sessions 초과분 제거
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        idle_ttl_seconds: float = 3600,
+        max_sessions: int = 10000,
+        max_history_messages: int = 20,
+        verbatim_messages: int = 6,
+        sweep_interval_seconds: float = 60
+    ):
+        self.backend = backend
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_history_messages = max_history_messages
+        self.verbatim_messages = verbatim_messages
+        self.sweep_interval_seconds = sweep_interval_seconds
+
+        # 세션 ID 해시로 고른 잠금 (세션 수와 관계없이 고정 개수)
+        self._locks = [threading.RLock() for _ in range(_LOCK_STRIPES)]
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.expired = 0
+        self.evicted = 0
+
+    def get_or_create(self, session_id: str, profile: Dict[str, str]) -> dict:
+        """세션 가져오기 또는 생성 (만료된 세션은 새로 시작)"""
+        record = self.backend.load(session_id)
+        if record is not None and time.time() - record["last_accessed"] <= self.idle_ttl_seconds:
+            return self._decode(record)
+
+        return {"history": [], "profile": dict(profile)}
+
+    def update(
+        self,
+        session_id: str,
+        apply: Callable[[dict], Optional[bool]],
+        profile: Optional[Dict[str, str]] = None
+    ) -> dict:
+        """
+        세션 단위 잠금 안에서 최신 세션을 읽어 apply로 변경한 뒤 저장
+
+        Args:
+            apply: 세션 dict를 제자리에서 고치는 함수 (False를 반환하면 저장하지 않음)
+            profile: 세션이 없거나 만료됐을 때 새 세션의 프로필
+
+        Returns:
+            저장된 세션
+        """
+        with self._lock_for(session_id):
+            session = self.get_or_create(session_id, profile or {})
+            if apply(session) is not False:
+                self.save(session_id, session)
+            return session
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        async 핸들러에서 스토어 메서드 호출
+
+        SQLite 백엔드는 디스크 I/O가 이벤트 루프를 막지 않도록 스레드에서 실행
+        """
+        if isinstance(self.backend, SQLiteSessionBackend):
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    def save(self, session_id: str, session: dict) -> None:
+        """세션 저장 (이력은 max_history_messages개로 제한)"""
+        if len(session["history"]) > self.max_history_messages:
+            session["history"] = session["history"][-self.max_history_messages:]
+
+        with self._lock_for(session_id):
+            is_new = not self.backend.exists(session_id)
+            self.backend.save(session_id, self._encode(session))
+
+        # 새 세션으로 한도를 넘으면 즉시 가장 오래된 세션 제거
+        if is_new and self.backend.count() > self.max_sessions:
+            self.evicted += self.backend.evict_oldest(self.max_sessions)
+
+    def delete(self, session_id: str) -> None:
+        self.backend.delete(session_id)
+
+    def sweep(self) -> None:
+        """유휴 세션 및 한도 초과 세션 정리"""
+        self.expired += self.backend.purge_idle(time.time() - self.idle_ttl_seconds)
+        self.evicted += self.backend.evict_oldest(self.max_sessions)
+
+    def start_sweeper(self) -> None:
+        if self._sweeper is not None:
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        self._sweeper = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "sessions": self.backend.count(),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
+
+    def _lock_for(self, session_id: str) -> threading.RLock:
+        return self._locks[hash(session_id) % _LOCK_STRIPES]
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval_seconds):
+            try:
+                self.sweep()
+            except Exception as e:
+                # 다음 주기에 다시 시도
+                diagnostics.error("session_sweep_failed", error=repr(e))
+
+    def _encode(self, session: dict) -> dict:
+        history = session["history"]
+        split = max(0, len(history) - self.verbatim_messages)
+        older, recent = history[:split], history[split:]
+
+        return {
+            "fields": {k: v for k, v in session.items() if k != "history"},
+            "recent": recent,
+            "archive": zlib.compress(json.dumps(older, ensure_ascii=False).encode("utf-8")) if older else b"",
+            "last_accessed": time.time()
+        }
+
+    def _decode(self, record: dict) -> dict:
+        older = json.loads(zlib.decompress(record["archive"]).decode("utf-8")) if record["archive"] else []
+        session = copy.deepcopy(record["fields"])
+        session["history"] = older + list(record["recent"])
+        return session
+
+def _create_store() -> SessionStore:
+    """config.json의 session 설정으로 스토어 생성"""
+    settings = load_config().get("session", {})
+
+    if settings.get("backend", "memory") == "sqlite":
+        backend = SQLiteSessionBackend(str(ROOT_DIR / settings.get("sqlite_path", "sessions.sqlite3")))
+    else:
+        backend = MemorySessionBackend()
+
+    return SessionStore(
+        backend,
+        idle_ttl_seconds=settings.get("idle_ttl_seconds", 3600),
+        max_sessions=settings.get("max_sessions", 10000),
+        max_history_messages=settings.get("max_history_messages", 20),
+        verbatim_messages=settings.get("verbatim_messages", 6),
+        sweep_interval_seconds=settings.get("sweep_interval_seconds", 60)
+    )
+
+# 싱글톤 인스턴스
+session_store = _create_store()
@@ -0,0 +1,51 @@
+"""
+요청 병합(single-flight) 모듈
+같은 키의 요청이 처리 중이면 새로 실행하지 않고 진행 중인 결과를 함께 기다림
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class SingleFlight:
+    """
+    키별 진행 중 작업 공유
+
+    - 첫 요청(leader)만 작업을 실행하고, 끝나기 전에 들어온 같은 키의 요청은 그 결과를 공유
+    - 작업은 별도 태스크로 실행되므로 leader 요청이 취소(연결 종료)돼도 나머지 요청은 결과를 받음
+    - 완료되면 바로 키를 지우므로 결과를 보관하지는 않음 (재사용은 답변 캐시 담당)
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+        self.executed = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """
+        key로 진행 중인 작업이 있으면 그 결과를, 없으면 func()를 실행한 결과를 반환
+
+        Returns:
+            (결과, 다른 요청의 결과를 공유했는지 여부)
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.collapsed += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.executed += 1
+
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> dict:
+        total = self.executed + self.collapsed
+        return {
+            "executed": self.executed,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._inflight),
+            "collapse_rate": round(self.collapsed / total, 4) if total else 0.0
+        }
+
+# 싱글톤 인스턴스
+singleflight = SingleFlight()
@@ -0,0 +1,54 @@
+"""
+추측 실행 통계 모듈
+라우팅과 동시에 시작한 답변 생성의 적중률과 낭비된 토큰(추정치)을 집계
+"""
+import threading
+from collections import Counter
+from typing import Optional
+
+from diagnostics import diagnostics
+
+class SpeculationStats:
+    """
+    추측 실행 결과 집계
+
+    - hit: 라우팅 결과가 예측(라벨, 전공)과 같아 추측 답변을 그대로 사용
+    - miss: 예측이 틀려 추측 호출을 취소 (이미 보낸 입력 토큰은 낭비로 집계)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted_tokens = 0
+        self.misses_by_label: Counter = Counter()
+
+    def record_hit(self, label: str, program_name: Optional[str]) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.hits += 1
+        diagnostics.log("speculation_hit", label=label, program_name=program_name)
+
+    def record_miss(self, predicted: str, actual: str, wasted_tokens: int) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.misses += 1
+            self.wasted_tokens += wasted_tokens
+            self.misses_by_label[predicted] += 1
+        diagnostics.log(
+            "speculation_miss", label=actual, predicted=predicted, wasted_tokens=wasted_tokens
+        )
+
+    def stats(self) -> dict:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / self.attempts if self.attempts else 0.0,
+            "wasted_tokens_estimate": self.wasted_tokens,
+            "misses_by_predicted_label": dict(self.misses_by_label)
+        }
+
+# 싱글톤 인스턴스
+speculation_stats = SpeculationStats()
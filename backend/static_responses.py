@@ -0,0 +1,75 @@
+"""
+정적 응답 캐시 모듈
+전공 목록 / 전공 현황 / 설정처럼 원본 파일이 바뀔 때만 달라지는 응답을 미리 bytes로 직렬화해 ETag와 함께 보관
+"""
+import json
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_loader import file_signature
+
+class StaticResponses:
+    """
+    이름별 사전 계산 JSON 응답
+
+    - 요청마다 원본 파일 stat만 비교하고, 바뀌었을 때만 다시 만들어 직렬화
+    - ETag는 본문 해시라 내용이 같으면 파일을 다시 저장해도 클라이언트 캐시가 유지됨
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, Tuple[List[str], Callable[[], object]]] = {}
+        # 이름 → (원본 파일 시그니처, 본문, ETag). 튜플 하나로 교체해 읽는 쪽은 잠금 불필요
+        self._built: Dict[str, Tuple[tuple, bytes, str]] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.not_modified = 0
+
+    def register(self, name: str, files: List[str], build: Callable[[], object]) -> None:
+        self._sources[name] = (files, build)
+
+    def warm(self) -> None:
+        """등록된 응답을 모두 미리 생성 (서버 시작 시)"""
+        for name in self._sources:
+            self.get(name)
+
+    def get(self, name: str) -> Tuple[bytes, str]:
+        """(본문 bytes, ETag) 반환"""
+        files, build = self._sources[name]
+        signature = tuple(file_signature(path, pinned=False) for path in files)
+        built = self._built.get(name)
+        if built and built[0] == signature:
+            return built[1], built[2]
+
+        with self._lock:
+            built = self._built.get(name)
+            if not built or built[0] != signature:
+                # FastAPI 기본 JSONResponse와 같은 직렬화
+                body = json.dumps(
+                    build(), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+                ).encode("utf-8")
+                built = (signature, body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+                self._built[name] = built
+                self.builds += 1
+            return built[1], built[2]
+
+    def matches(self, if_none_match: Optional[str], etag: str) -> bool:
+        """If-None-Match 헤더가 현재 ETag와 맞는지 (약한 비교, 목록/* 지원)"""
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or candidate.removeprefix("W/") == etag:
+                self.not_modified += 1
+                return True
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "entries": {name: built[2] for name, built in self._built.items()},
+            "builds": self.builds,
+            "not_modified": self.not_modified
+        }
+
+# 싱글톤 인스턴스
+static_responses = StaticResponses()
@@ -0,0 +1,12 @@
+"""
+pytest 공통 설정
+backend 모듈(평면 구조)을 테스트에서 바로 import할 수 있도록 경로 추가
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# llm_client는 import 시 클라이언트를 만들며 키를 요구함 (테스트는 실제 API를 호출하지 않음)
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
@@ -0,0 +1,164 @@
+"""
+입장 제어 테스트
+AIMD 한도 조정, 우선순위 대기열, 밀어내기/포화 거부, 호출별 대기 기한
+"""
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, admission
+
+def _controller(**kwargs) -> AdmissionController:
+    settings = {
+        "initial_limit": 1,
+        "min_limit": 1,
+        "max_limit": 4,
+        "decrease_cooldown": 0.0,
+        "queue_timeouts": {"interactive": 1.0, "batch": 1.0, "precompute": 1.0}
+    }
+    settings.update(kwargs)
+    return AdmissionController(**settings)
+
+async def _acquire_in(controller: AdmissionController, priority: str, granted: list) -> None:
+    with admission.scope(priority):
+        await controller.acquire_async()
+    granted.append(priority)
+
+def test_overload_halves_limit_down_to_min():
+    controller = _controller(initial_limit=8, min_limit=2, max_limit=8)
+    controller.acquire()
+    controller.release("overload")
+    assert controller.limit == 4
+
+    for _ in range(3):
+        controller.acquire()
+        controller.release("overload")
+    assert controller.limit == 2
+    assert controller.in_flight == 0
+
+def test_decrease_cooldown_limits_decreases():
+    controller = _controller(initial_limit=8, max_limit=8, decrease_cooldown=60.0)
+    for _ in range(2):
+        controller.acquire()
+    controller.release("overload")
+    controller.release("overload")
+    assert controller.limit == 4
+    assert controller.decreases == 1
+
+def test_fast_success_increases_and_slow_success_decreases():
+    controller = _controller(initial_limit=2, latency_target=1.0, latency_decrease_ratio=0.5)
+    controller.acquire()
+    controller.release("ok", 0.1)
+    assert controller.limit == pytest.approx(2.5)
+
+    controller.acquire()
+    controller.release("ok", 5.0)
+    assert controller.limit == pytest.approx(1.25)
+
+def test_unrelated_failure_keeps_limit():
+    controller = _controller(initial_limit=2)
+    controller.acquire()
+    controller.release("")
+    assert controller.limit == 2
+    assert controller.in_flight == 0
+
+def test_queue_grants_by_priority_then_arrival():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire_async()
+
+        granted = []
+        tasks = [
+            asyncio.create_task(_acquire_in(controller, "precompute", granted)),
+            asyncio.create_task(_acquire_in(controller, "batch", granted)),
+            asyncio.create_task(_acquire_in(controller, "interactive", granted)),
+        ]
+        await asyncio.sleep(0.01)
+        assert controller.waiting == 3
+
+        for _ in tasks:
+            controller.release("")
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        return granted
+
+    assert asyncio.run(scenario()) == ["interactive", "batch", "precompute"]
+
+def test_full_queue_evicts_lower_priority_waiter():
+    async def scenario():
+        controller = _controller(max_queue=1)
+        await controller.acquire_async()
+
+        batch = asyncio.create_task(_acquire_in(controller, "batch", []))
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(_acquire_in(controller, "interactive", []))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await batch
+        assert exc.value.reason == "evicted"
+        assert exc.value.status_code == 429
+
+        controller.release("")
+        await interactive
+
+    asyncio.run(scenario())
+
+def test_full_queue_rejects_same_or_lower_priority_arrival():
+    async def scenario():
+        controller = _controller(max_queue=1)
+        await controller.acquire_async()
+
+        waiting = asyncio.create_task(_acquire_in(controller, "interactive", []))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as exc:
+            with admission.scope("batch"):
+                await controller.acquire_async()
+        assert exc.value.reason == "queue_full"
+
+        controller.release("")
+        await waiting
+
+    asyncio.run(scenario())
+
+def test_waiter_rejected_after_deadline():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire_async()
+        with admission.scope("interactive", timeout=0.05):
+            with pytest.raises(AdmissionRejected) as exc:
+                await controller.acquire_async()
+        assert exc.value.reason == "deadline"
+        assert exc.value.status_code == 503
+        assert controller.waiting == 0
+        assert exc.value.retry_after >= 1.0
+
+    asyncio.run(scenario())
+
+def test_each_call_gets_its_own_deadline():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire_async()
+        with admission.scope("interactive", timeout=0.1):
+            # 같은 요청 안에서 앞선 단계가 기한보다 오래 걸려도 다음 호출은 새 기한으로 대기
+            await asyncio.sleep(0.15)
+            waiting = asyncio.create_task(controller.acquire_async())
+            await asyncio.sleep(0.02)
+            controller.release("")
+            await waiting
+
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire_async()
+        waiting = asyncio.create_task(controller.acquire_async())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert controller.waiting == 0
+        assert controller.in_flight == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,160 @@
+"""
+서킷 브레이커 상태 전이 테스트
+closed → open → half_open → closed/open, 결과 없이 끝난 시험 호출의 허가 반납
+"""
+import time
+import asyncio
+
+import httpx
+import pytest
+import anthropic
+
+import llm_client
+from admission import AdmissionRejected
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    settings = {"failure_threshold": 2, "reset_timeout": 0.05, "half_open_max_calls": 1}
+    settings.update(kwargs)
+    return CircuitBreaker(**settings)
+
+def test_opens_after_consecutive_failures():
+    breaker = _breaker()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert 0 < exc.value.retry_after <= 0.05
+    assert breaker.stats()["rejected"] == 1
+
+def test_success_resets_failure_count():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_allows_limited_trial_calls():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_half_open_success_closes():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+def test_half_open_failure_reopens():
+    breaker = _breaker(failure_threshold=5)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.06)
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
+
+def test_release_trial_returns_half_open_permit():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.before_call() is True
+    breaker.release_trial()
+    assert breaker.before_call() is True
+
+# --- llm_client에서 결과 없이 끝난 시험 호출 ---
+
+class _FakeAdmission:
+    """앞의 reject_after번은 통과시키고 그 다음부터 거부하는 입장 제어"""
+
+    def __init__(self, reject_after: int = 1_000):
+        self.reject_after = reject_after
+        self.acquired = 0
+        self.released = 0
+
+    async def acquire_async(self) -> None:
+        if self.acquired >= self.reject_after:
+            raise AdmissionRejected("deadline", 1.0)
+        self.acquired += 1
+
+    def release(self, outcome: str = "", latency=None) -> None:
+        self.released += 1
+
+def _half_open(monkeypatch, admission) -> CircuitBreaker:
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    monkeypatch.setattr(llm_client, "llm_breaker", breaker)
+    monkeypatch.setattr(llm_client, "admission", admission)
+    monkeypatch.setattr(llm_client, "_llm_settings", lambda: {"retry": {"base_delay": 0.001}})
+    return breaker
+
+def test_cancelled_trial_call_releases_permit(monkeypatch):
+    breaker = _half_open(monkeypatch, _FakeAdmission())
+
+    async def create(**kwargs):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        task = asyncio.create_task(llm_client._send_async(create))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert breaker.state == HALF_OPEN
+    assert breaker.before_call() is True
+
+def test_non_api_error_releases_permit(monkeypatch):
+    admission = _FakeAdmission()
+    breaker = _half_open(monkeypatch, admission)
+
+    async def create(**kwargs):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(llm_client._send_async(create))
+    assert admission.released == 1
+    assert breaker.before_call() is True
+
+def test_admission_reject_does_not_take_permit(monkeypatch):
+    breaker = _half_open(monkeypatch, _FakeAdmission(reject_after=0))
+
+    async def create(**kwargs):
+        raise AssertionError("입장 거부 시 호출하지 않아야 함")
+
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(llm_client._send_async(create))
+    assert breaker.before_call() is True
+
+def test_admission_reject_on_retry_releases_permit(monkeypatch):
+    breaker = _half_open(monkeypatch, _FakeAdmission(reject_after=1))
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+    async def create(**kwargs):
+        raise anthropic.InternalServerError("overloaded", response=httpx.Response(529, request=request), body=None)
+
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(llm_client._send_async(create))
+    assert breaker.state == HALF_OPEN
+    assert breaker.before_call() is True
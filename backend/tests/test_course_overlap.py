@@ -0,0 +1,54 @@
+"""
+이수 교과목 중복 인정 계산 테스트 (config.json course_overlap 상한 + 교과과정 파일 기준)
+"""
+import pytest
+
+from course_overlap import course_overlap
+
+VENTURE = "벤처비즈니스_전공"
+
+def test_first_major_caps():
+    # 국책사업 전공은 national_project_cap_credits, 전공별 설정이 있으면 그 값
+    assert course_overlap.first_major_cap("빅데이터_전공") == 12
+    assert course_overlap.first_major_cap("위기관리_전공") == 9
+    assert course_overlap.first_major_cap(VENTURE) == 9
+
+def test_first_major_credits_stop_at_cap():
+    result = course_overlap.calculate(
+        [VENTURE], ["6210001", "6210004", "6210003", "6210068"], "경영학부"
+    )
+    first_major = result["programs"][VENTURE]["first_major"]
+    assert first_major["cap"] == 9
+    assert first_major["credits"] == 9
+    assert first_major["courses"] == ["6210001", "6210004", "6210003"]
+    assert first_major["over_cap"] == ["6210068"]
+
+def test_other_department_courses_are_not_double_counted():
+    result = course_overlap.calculate([VENTURE], ["6210001", "6210004"], "소프트웨어학부")
+    first_major = result["programs"][VENTURE]["first_major"]
+    assert first_major["credits"] == 0
+    assert first_major["courses"] == []
+
+def test_equivalent_course_counts_once():
+    # 6209035는 6210001로 인정되는 과목: 둘 다 들었으면 한 번만 인정
+    result = course_overlap.calculate([VENTURE], ["6210001", "6209035"], "경영학부")
+    program = result["programs"][VENTURE]
+    assert [course["number"] for course in program["courses"]] == ["6210001"]
+    assert program["duplicates"] == [{"number": "6209035", "counts_as": "6210001", "counted_by": "6210001"}]
+    assert program["first_major"]["credits"] == 3
+
+def test_course_shared_by_two_programs_is_an_overlap():
+    programs = ["보안컨설팅_전공", "빅데이터_전공"]
+    result = course_overlap.calculate(programs, ["5114003"])
+    (overlap,) = result["overlaps"]
+    assert overlap["number"] == "5114003"
+    assert overlap["programs"] == programs
+    assert result["overlap_credits"] == overlap["credits"]
+    assert result["unique_credits"] == overlap["credits"]
+
+def test_unknown_course_and_program():
+    result = course_overlap.calculate([VENTURE], ["0000000"], "경영학부")
+    assert result["unmatched"] == ["0000000"]
+
+    with pytest.raises(KeyError):
+        course_overlap.calculate(["없는_전공"], [])
@@ -0,0 +1,41 @@
+"""
+전공 이름 매칭 테스트 (config.json / 전공 현황 파일 기준)
+가장 왼쪽 → 가장 긴 별칭 우선, 오타 허용 일치
+"""
+from program_matcher import program_matcher
+
+def _ids(question: str) -> list:
+    return [match.program_id for match in program_matcher.match(question)]
+
+def test_longest_alias_wins_over_prefix():
+    # "보안"도 별칭이지만 같은 위치의 더 긴 "보안컨설팅"이 우선
+    assert program_matcher.extract("보안컨설팅 전필 알려줘") == "보안컨설팅_전공"
+
+def test_leftmost_program_is_extracted():
+    assert program_matcher.extract("보안컨설팅이랑 빅데이터 전공 차이") == "보안컨설팅_전공"
+    assert program_matcher.extract("빅데이터랑 보안컨설팅 전공 차이") == "빅데이터_전공"
+
+def test_all_programs_in_question_order():
+    assert _ids("빅데이터랑 보안 전공 차이") == ["빅데이터_전공", "보안컨설팅_전공"]
+
+def test_exact_match_scores_one():
+    (match,) = program_matcher.match("벤처비즈니스 과목")
+    assert match.program_id == "벤처비즈니스_전공"
+    assert match.score == 1.0
+
+def test_typo_matches_with_lower_score():
+    (match,) = program_matcher.match("빅데이타 전공 과목")
+    assert match.program_id == "빅데이터_전공"
+    assert 0 < match.score < 1.0
+
+    assert program_matcher.extract("빅대이터 전공 과목") == "빅데이터_전공"
+    assert program_matcher.extract("벤쳐비즈니스 과목") == "벤처비즈니스_전공"
+
+def test_generic_words_do_not_match():
+    assert program_matcher.extract("데이터 관련 전공 있어?") is None
+    assert program_matcher.match("다전공 신청 기간이 언제야?") == []
+
+def test_program_without_curriculum_is_matched_but_not_extracted():
+    matches = program_matcher.match("노인복지 졸업요건")
+    assert matches and matches[0].program_id is None
+    assert program_matcher.extract("노인복지 졸업요건") is None
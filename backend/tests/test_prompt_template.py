@@ -0,0 +1,38 @@
+"""
+프롬프트 템플릿 정적/동적 분리 테스트
+"""
+from data_loader import PromptTemplate
+
+TEXT = (
+    "<system_instruction>지시문</system_instruction>\n"
+    "<data>데이터</data>\n"
+    "<context>profile_dept={{profile_dept}}</context>\n"
+    "<question>{{QUESTION}}</question>"
+)
+
+def _template(text: str = TEXT, md_content: str = "") -> PromptTemplate:
+    return PromptTemplate("다전공_제도", None, text, md_content, "data/test.md", ())
+
+def test_blocks_without_slots_are_static():
+    template = _template()
+    assert template.static_text == "<system_instruction>지시문</system_instruction>\n\n<data>데이터</data>"
+    assert "{{" not in template.static_text
+
+def test_dynamic_part_renders_only_slot_blocks():
+    template = _template()
+    dynamic = template.render_dynamic(QUESTION="신청 기간?", profile_dept="경영학부")
+    assert dynamic == "<context>profile_dept=경영학부</context>\n\n<question>신청 기간?</question>"
+
+def test_full_render_keeps_original_layout():
+    rendered = _template().render(QUESTION="신청 기간?", profile_dept="경영학부")
+    assert rendered == TEXT.replace("{{QUESTION}}", "신청 기간?").replace("{{profile_dept}}", "경영학부")
+
+def test_prompt_without_blocks_is_fully_dynamic():
+    template = _template("질문: {{QUESTION}}")
+    assert template.static_text == ""
+    assert template.render_dynamic(QUESTION="a") == template.render(QUESTION="a") == "질문: a"
+
+def test_content_hash_follows_prompt_and_data():
+    assert _template().content_hash == _template().content_hash
+    assert _template().content_hash != _template(md_content="바뀐 데이터").content_hash
+    assert _template().content_hash != _template(TEXT + "\n").content_hash
@@ -0,0 +1,58 @@
+"""
+세션 스토어 테스트
+겹친 요청의 턴 보존, update 저장 생략, 존재 확인 (메모리 / SQLite 백엔드)
+"""
+import threading
+
+import pytest
+
+from session_store import SessionStore, MemorySessionBackend, SQLiteSessionBackend
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path) -> SessionStore:
+    if request.param == "sqlite":
+        backend = SQLiteSessionBackend(str(tmp_path / "sessions.sqlite3"))
+    else:
+        backend = MemorySessionBackend()
+    return SessionStore(backend, max_history_messages=1000, verbatim_messages=4)
+
+def _append(text: str):
+    def apply(session: dict) -> None:
+        session["history"].append({"role": "user", "content": text})
+    return apply
+
+def test_overlapping_requests_keep_both_turns(store):
+    # 두 요청이 같은 세션을 읽은 뒤 각자 턴을 저장
+    first = store.get_or_create("s", {"dept": ""})
+    second = store.get_or_create("s", {"dept": ""})
+    assert first is not second
+
+    store.update("s", _append("첫 번째"), first["profile"])
+    store.update("s", _append("두 번째"), second["profile"])
+    history = store.get_or_create("s", {})["history"]
+    assert [m["content"] for m in history] == ["첫 번째", "두 번째"]
+
+def test_concurrent_updates_are_not_lost(store):
+    def worker(n: int) -> None:
+        for i in range(20):
+            store.update("s", _append(f"{n}-{i}"))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.get_or_create("s", {})["history"]) == 80
+
+def test_update_returning_false_does_not_save(store):
+    store.update("s", lambda session: False)
+    assert not store.backend.exists("s")
+
+    store.update("s", _append("a"))
+    assert store.backend.exists("s")
+
+def test_new_session_uses_given_profile(store):
+    session = store.update("s", _append("a"), {"dept": "경영학부"})
+    assert session["profile"] == {"dept": "경영학부"}
+    assert store.get_or_create("s", {})["profile"] == {"dept": "경영학부"}
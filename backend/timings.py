@@ -0,0 +1,72 @@
+"""
+요청 단계별 시간 측정 모듈
+라우팅 / 프롬프트 구성 / LLM 호출 / 후처리 시간을 요청 단위로 누적해 Server-Timing 헤더로 노출
+"""
+import time
+import asyncio
+import inspect
+import functools
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+STAGES = ("routing", "prompt", "llm", "post")
+
+# 현재 요청의 단계별 누적 시간 (ms). 요청 밖에서는 None
+_current: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+def start_request() -> Dict[str, float]:
+    """현재 컨텍스트(요청)의 측정 시작. 이후 생성되는 태스크도 같은 dict를 공유"""
+    timings: Dict[str, float] = {}
+    _current.set(timings)
+    return timings
+
+def record(stage: str, elapsed_ms: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + elapsed_ms
+
+def timed(stage: str):
+    """
+    함수 실행 시간을 stage에 누적하는 데코레이터 (동기/비동기 함수, 비동기 제너레이터 지원)
+
+    비동기 제너레이터는 첫 반복부터 소진(또는 중단)될 때까지를 측정
+    추측 실행처럼 단계가 겹쳐 실행되면 단계 합계가 전체 시간보다 클 수 있음
+    """
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                finally:
+                    record(stage, (time.perf_counter() - start) * 1000)
+            return async_gen_wrapper
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(stage, (time.perf_counter() - start) * 1000)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, (time.perf_counter() - start) * 1000)
+        return wrapper
+
+    return decorator
+
+def server_timing(timings: Dict[str, float], total_ms: float) -> str:
+    """Server-Timing 헤더 값: "routing;dur=1.2, llm;dur=830.0, total;dur=845.1" """
+    parts = [f"{stage};dur={timings[stage]:.1f}" for stage in STAGES if stage in timings]
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
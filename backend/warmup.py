@@ -0,0 +1,100 @@
+"""
+서버 시작 워밍업 모듈
+지식 번들 / 사전 계산 답변 로드, 템플릿/색인/정적 응답 사전 생성, 업스트림 연결 선개설을 수행하고 준비 상태를 보고
+"""
+import time
+import asyncio
+from typing import Dict, Optional
+
+from data_loader import load_config, get_prompt_template
+from knowledge_bundle import knowledge_bundle
+from answer_store import answer_store
+from section_retriever import section_retriever
+from lexical_router import lexical_router
+from curriculum_index import curriculum_index
+from course_overlap import course_overlap
+from program_matcher import program_matcher
+from static_responses import static_responses
+from llm_client import claude_client, async_claude_client
+from diagnostics import diagnostics
+
+class Warmup:
+    """
+    시작 직후 백그라운드로 한 번 실행
+
+    - 번들/파일 단계는 동기 파일 처리라 스레드에서 실행 (이벤트 루프는 바로 요청을 받음)
+    - 업스트림 연결 실패는 준비 상태를 막지 않음 (호출 시 재시도/서킷 브레이커가 처리)
+    """
+
+    def __init__(self):
+        self.done = False
+        self.error: Optional[str] = None
+        self.steps_ms: Dict[str, float] = {}
+        self.templates = 0
+        self.upstream: Optional[bool] = None
+
+    @property
+    def ready(self) -> bool:
+        """워밍업 완료 + (번들 필수 설정이면) 번들 로드됨. 기본은 번들이 없으면 디스크 파일로 응답"""
+        if not self.done or self.error:
+            return False
+        required = load_config().get("bundle", {}).get("required", False)
+        return knowledge_bundle.loaded or not required
+
+    async def run(self) -> None:
+        try:
+            await self._step("bundle", asyncio.to_thread(knowledge_bundle.ensure))
+            await self._step("answers", asyncio.to_thread(answer_store.ensure))
+            await self._step("templates", asyncio.to_thread(self.warm_templates))
+            await self._step("indexes", asyncio.to_thread(self.warm_indexes))
+            results = await self._step("upstream", asyncio.gather(
+                async_claude_client.warmup(),
+                asyncio.to_thread(claude_client.warmup)
+            ))
+            self.upstream = all(results)
+        except Exception as e:
+            self.error = repr(e)
+            diagnostics.error("warmup_failed", error=self.error)
+        self.done = True
+        diagnostics.log("warmup_done", steps_ms=self.steps_ms, bundle=knowledge_bundle.loaded, upstream=self.upstream)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmup_done": self.done,
+            "error": self.error,
+            "steps_ms": self.steps_ms,
+            "templates": self.templates,
+            "upstream_connected": self.upstream,
+            "precomputed_answers": len(answer_store.entries),
+            "bundle": knowledge_bundle.stats()
+        }
+
+    async def _step(self, name: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.steps_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def warm_templates(self) -> None:
+        """모든 (라벨, 전공) 템플릿 컴파일 + 섹션 검색 라벨 색인 (파일 교체 시 재사용)"""
+        count = 0
+        for label, route_config in load_config()["routing"].items():
+            programs = route_config.get("available_programs", []) if "data_template" in route_config else [None]
+            for program in programs:
+                template = get_prompt_template(label, program)
+                if template.retrieval:
+                    section_retriever.warm(template.data_path, template.md_content)
+                count += 1
+        self.templates = count
+
+    def warm_indexes(self) -> None:
+        lexical_router.ensure()
+        curriculum_index.ensure()
+        course_overlap.ensure()
+        program_matcher.ensure()
+        static_responses.warm()
+
+# 싱글톤 인스턴스
+warmup = Warmup()
@@ -3,7 +3,7 @@ import { useNavigate, useSearchParams } from 'react-router-dom';
 import { TalkBubble } from '../components/TalkBubble';
 import { useAppStore } from '../stores/appStore';
 import { useEmotion } from '../stores/emotionStore';
-import { chatAPI, type ChatRequest } from '../utils/api';
+import { chatAPI, busyMessage, type ChatRequest } from '../utils/api';
 
 interface Message {
   id: string;
@@ -251,7 +251,8 @@ export function ChatPage() {
       const errorMsg: Message = {
         id: `error-${Date.now()}`,
         type: 'bot',
-        content: '오류가 발생했다왕... 😅 잠시 후 다시 시도해보라왕!',
+        // 혼잡/장애(429, 503)면 서버의 안내 메시지를 그대로 보여줌
+        content: busyMessage(error) ?? '오류가 발생했다왕... 😅 잠시 후 다시 시도해보라왕!',
         timestamp: new Date(),
       };
       setMessages((prev) => [...prev, errorMsg]);
@@ -23,6 +23,11 @@ export interface ChatResponse {
   success: boolean;
 }
 
+export interface ChatStreamHandlers {
+  onMeta?: (meta: { label: string; session_id: string }) => void;
+  onDelta?: (text: string) => void;
+}
+
 export interface ProgramInfo {
   id: string;
   name: string;
@@ -39,6 +44,52 @@ export const chatAPI = {
     return response.data;
   },
 
+  /**
+   * 챗봇에 질문 전송 (SSE 스트리밍)
+   * 답변 조각은 onDelta로 전달되고, 다왕 말투가 적용된 최종 답변을 반환
+   */
+  async streamMessage(
+    request: ChatRequest,
+    handlers: ChatStreamHandlers = {}
+  ): Promise<ChatResponse> {
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(request),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`스트리밍 요청 실패: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // 이벤트는 빈 줄로 구분
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const raw = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        const event = raw.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] ?? '{}');
+
+        if (event === 'meta') handlers.onMeta?.(data);
+        else if (event === 'delta') handlers.onDelta?.(data.text);
+        else if (event === 'done') return data as ChatResponse;
+        else if (event === 'error') throw new Error(data.detail);
+      }
+    }
+
+    throw new Error('스트림이 완료되기 전에 연결이 종료되었습니다.');
+  },
+
   /**
    * 질문 라우팅 (분류)
    */
@@ -80,4 +131,15 @@ export const chatAPI = {
   },
 };
 
+/**
+ * 서버가 보낸 다왕 안내 메시지 (대기열 포화 429 / 답변 서버 불안정 503), 없으면 undefined
+ */
+export function busyMessage(error: unknown): string | undefined {
+  if (!axios.isAxiosError(error)) return undefined;
+  const status = error.response?.status;
+  const detail = error.response?.data?.detail;
+  if ((status === 429 || status === 503) && typeof detail === 'string') return detail;
+  return undefined;
+}
+
 export default api;